@@ -0,0 +1,324 @@
+#------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#------------------------------------------------------------------------------
+# BenchmarkSymbolDictionary.py
+# Description: Stand-alone timing of SymbolDictionary lookups (not a pass/fail test)
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import sqlite3
+import traceback
+
+symbolDictionary = None
+LOOKUP_COUNT = 20000 # number of lookups timed by each benchmark
+VALIDATION_COUNT = 1000000 # number of SIDCs validated by BenchmarkSidcValidation
+CONVERSION_COUNT = 100000 # number of features converted by BenchmarkGeometryConversion
+
+# A mix of point/line/area SIDCs (incl. ones needing the 'F' fallback and a missing one)
+BENCHMARK_SIDCS = ["GHMPOGL-----USG", "GFGPOLAGS-****X", "GHGPGPWA------X", \
+                   "GHGPGAY-------X", "SFGPUCI----D---", "SHGPUCII---F---", \
+                   "GFTPS-----****X", "SUGPU----------", "XXXXXXXXXXXXXXX"]
+
+def reportRate(name, count, seconds) :
+    if seconds <= 0.0 :
+        seconds = 0.000001
+    print "%-45s %8d lookups in %7.3fs = %10.0f lookups/sec" % (name, count, seconds, count / seconds)
+
+def connectionPerLookupGeometryType(symbolId) :
+    # Reproduces the original behavior: open a new connection for every lookup
+    sqliteConn = sqlite3.connect(symbolDictionary.getDictionaryPath())
+    sqliteCursor = sqliteConn.cursor()
+    lookupSic = symbolDictionary.getMaskedSymbolIdFirst10(symbolId)
+    sqliteCursor.execute("select GeometryType from SymbolInfo where (ID = ?)", (lookupSic,))
+    sqliteRow = sqliteCursor.fetchone()
+    if (sqliteRow == None) :
+        lookupSic = lookupSic[0] + 'F' + lookupSic[2] + 'P' + lookupSic[4:10]
+        sqliteCursor.execute("select GeometryType from SymbolInfo where (ID = ?)", (lookupSic,))
+        sqliteRow = sqliteCursor.fetchone()
+    return sqliteRow
+
+def BenchmarkGeometryTypeLookups() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    sidcCount = len(BENCHMARK_SIDCS)
+
+    start = time.time()
+    for i in range(LOOKUP_COUNT) :
+        connectionPerLookupGeometryType(BENCHMARK_SIDCS[i % sidcCount])
+    reportRate("Before: connection per lookup", LOOKUP_COUNT, time.time() - start)
+
+    # cacheSize 0 so every lookup really goes to the file/tables
+    fileDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, 0)
+    start = time.time()
+    for i in range(LOOKUP_COUNT) :
+        fileDictionary.symbolIdToGeometryType(BENCHMARK_SIDCS[i % sidcCount])
+    reportRate("After: persistent read-only connection", LOOKUP_COUNT, time.time() - start)
+    fileDictionary.close()
+
+    start = time.time()
+    hydratedDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), True, 0)
+    print "Hydration (one-time load) took %.3fs" % (time.time() - start)
+    start = time.time()
+    for i in range(LOOKUP_COUNT) :
+        hydratedDictionary.symbolIdToGeometryType(BENCHMARK_SIDCS[i % sidcCount])
+    reportRate("After: hydrated in-memory tables", LOOKUP_COUNT, time.time() - start)
+
+    # first run compiles, the second just maps the compiled file
+    for run in ["compile + open", "open"] :
+        start = time.time()
+        compiledDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, 0, 0, True)
+        print "Compiled dictionary startup (%s) took %.3fs" % (run, time.time() - start)
+    start = time.time()
+    for i in range(LOOKUP_COUNT) :
+        compiledDictionary.symbolIdToGeometryType(BENCHMARK_SIDCS[i % sidcCount])
+    reportRate("After: memory-mapped compiled dictionary", LOOKUP_COUNT, time.time() - start)
+
+def BenchmarkBatchLookups() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    # every SIDC in the dictionary, as a stand-in for the distinct SIDCs of a large dataset
+    sqliteCursor = symbolDictionary.getConnection().cursor()
+    sqliteCursor.execute("select SymbolId from SymbolInfo")
+    sidcs = [sqliteRow[0] for sqliteRow in sqliteCursor]
+
+    singleDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, 0)
+    start = time.time()
+    for sidc in sidcs :
+        singleDictionary.lookup(sidc)
+    reportRate("Per-SIDC lookup() (no cache)", len(sidcs), time.time() - start)
+    singleDictionary.close()
+
+    batchDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, len(sidcs))
+    start = time.time()
+    batchDictionary.lookupMany(sidcs)
+    reportRate("Batch lookupMany() (temp table join)", len(sidcs), time.time() - start)
+    batchDictionary.close()
+
+    if DictionaryArrays.numpy is None :
+        print "numpy not found, skipping the array lookup benchmark"
+        return
+
+    arrayDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, 0)
+    start = time.time()
+    arrayDictionary.getTableArrays()
+    print "Table arrays (one-time load) took %.3fs" % (time.time() - start)
+    manySidcs = [sidcs[i % len(sidcs)] for i in range(VALIDATION_COUNT)]
+    start = time.time()
+    arrayDictionary.lookupArray(manySidcs)
+    reportRate("Array lookupArray() (searchsorted)", len(manySidcs), time.time() - start)
+    arrayDictionary.close()
+
+def getRuleNames() :
+    # The rule names (descriptions of the RuleID/SymbolRule coded value domains) of the
+    # blank MilitaryOverlay geodatabase, the names CalcSIDCField has to resolve
+    ruleNames = []
+    if os.path.exists(TestUtilities.blankMilFeaturesGDB) :
+        ruleDomainNames = set()
+        for dirPath, dirNames, fileNames in arcpy.da.Walk(TestUtilities.blankMilFeaturesGDB, datatype="FeatureClass") :
+            for fileName in fileNames :
+                for field in arcpy.ListFields(os.path.join(dirPath, fileName)) :
+                    if (field.name.lower() in DictionaryConstants.RuleFieldsList) and (field.domain != "") :
+                        ruleDomainNames.add(field.domain)
+
+        for domain in arcpy.da.ListDomains(TestUtilities.blankMilFeaturesGDB) :
+            if domain.name in ruleDomainNames :
+                ruleNames.extend(domain.codedValues.values())
+
+    if len(ruleNames) == 0 :
+        print "MilitaryOverlay rule domains not available, using the dictionary names"
+        sqliteCursor = symbolDictionary.getConnection().cursor()
+        sqliteCursor.execute("select Name from SymbolInfo where Name is not null")
+        ruleNames = [sqliteRow[0] + " F" for sqliteRow in sqliteCursor]
+
+    return ruleNames
+
+def sqlSymbolIdByName(sqliteCursor, symbolNameUpper) :
+    # Reproduces the original exact / LIKE 'x%' / LIKE '%x%' query sequence
+    sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) = ?", (symbolNameUpper,))
+    sqliteRow = sqliteCursor.fetchone()
+    if (sqliteRow == None):
+        symbolNameUpper = symbolNameUpper[0:-2]
+        sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) like ?", (symbolNameUpper + "%",))
+        sqliteRow = sqliteCursor.fetchone()
+        if (sqliteRow == None):
+            sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) like ?", ('%' + symbolNameUpper + '%',))
+            sqliteRow = sqliteCursor.fetchone()
+    return sqliteRow
+
+def indexSymbolIdByName(symbolNameUpper) :
+    # The same sequence answered from the name index
+    symbolId = symbolDictionary.findSymbolIdByName(symbolNameUpper, "=")
+    if (symbolId == None) :
+        symbolNameUpper = symbolNameUpper[0:-2]
+        symbolId = symbolDictionary.findSymbolIdByName(symbolNameUpper, "%")
+        if (symbolId == None) :
+            symbolId = symbolDictionary.findSymbolIdByName(symbolNameUpper, "%%")
+    return symbolId
+
+def BenchmarkNameLookups() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    ruleNames = [ruleName.upper().split("~")[0].strip() for ruleName in getRuleNames()]
+    print "Resolving " + str(len(ruleNames)) + " rule names"
+
+    sqliteCursor = symbolDictionary.getConnection().cursor()
+    start = time.time()
+    for ruleName in ruleNames :
+        sqlSymbolIdByName(sqliteCursor, ruleName)
+    reportRate("Before: SQL = / LIKE 'x%' / LIKE '%x%'", len(ruleNames), time.time() - start)
+
+    start = time.time()
+    SymbolNameIndex.SymbolNameIndex(sqliteCursor.connection)
+    print "Name index build (one-time) took %.3fs" % (time.time() - start)
+    start = time.time()
+    for ruleName in ruleNames :
+        indexSymbolIdByName(ruleName)
+    reportRate("After: in-memory n-gram name index", len(ruleNames), time.time() - start)
+
+def BenchmarkSidcValidation() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    if SymbolIdCode.numpy is None :
+        print "numpy not found, skipping the SIDC validation benchmark"
+        return
+
+    # the benchmark SIDCs (and lower case/invalid versions) repeated up to VALIDATION_COUNT
+    # (not the unknown one, the per-SIDC masking prints a warning for its affiliation)
+    knownSidcs = BENCHMARK_SIDCS[0:-1]
+    variants = knownSidcs + [sidc.lower() for sidc in knownSidcs] + [sidc[0:14] for sidc in knownSidcs]
+    sidcs = [variants[i % len(variants)] for i in range(VALIDATION_COUNT)]
+
+    start = time.time()
+    expectedValid = [symbolDictionary.isValidSidc(sidc) for sidc in sidcs]
+    expectedMaskedIds = [symbolDictionary.getMaskedSymbolIdFirst10(sidc) for sidc in sidcs]
+    reportRate("Before: regex + masking per SIDC", len(sidcs), time.time() - start)
+
+    start = time.time()
+    valid, maskedIds, normalizedIds = SymbolIdCode.validateAndMaskArray(sidcs)
+    reportRate("After: vectorized validateAndMaskArray", len(sidcs), time.time() - start)
+
+    if (valid.tolist() != expectedValid) or (maskedIds.tolist() != expectedMaskedIds) :
+        raise Exception('Benchmark Failed - vectorized results differ')
+
+def BenchmarkGeometryConversion() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    if GeometryArrays.numpy is None :
+        print "numpy not found, skipping the geometry conversion benchmark"
+        return
+
+    # the line/area SIDCs of the dictionary that need their points converted, as a stand-in
+    # for a large overlay (2-4 points each)
+    geoConverter = MilitaryUtilities.getGeometryConverter()
+    sqliteCursor = symbolDictionary.getConnection().cursor()
+    sqliteCursor.execute("select SymbolId from SymbolInfo where GeometryType in ('L', 'A')")
+    sidcs = [sqliteRow[0] for sqliteRow in sqliteCursor if geoConverter.requiresConversion(sqliteRow[0])]
+    if len(sidcs) == 0 :
+        print "No SIDCs need conversion, skipping the geometry conversion benchmark"
+        return
+
+    featureSidcs = [sidcs[i % len(sidcs)] for i in range(CONVERSION_COUNT)]
+    featurePoints = []
+    for i in range(CONVERSION_COUNT) :
+        pointCount = 2 + (i % 3)
+        featurePoints.append(ControlPoints.ControlPoints([c for j in range(pointCount) \
+            for c in (-80.0 + (i % 100) * 0.01 + j, 38.0 + (i % 50) * 0.01 + (j * j * 0.5))]))
+
+    # (the scalar conversions print for every feature, that is left out of both timings)
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try :
+        start = time.time()
+        scalarResults = [geoConverter.geometrytoControlPoints(featureSidcs[i], featurePoints[i], { }) \
+            for i in range(CONVERSION_COUNT)]
+        scalarSeconds = time.time() - start
+
+        start = time.time()
+        batchResults = geoConverter.convertBatch(featureSidcs, featurePoints, \
+            [{ } for i in range(CONVERSION_COUNT)])
+        batchSeconds = time.time() - start
+    finally :
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print "%-45s %8d features in %7.3fs" % ("Before: geometrytoControlPoints per feature", CONVERSION_COUNT, scalarSeconds)
+    print "%-45s %8d features in %7.3fs" % ("After: convertBatch grouped by GCT", CONVERSION_COUNT, batchSeconds)
+
+    if len(batchResults) != len(scalarResults) :
+        raise Exception('Benchmark Failed - batch results differ')
+
+def RunBenchmarks() :
+
+    global symbolDictionary
+
+    MilitaryUtilities.setSymbologyStandard("2525")
+    symbolDictionary = MilitaryUtilities.getSymbolDictionary()
+
+    if symbolDictionary is None :
+        print "Could not create SymbolDictionary"
+        raise Exception('Benchmark Failed')
+
+    BenchmarkGeometryTypeLookups()
+    BenchmarkBatchLookups()
+    BenchmarkNameLookups()
+    BenchmarkSidcValidation()
+    BenchmarkGeometryConversion()
+
+try:
+
+    print("Starting Benchmark: BenchmarkSymbolDictionary")
+
+    # load this library not in the local dir or pythonpath, so we can test it:
+    # assumes it is run from the current dir & exists at this relative location
+    sys.path.append('../../../toolboxes/scripts')
+    import arcpy
+    import TestUtilities
+    import DictionaryConstants
+    import MilitaryUtilities
+    import SymbolDictionary
+    import SymbolNameIndex
+    import SymbolIdCode
+    import DictionaryArrays
+    import GeometryArrays
+    import ControlPoints
+
+    RunBenchmarks()
+
+    print "Benchmark Complete"
+
+except:
+    # Get the traceback object
+    tb = sys.exc_info()[2]
+    tbinfo = traceback.format_tb(tb)[0]
+
+    # Concatenate information together concerning the error into a message string
+    pymsg = "PYTHON ERRORS:\nTraceback info:\n" + tbinfo + "\nError Info:\n" + str(sys.exc_info()[1])
+
+    # Print Python error messages for use in Python / Python Window
+    print pymsg + "\n"
+
+    # return a system error code
+    sys.exit(-1)
@@ -47,6 +47,16 @@ def TestGeoConversionProblem() :
     
     print "Notes: " + conversionNotes
 
+class StandInDictionary(object) :
+    # a SIDC for every GCT and geometry type: "<GCT>|<P, L or A>"
+    generation = 0
+    def checkForUpdates(self, force = False) :
+        return False
+    def lookup(self, sic) :
+        import SymbolDictionary
+        gct, geometryChar = sic.split("|")
+        return SymbolDictionary.SymbolRecord(sic, True, sic, geometryChar, gct)
+
 def TestRotateAndScale() :
     
     import GeometryConverter
@@ -85,11 +95,280 @@ def TestRotateAndScale() :
         raise Exception('Test Failed') 
         
 
+def TestAffineTemplates() :
+
+    import GeometryConverter
+
+    x0 = -80.0
+    y0 = 40.0
+    x1 = -81.0
+    y1 = 39.0
+
+    angleScales = [(90.0, 1.5), (-90.0, 0.6), (45.0, 0.5), (-30.0, 1.2), (60.0, 1.2), (0.0, 1.0)]
+    template = GeometryConverter.AffineTemplate(angleScales)
+    templatePoints = template.apply(x0, y0, x1, y1)
+
+    if len(templatePoints) != len(angleScales) :
+        raise Exception('Test Failed - template point count')
+
+    for (angle, scaleFactor), (tx, ty) in zip(angleScales, templatePoints) :
+        rx, ry = GeometryConverter.rotateAndScale(angle, scaleFactor, x0, y0, x1, y1)
+        if (math.fabs(rx - tx) > FAIL_DELTA_TOLERANCE) or (math.fabs(ry - ty) > FAIL_DELTA_TOLERANCE) :
+            raise Exception('Test Failed - template differs from rotateAndScale')
+
+    # the incline versions flip the angles
+    tx, ty = GeometryConverter.PARALLELLINESWITHTICKS_TEMPLATES[-1.0].apply(x0, y0, x1, y1)[0]
+    rx, ry = GeometryConverter.rotateAndScale(90.0, 0.6, x0, y0, x1, y1)
+    if (math.fabs(rx - tx) > FAIL_DELTA_TOLERANCE) or (math.fabs(ry - ty) > FAIL_DELTA_TOLERANCE) :
+        raise Exception('Test Failed - incline template')
+
+    try :
+        import numpy
+    except ImportError :
+        return
+
+    # one multiply for many features gives the same points
+    startPoints = numpy.array([[x0, y0], [x1, y1], [0.0, 0.0]])
+    endPoints = numpy.array([[x1, y1], [x0, y0], [3.0, -4.0]])
+    arrayPoints = template.applyArray(startPoints, endPoints)
+    for i in range(len(startPoints)) :
+        featurePoints = template.apply(startPoints[i][0], startPoints[i][1], endPoints[i][0], endPoints[i][1])
+        for (ax, ay), (tx, ty) in zip(arrayPoints[i], featurePoints) :
+            if (math.fabs(ax - tx) > FAIL_DELTA_TOLERANCE) or (math.fabs(ay - ty) > FAIL_DELTA_TOLERANCE) :
+                raise Exception('Test Failed - template array differs')
+
+def TestCircleDensification() :
+
+    import GeometryConverter
+
+    tolerance = 1.0
+    smallCount = GeometryConverter.getCircleVertexCount(10.0, tolerance)
+    largeCount = GeometryConverter.getCircleVertexCount(1000.0, tolerance)
+    if (smallCount != GeometryConverter.MIN_CIRCLE_VERTICES) or (largeCount <= smallCount) or \
+        (GeometryConverter.getCircleVertexCount(100000.0, tolerance) != GeometryConverter.MAX_CIRCLE_VERTICES) :
+        raise Exception('Test Failed - circle vertex counts')
+
+    # every vertex is on the circle and the chords are within the tolerance
+    radius = 1000.0
+    circlePoints = GeometryConverter.getCircleControlPoints(-80.0, 38.0, radius, 0.0, 360.0, largeCount)
+    if len(circlePoints) != largeCount :
+        raise Exception('Test Failed - circle vertex count')
+    for x, y in circlePoints :
+        if math.fabs(GeometryConverter.getLength(-80.0, 38.0, x, y) - radius) > FAIL_DELTA_TOLERANCE * radius :
+            raise Exception('Test Failed - circle vertex not on the circle')
+    sagitta = radius * (1.0 - math.cos(math.pi / largeCount))
+    if sagitta > tolerance :
+        raise Exception('Test Failed - circle chord tolerance')
+
+    # the first vertex is at the start azimuth (the arc is clockwise from it)
+    x, y = GeometryConverter.getCircleControlPoints(0.0, 0.0, 2.0, 90.0, 330.0, 36)[0]
+    if (math.fabs(x - 2.0) > FAIL_DELTA_TOLERANCE) or (math.fabs(y) > FAIL_DELTA_TOLERANCE) :
+        raise Exception('Test Failed - circle start azimuth')
+    if len(GeometryConverter.getCircleControlPoints(0.0, 0.0, 2.0, 90.0, 330.0, 36)) != 33 :
+        raise Exception('Test Failed - circle arc vertex count')
+
+    if GeometryConverter.getUnitCircle(largeCount) is not GeometryConverter.getUnitCircle(largeCount) :
+        raise Exception('Test Failed - unit circle not cached')
+
+    # with the default tolerance, tactical (km) circles have no more vertices than the
+    # 10 degree steps they had before: 36 for a full circle, 33 for the 330 degree arc
+    for radius in [10.0, 500.0, 1000.0, 5000.0, 10000.0] :
+        vertexCount = GeometryConverter.getCircleVertexCount(radius, GeometryConverter.DEFAULT_CHORD_TOLERANCE)
+        if (vertexCount > 36) or (GeometryConverter.getArcVertexCount(330.0, vertexCount) > 33) :
+            raise Exception('Test Failed - more circle vertices than before for radius ' + str(radius))
+
+    # the vertex count comes from the radius in meters, not the (degree) map units of 4326
+    import DictionaryConstants
+    converter = GeometryConverter.GeometryConverter(StandInDictionary())
+    for radius, expectedCount in [(10.0, GeometryConverter.MIN_CIRCLE_VERTICES), \
+        (5000.0, GeometryConverter.getCircleVertexCount(5000.0, GeometryConverter.DEFAULT_CHORD_TOLERANCE))] :
+        attributes = { DictionaryConstants.Tag_Radius : str(radius), DictionaryConstants.Tag_Wkid : "4326" }
+        circlePoints, conversionNotes = converter.controlPointsToGeometry(DictionaryConstants.GCT_CIRCULAR + "|A", \
+            "-80.0,38.0", attributes)
+        if (circlePoints is None) or (len(circlePoints) != expectedCount) :
+            raise Exception('Test Failed - 4326 GCT_CIRCULAR vertex count for radius ' + str(radius))
+
+    # GCT_CIRCLE radii in degrees (4326) are taken as meters at the equator for the vertex count
+    tolerance = converter.getChordTolerance()
+    for radius in [0.1, 1.0] :
+        circlePoints, conversionNotes = converter.controlPointsToGeometry(DictionaryConstants.GCT_CIRCLE + "|A", \
+            "-80.0,38.0;-80.0," + str(38.0 + radius), { DictionaryConstants.Tag_Wkid : "4326" })
+        radiusMeters = radius * GeometryConverter.METERS_PER_DEGREE
+        vertexCount = GeometryConverter.getCircleVertexCount(radiusMeters, tolerance)
+        if (circlePoints is None) or (vertexCount <= GeometryConverter.MIN_CIRCLE_VERTICES) or \
+            (len(circlePoints) != GeometryConverter.getArcVertexCount(330.0, vertexCount)) :
+            raise Exception('Test Failed - 4326 GCT_CIRCLE vertex count for radius ' + str(radius))
+        if (radiusMeters * (1.0 - math.cos(math.pi / vertexCount))) > tolerance :
+            raise Exception('Test Failed - 4326 GCT_CIRCLE chord tolerance for radius ' + str(radius))
+
+    # 3 points can't be exported as a circle (2 points or an envelope of 4 or more)
+    for gct in [DictionaryConstants.GCT_CIRCLE, DictionaryConstants.GCT_CIRCULAR] :
+        controlPoints, conversionNotes = converter.geometrytoControlPoints(gct + "|A", \
+            "-80.0,38.0;-81.0,39.0;-80.5,39.5", { })
+        if (controlPoints is not None) or (conversionNotes != DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT) :
+            raise Exception('Test Failed - 3 point ' + gct + ' export')
+
+def TestControlPoints() :
+
+    import ControlPoints
+
+    controlPoints = ControlPoints.fromString("-80.0,38.0;-81.5,39.25;-82.0,40.0")
+    if (len(controlPoints) != 3) or (controlPoints[1] != (-81.5, 39.25)) or (controlPoints[-1] != (-82.0, 40.0)) :
+        raise Exception('Test Failed - points not parsed')
+
+    if (str(controlPoints) != "-80.0,38.0;-81.5,39.25;-82.0,40.0") or \
+        (controlPoints.reversed().toStringList() != ["-82.0,40.0", "-81.5,39.25", "-80.0,38.0"]) or \
+        (controlPoints[0:-1] != ControlPoints.ControlPoints([-80.0, 38.0, -81.5, 39.25])) :
+        raise Exception('Test Failed - points not written back')
+
+    # a part (list of points) of a geometry, as read by WriteMessageFromFeature
+    class StandInPoint(object) :
+        def __init__(self, x, y) :
+            self.X = x
+            self.Y = y
+    part = [StandInPoint(-80.0, 38.0), StandInPoint(-81.5, 39.25), StandInPoint(-82.0, 40.0)]
+    if MilitaryUtilities.parseGeometryToControlPoints(part) != controlPoints :
+        raise Exception('Test Failed - geometry not parsed')
+
+    # the string forms are still accepted
+    if (ControlPoints.toControlPoints(["-80.0,38.0", "-81.5,39.25", "-82.0,40.0"]) != controlPoints) or \
+        (MilitaryUtilities.reverseControlPoints(controlPoints) != controlPoints.reversed()) :
+        raise Exception('Test Failed - string adapters')
+
+    # the conversions give the same result for a string or ControlPoints
+    SymbolIdCodeVal = "GHMPOFG---****X"
+    controlPointsString = "-80.0,38.0;-81.0,39.0"
+    fromString = MilitaryUtilities.geoConverter.geometrytoControlPoints(SymbolIdCodeVal, controlPointsString, { })
+    fromControlPoints = MilitaryUtilities.geoConverter.geometrytoControlPoints(SymbolIdCodeVal, \
+        ControlPoints.fromString(controlPointsString), { })
+    if fromString != fromControlPoints :
+        raise Exception('Test Failed - conversion differs for ControlPoints')
+
+    geometryPoints, conversionNotes = MilitaryUtilities.geoConverter.controlPointsToGeometry(SymbolIdCodeVal, \
+        fromString[0], { })
+    if (geometryPoints is None) or not isinstance(geometryPoints, ControlPoints.ControlPoints) :
+        raise Exception('Test Failed - conversion to geometry')
+
+def TestConversionRegistry() :
+
+    import GeometryConverter
+
+    SymbolIdCodeVal = "GHMPOFG---****X"
+    converter = MilitaryUtilities.geoConverter
+
+    profile = converter.getConversionProfile(SymbolIdCodeVal)
+    if (converter.getConversionProfile(SymbolIdCodeVal) is not profile) or \
+        (profile.gct != converter.getSymbolDictionary().symbolIdToGeometryConversionType(SymbolIdCodeVal)) or \
+        (profile.handler is not GeometryConverter.getGctHandler(profile.gct)) :
+        raise Exception('Test Failed - conversion profile')
+
+    if profile.requiresConversion != converter.requiresConversion(SymbolIdCodeVal) :
+        raise Exception('Test Failed - profile requiresConversion')
+
+    # a handler registered for the GCT is used by converters created after that
+    originalHandler = GeometryConverter.getGctHandler(profile.gct)
+    calls = []
+    def toMessage(converter, profile, inPoints, attributes, wkid) :
+        calls.append("toMessage")
+        return inPoints.reversed(), None
+    def toGeometry(converter, profile, inPoints, attributes, wkid) :
+        calls.append("toGeometry")
+        return None, "Stand-in conversion failed"
+
+    try :
+        GeometryConverter.registerGctHandler(profile.gct, toMessage, toGeometry)
+        standInConverter = GeometryConverter.GeometryConverter(converter.getSymbolDictionary())
+
+        controlPoints, conversionNotes = standInConverter.geometrytoControlPoints(SymbolIdCodeVal, \
+            "-80.0,38.0;-81.0,39.0", { })
+        if controlPoints != "-81.0,39.0;-80.0,38.0" :
+            raise Exception('Test Failed - registered handler not used')
+
+        # (points that need no conversion are returned before the handler is called)
+        controlPoints, conversionNotes = standInConverter.controlPointsToGeometry(SymbolIdCodeVal, \
+            "-80.0,38.0;-81.0,39.0", { })
+        if profile.requiresConversion :
+            expectedCalls = ["toMessage", "toGeometry"]
+            if (controlPoints is not None) or (conversionNotes != "Stand-in conversion failed") :
+                raise Exception('Test Failed - registered handler notes')
+        else :
+            expectedCalls = ["toMessage"]
+
+        if calls != expectedCalls :
+            raise Exception('Test Failed - registered handler calls')
+    finally :
+        GeometryConverter.registerGctHandler(profile.gct, originalHandler.toMessage, originalHandler.toGeometry, \
+            originalHandler.toMessageBatch, originalHandler.toGeometryBatch)
+
+def TestConvertBatch() :
+
+    import GeometryConverter
+    import DictionaryConstants
+    import ControlPoints
+
+    try :
+        import numpy
+    except ImportError :
+        print "numpy not installed, skipping TestConvertBatch"
+        return
+
+    sidcs = []
+    coordinateBuffers = []
+    attributes = []
+    for gct in DictionaryConstants.GCT_CODES :
+        if gct is None :
+            continue
+        for geometryChar in ["P", "L", "A"] :
+            for pointCount in range(1, 6) :
+                for twoLinesNeeded in ["True", "False"] :
+                    points = [(-80.0 + (i * 1.5) - pointCount, 38.0 + (i * i * 0.25) + pointCount) \
+                        for i in range(pointCount)]
+                    sidcs.append(gct + "|" + geometryChar)
+                    coordinateBuffers.append(ControlPoints.ControlPoints([c for point in points for c in point]))
+                    attributes.append({ DictionaryConstants.Tag_Radius : "5.5", DictionaryConstants.Tag_Length : "3", \
+                        DictionaryConstants.Tag_Width : "2", DictionaryConstants.Tag_TwoLinesNeeded : twoLinesNeeded })
+
+    for toGeometry in [False, True] :
+        scalarConverter = GeometryConverter.GeometryConverter(StandInDictionary())
+        scalarAttributes = [dict(featureAttributes) for featureAttributes in attributes]
+        scalarResults = []
+        for i in range(len(sidcs)) :
+            if toGeometry :
+                scalarResults.append(scalarConverter.controlPointsToGeometry(sidcs[i], coordinateBuffers[i], scalarAttributes[i]))
+            else :
+                scalarResults.append(scalarConverter.geometrytoControlPoints(sidcs[i], coordinateBuffers[i], scalarAttributes[i]))
+
+        batchConverter = GeometryConverter.GeometryConverter(StandInDictionary())
+        batchAttributes = [dict(featureAttributes) for featureAttributes in attributes]
+        batchResults = batchConverter.convertBatch(sidcs, coordinateBuffers, batchAttributes, toGeometry)
+
+        for i in range(len(sidcs)) :
+            scalarPoints, scalarNotes = scalarResults[i]
+            batchPoints, batchNotes = batchResults[i]
+            if scalarPoints is not None :
+                scalarPoints = ControlPoints.toControlPoints(scalarPoints)
+
+            if (scalarNotes != batchNotes) or ((scalarPoints is None) != (batchPoints is None)) or \
+                (scalarAttributes[i] != batchAttributes[i]) :
+                raise Exception('Test Failed - convertBatch differs for ' + sidcs[i])
+
+            if scalarPoints is not None :
+                if len(scalarPoints) != len(batchPoints) :
+                    raise Exception('Test Failed - convertBatch point count for ' + sidcs[i])
+                for (sx, sy), (bx, by) in zip(scalarPoints, batchPoints) :
+                    if (math.fabs(sx - bx) > FAIL_DELTA_TOLERANCE) or (math.fabs(sy - by) > FAIL_DELTA_TOLERANCE) :
+                        raise Exception('Test Failed - convertBatch points for ' + sidcs[i])
+
 def RunTests() :
     
     TestRotateAndScale()
     TestGeoConversionProblem()
-    
+    TestAffineTemplates()
+    TestCircleDensification()
+    TestControlPoints()
+    TestConversionRegistry()
+    TestConvertBatch()
+
 try:
 
     print("Starting Test: TestGeometryConverter")    
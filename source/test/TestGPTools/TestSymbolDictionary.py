@@ -16,7 +16,13 @@
 # Description: Stand-alone unit test of SymbolDictionary class
 # -----------------------------------------------------------------------------
 
+import os
+import re
 import sys
+import shutil
+import sqlite3
+import tempfile
+import threading
 import traceback
  
 symbolDictionary = None
@@ -115,6 +121,756 @@ def TestNameSicMappingApp6() :
     if (sic <> expectedSic) :
         raise Exception('Test Failed')                
        
+def TestConnectionReuse() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    sic = "GHMPOGL-----USG"
+
+    symbolDictionary.symbolIdToGeometryType(sic)
+    connection = symbolDictionary.getConnection()
+    symbolDictionary.symbolIdToName(sic)
+
+    if not (connection is symbolDictionary.getConnection()) :
+        raise Exception('Test Failed - connection not reused')
+
+    # close() releases the connection, the next lookup re-opens it
+    symbolDictionary.close()
+    geoType = symbolDictionary.symbolIdToGeometryType(sic)
+
+    print "SIC: " + sic + ", GeoType after close/re-open: " + geoType
+
+    if geoType != "Line" :
+        raise Exception('Test Failed')
+
+def TestReadOnlyConnection() :
+
+    # the dictionary connections can't write (mode=ro, or query_only where sqlite URIs aren't supported)
+    connection = SymbolDictionary.openReadOnlyConnection(symbolDictionary.getDictionaryPath())
+    try :
+        try :
+            connection.execute("CREATE TABLE ReadOnlyTest (ID TEXT)")
+        except sqlite3.Error :
+            pass
+        else :
+            raise Exception('Test Failed - write through a read-only connection')
+
+        # temp tables are still writable where they are used
+        with SymbolDictionary.tempTableWrites(connection) :
+            connection.execute("CREATE TEMP TABLE ReadOnlyTest (ID TEXT)")
+            connection.execute("INSERT INTO ReadOnlyTest VALUES ('Test')")
+            connection.execute("DROP TABLE ReadOnlyTest")
+
+        try :
+            connection.execute("DELETE FROM SymbolInfo")
+        except sqlite3.Error :
+            pass
+        else :
+            raise Exception('Test Failed - write after temp table writes')
+    finally :
+        connection.close()
+
+def TestContextManager() :
+
+    dictionaryPath = symbolDictionary.getDictionaryPath()
+
+    with SymbolDictionary.SymbolDictionary(dictionaryPath) as scopedDictionary :
+        name = scopedDictionary.symbolIdToName("GHMPOGL-----USG")
+
+    print "Scoped dictionary returned Name: " + name
+
+    if not (scopedDictionary.connection is None) :
+        raise Exception('Test Failed - connection not closed')
+
+def TestHydratedLookups() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    sics2Check = ["GHMPOGL-----USG", "GFGPOLAGS-****X", "GHGPGPWA------X", "SUGPU----------"]
+
+    fileDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False)
+    hydratedDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), True)
+
+    if not hydratedDictionary.isHydrated() :
+        raise Exception('Test Failed - dictionary not hydrated')
+
+    for sic in sics2Check :
+        expected = (fileDictionary.symbolIdToName(sic), \
+                    fileDictionary.symbolIdToGeometryType(sic), \
+                    fileDictionary.symbolIdToGeometryConversionType(sic))
+        actual = (hydratedDictionary.symbolIdToName(sic), \
+                  hydratedDictionary.symbolIdToGeometryType(sic), \
+                  hydratedDictionary.symbolIdToGeometryConversionType(sic))
+
+        print "SIC: " + sic + ", hydrated returned: " + str(actual)
+
+        if actual != expected :
+            raise Exception('Test Failed - hydrated lookup differs for ' + sic)
+
+    # lookups must not have gone back to the file
+    if not (hydratedDictionary.connection is None) :
+        raise Exception('Test Failed - hydrated dictionary opened the file')
+
+    fileDictionary.close()
+
+def TestLookupCacheStatistics() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    # Only room for 2 geometry type results
+    cachedDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), \
+                                                         True, 2)
+
+    cachedDictionary.symbolIdToGeometryType("GHMPOGL-----USG") # miss
+    cachedDictionary.symbolIdToGeometryType("GHMPOGL-----USX") # hit (same masked SIDC)
+    cachedDictionary.symbolIdToGeometryType("GFGPOLAGS-****X") # miss
+    cachedDictionary.symbolIdToGeometryType("GHGPGPWA------X") # miss, evicts GHMPOGL
+    cachedDictionary.symbolIdToGeometryType("GHMPOGL-----USG") # miss, evicts GFGPOLAGS
+
+    statistics = cachedDictionary.getCacheStatistics()
+
+    print "Cache statistics: " + str(cachedDictionary.getLookupCache())
+
+    if (statistics['hits'] != 1) or (statistics['misses'] != 4) or \
+        (statistics['evictions'] != 2) or (statistics['size'] != 2) :
+        raise Exception('Test Failed')
+
+def TestSymbolRecordLookup() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    sic = "GFGPOLAGS-****X"
+    expectedLookupKey = "GFGPOLAGS-"
+    expectedGeoType = "Line"
+    expectedGeometryConversionType = "GCT_ArrowWithOffset"
+
+    # both the sqlite (single joined query) and in-memory versions must agree
+    for hydrate in [False, True] :
+        recordDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), hydrate)
+        symbolRecord = recordDictionary.lookup(sic)
+
+        print "SIC: " + sic + ", returned Record: " + repr(symbolRecord)
+
+        if not ((symbolRecord.LookupKey == expectedLookupKey) and \
+            (symbolRecord.GeometryType == expectedGeoType) and \
+            (symbolRecord.GCT == expectedGeometryConversionType) and \
+            (symbolRecord.Name == recordDictionary.symbolIdToName(sic))) :
+            raise Exception('Test Failed')
+
+        recordDictionary.close()
+
+def TestLookupMany() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    # includes repeated, 'F' fallback & unknown SIDCs
+    sics2Check = ["GHMPOGL-----USG", "GHMPOGL-----USX", "GFGPOLAGS-****X", "GHGPOLAGS-****X", \
+                  "GHGPGPWA------X", "SUGPU----------", "XXXXXXXXXXXXXXX"]
+
+    for hydrate in [False, True] :
+        batchDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), hydrate)
+        singleDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), hydrate)
+
+        symbolRecords = batchDictionary.lookupMany(sics2Check)
+
+        for sic in sics2Check :
+            expected = repr(singleDictionary.lookup(sic))
+            actual = repr(symbolRecords[sic])
+            print "SIC: " + sic + ", lookupMany returned: " + actual
+            if actual != expected :
+                raise Exception('Test Failed - lookupMany differs for ' + sic)
+
+        # the batch results are cached, so lookup() should not miss now
+        misses = batchDictionary.getCacheStatistics()['misses']
+        for sic in sics2Check :
+            batchDictionary.lookup(sic)
+        if batchDictionary.getCacheStatistics()['misses'] != misses :
+            raise Exception('Test Failed - lookupMany results not cached')
+
+        batchDictionary.close()
+        singleDictionary.close()
+
+def TestPrewarm() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    testDirectory = tempfile.mkdtemp()
+
+    try :
+        # the distinct SIDCs of a message file, as read by the text scan
+        messageFileName = os.path.join(testDirectory, "messages.xml")
+        with open(messageFileName, "w") as messageFile :
+            messageFile.write("<geomessages>\n" \
+                + "<geomessage><sic>GHMPOGL-----USG</sic><_id>1</_id></geomessage>\n" \
+                + "<geomessage><sic>GFGPOLAGS-****X</sic><_id>2</_id></geomessage>\n" \
+                + "<geomessage><sic>GHMPOGL-----USG</sic><_id>3</_id></geomessage>\n" \
+                + "<geomessage><sic>SUGPU----------</sic><sic></sic><_id>4</_id></geomessage>\n" \
+                + "</geomessages>\n")
+
+        sidcs = MilitaryUtilities.getDistinctSidcsInMessageFile(messageFileName)
+        if sidcs != set(["GHMPOGL-----USG", "GFGPOLAGS-****X", "SUGPU----------"]) :
+            raise Exception('Test Failed - wrong distinct SIDCs: ' + str(sidcs))
+
+        # a cache too small for them is grown, then the lookups are all hits
+        prewarmDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, 2)
+        if prewarmDictionary.prewarm(list(sidcs) + ["GHMPOGL-----USG", None, ""]) != 3 :
+            raise Exception('Test Failed - wrong prewarm count')
+        if prewarmDictionary.getLookupCache().getMaxSize() != 3 :
+            raise Exception('Test Failed - lookup cache not grown')
+
+        prewarmDictionary.getLookupCache().resetStatistics()
+        for sidc in sidcs :
+            prewarmDictionary.lookup(sidc)
+        if prewarmDictionary.getCacheStatistics()['misses'] != 0 :
+            raise Exception('Test Failed - prewarmed SIDCs not cached')
+        prewarmDictionary.close()
+
+        # with caching off there's nothing to grow
+        uncachedDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), False, 0)
+        uncachedDictionary.prewarm(sidcs)
+        if uncachedDictionary.getLookupCache().getMaxSize() != 0 :
+            raise Exception('Test Failed - disabled cache grown')
+        uncachedDictionary.close()
+
+    finally :
+        shutil.rmtree(testDirectory, True)
+
+def TestNameIndex() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    # The name index must return the same (first) row as the LIKE queries it replaced
+    sqliteCursor = symbolDictionary.getConnection().cursor()
+    sqliteCursor.execute("SELECT UPPER(Name) FROM SymbolInfo WHERE Name IS NOT NULL")
+    names = [sqliteRow[0] for sqliteRow in sqliteCursor]
+
+    queries = ["TASK", "SCREEN", "LINE", "AREA", "AI", "A", "NOT A SYMBOL NAME", "AIM_POINT", "%"]
+    for name in names[::25] :
+        queries.append(name)
+        queries.append(name[0:len(name) // 2])
+        queries.append(name[len(name) // 3:])
+
+    for query in queries :
+        for matchType, queryval in [("=", query), ("%", query + "%"), ("%%", "%" + query + "%")] :
+            if matchType == "=" :
+                sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) = ?", (queryval,))
+            else :
+                sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) like ?", (queryval,))
+            sqliteRow = sqliteCursor.fetchone()
+            expected = None
+            if sqliteRow is not None :
+                expected = sqliteRow[0]
+
+            actual = symbolDictionary.findSymbolIdByName(query, matchType)
+            if actual != expected :
+                print "Name: " + query + ", match: " + matchType + ", expected: " + str(expected) + ", found: " + str(actual)
+                raise Exception('Test Failed - name index differs from SQL')
+
+    print "Name index matched SQL for " + str(len(queries)) + " names"
+
+    # names starting with a prefix (any case), in name order
+    for prefix in ["Task", "b", "AI", "ZZZZ", ""] :
+        sqliteCursor.execute("SELECT Name, SymbolId FROM SymbolInfo WHERE UPPER(Name) like ?", (prefix.upper() + "%",))
+        expected = sorted([(sqliteRow[0], sqliteRow[1]) for sqliteRow in sqliteCursor], key = lambda row : row[0].upper())
+        actual = symbolDictionary.findSymbolNamesStartingWith(prefix)
+        if (sorted(actual) != sorted(expected)) or ([row[0].upper() for row in actual] != [row[0].upper() for row in expected]) :
+            raise Exception('Test Failed - wrong names starting with: ' + prefix)
+        if symbolDictionary.findSymbolNamesStartingWith(prefix, 3) != actual[0:3] :
+            raise Exception('Test Failed - names starting with not limited')
+
+def TestMissCache() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    # Room for 2 misses of each kind
+    missDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), \
+                                                       False, 10, 2)
+
+    for i in range(3) :
+        if missDictionary.symbolIdToName("XXXXXXXXXXXXXXX") != "None" :
+            raise Exception('Test Failed - unknown SIDC found')
+        if missDictionary.getSymbolAttribute("XXXXXXXXXXXXXXX", "GeometryType") != "None" :
+            raise Exception('Test Failed - unknown SIDC attribute found')
+
+    missingSymbolIds = missDictionary.getMissingSymbolIdCache()
+    print "Missing SIDC cache: " + str(missingSymbolIds)
+    # queried once, the other 5 lookups answered from the miss cache
+    if (len(missingSymbolIds) != 1) or (missingSymbolIds.getStatistics()['hits'] != 5) :
+        raise Exception('Test Failed - SIDC miss not remembered')
+    if (missDictionary.getCacheStatistics()['size'] != 0) :
+        raise Exception('Test Failed - SIDC miss stored with the found SIDCs')
+
+    defaultSidc = DictionaryConstants.getDefaultSidcForGeometryString("Line")
+    for i in range(3) :
+        if missDictionary.SymbolNametoSymbolIDExt("Not A Symbol Name", "", "", "Line") != defaultSidc :
+            raise Exception('Test Failed - unknown name did not return the default SIDC')
+
+    missingNames = missDictionary.getMissingNameCache()
+    print "Missing name cache: " + str(missingNames)
+    if (len(missingNames) != 1) or (missingNames.getStatistics()['hits'] != 2) :
+        raise Exception('Test Failed - name miss not remembered')
+
+    # bounded: the oldest misses are dropped
+    for name in ["Not A Symbol Name 2", "Not A Symbol Name 3"] :
+        missDictionary.SymbolNametoSymbolIDExt(name, "", "", "Line")
+    if (len(missingNames) != 2) or (missingNames.getStatistics()['evictions'] != 1) :
+        raise Exception('Test Failed - name miss cache not bounded')
+
+    missDictionary.close()
+
+def TestCompiledDictionary() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    dictionaryPath = symbolDictionary.getDictionaryPath()
+    FileCache.CACHE_DIRECTORY = tempfile.mkdtemp()
+
+    try :
+        compiledDictionary = SymbolDictionary.SymbolDictionary(dictionaryPath, False, 0, 0, True)
+        if not compiledDictionary.isCompiled() :
+            raise Exception('Test Failed - dictionary not compiled')
+
+        fileDictionary = SymbolDictionary.SymbolDictionary(dictionaryPath, False, 0, 0)
+
+        sqliteCursor = fileDictionary.getConnection().cursor()
+        sqliteCursor.execute("select SymbolId from SymbolInfo")
+        sics2Check = [sqliteRow[0] for sqliteRow in sqliteCursor]
+        sics2Check = sics2Check + ["GHGPOLAGS-****X", "SUGPU----------", "XXXXXXXXXXXXXXX"]
+
+        for sic in sics2Check :
+            expected = repr(fileDictionary.lookup(sic))
+            actual = repr(compiledDictionary.lookup(sic))
+            if actual != expected :
+                print "SIC: " + sic + ", expected: " + expected + ", compiled returned: " + actual
+                raise Exception('Test Failed - compiled lookup differs')
+
+        print "Compiled dictionary matched for " + str(len(sics2Check)) + " SIDCs"
+
+        # A compiled file made from another version of the .dat must be rebuilt
+        compiledFile = CompiledDictionary.getCompiledFileName(dictionaryPath)
+        CompiledDictionary.compileDictionary(fileDictionary.getConnection(), b"0" * 20, compiledFile)
+
+        rebuiltDictionary = SymbolDictionary.SymbolDictionary(dictionaryPath, False, 0, 0, True)
+        if not rebuiltDictionary.compiled.isCompiledFrom(FileCache.fileHash(dictionaryPath)) :
+            raise Exception('Test Failed - stale compiled dictionary used')
+
+        compiledDictionary.compiled.close()
+        rebuiltDictionary.compiled.close()
+        fileDictionary.close()
+    finally :
+        shutil.rmtree(FileCache.CACHE_DIRECTORY, True)
+        FileCache.CACHE_DIRECTORY = None
+
+def TestThreadSafety() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    THREAD_COUNT = 16
+    LOOKUPS_PER_THREAD = 500
+
+    sqliteCursor = symbolDictionary.getConnection().cursor()
+    sqliteCursor.execute("select SymbolId from SymbolInfo")
+    sics2Check = [sqliteRow[0] for sqliteRow in sqliteCursor][0:200]
+    sqliteCursor.execute("select distinct UPPER(Name) from SymbolInfo where Name is not null")
+    names2Learn = [sqliteRow[0] for sqliteRow in sqliteCursor][0:THREAD_COUNT * 20]
+
+    expected = dict([(sic, symbolDictionary.symbolIdToGeometryType(sic)) for sic in sics2Check])
+
+    for hydrate in [False, True] :
+        # a small cache, so the threads keep going back to the tables
+        sharedDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath(), \
+            hydrate, 50, threadSafe = True)
+        errors = []
+
+        def worker(threadIndex) :
+            try :
+                for i in range(LOOKUPS_PER_THREAD) :
+                    sic = sics2Check[(threadIndex * 7 + i) % len(sics2Check)]
+                    if sharedDictionary.symbolIdToGeometryType(sic) != expected[sic] :
+                        errors.append("Wrong geometry type for " + sic)
+                # every thread learns its own names
+                for name in names2Learn[threadIndex::THREAD_COUNT] :
+                    sharedDictionary.SymbolNametoSymbolID(name)
+            except Exception as ex :
+                errors.append(str(ex))
+
+        threads = [threading.Thread(target = worker, args = (threadIndex,)) \
+                   for threadIndex in range(THREAD_COUNT)]
+        for thread in threads :
+            thread.start()
+        for thread in threads :
+            thread.join()
+
+        sharedDictionary.close()
+
+        if len(errors) > 0 :
+            print "Thread errors: " + str(errors[0:5])
+            raise Exception('Test Failed - errors in threads')
+
+        statistics = sharedDictionary.getCacheStatistics()
+        print "Shared cache statistics: " + str(sharedDictionary.getLookupCache())
+        if statistics['hits'] + statistics['misses'] != THREAD_COUNT * LOOKUPS_PER_THREAD :
+            raise Exception('Test Failed - lost cache statistic updates')
+
+        for name in names2Learn :
+            if not (name in sharedDictionary.nameToSIC) :
+                raise Exception('Test Failed - learned name lost: ' + name)
+
+def TestLearnedNames() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    dictionaryPath = symbolDictionary.getDictionaryPath()
+    FileCache.CACHE_DIRECTORY = tempfile.mkdtemp()
+    maxLearnedNames = SymbolDictionary.MAX_LEARNED_NAMES
+
+    try :
+        names2Learn = ["Aim Point H", "Main Attack", "Task - Screen"]
+
+        firstRun = SymbolDictionary.SymbolDictionary(dictionaryPath, learnedNames = True)
+        sidcs = [firstRun.SymbolNametoSymbolID(name) for name in names2Learn]
+        if firstRun.saveLearnedNames() != len(names2Learn) :
+            raise Exception('Test Failed - learned names not saved')
+
+        # the next run starts with them
+        secondRun = SymbolDictionary.SymbolDictionary(dictionaryPath, learnedNames = True)
+        for name, sidc in zip(names2Learn, sidcs) :
+            if secondRun.nameToSIC.get(name.upper()) != sidc :
+                raise Exception('Test Failed - learned name not loaded: ' + name)
+            if secondRun.SymbolNametoSymbolID(name) != sidc :
+                raise Exception('Test Failed - loaded name returns another SIDC: ' + name)
+
+        # capped to the newest names
+        SymbolDictionary.MAX_LEARNED_NAMES = 2
+        if secondRun.saveLearnedNames() != 2 :
+            raise Exception('Test Failed - learned names not capped')
+        SymbolDictionary.MAX_LEARNED_NAMES = maxLearnedNames
+
+        # names learned from another version of the dictionary are ignored
+        otherVersion = SymbolDictionary.SymbolDictionary(dictionaryPath)
+        otherVersion.dictionaryHash = b"0" * 20
+        if otherVersion.loadLearnedNames() != 0 :
+            raise Exception('Test Failed - stale learned names loaded')
+
+        # and invalidated on request
+        secondRun.clearLearnedNames()
+        if os.path.exists(secondRun.getLearnedNamesFile()) or ("MAIN ATTACK" in secondRun.nameToSIC) :
+            raise Exception('Test Failed - learned names not cleared')
+    finally :
+        SymbolDictionary.MAX_LEARNED_NAMES = maxLearnedNames
+        shutil.rmtree(FileCache.CACHE_DIRECTORY, True)
+        FileCache.CACHE_DIRECTORY = None
+
+def TestNameSuffixChecks() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    # must give the same answers as the regular expressions they replaced
+    checks = [(symbolDictionary.endsInAffilationString, ".* [FHNU]$"), \
+              (symbolDictionary.endsInLeft, ".*LEFT$"), \
+              (symbolDictionary.endsInRight, ".*RIGHT$"), \
+              (symbolDictionary.endsInSafe, ".*\(SAFE\)$"), \
+              (symbolDictionary.endsInPAA, ".*\(PAA\)$"), \
+              (symbolDictionary.endsInCircular, ".*CIRCULAR$"), \
+              (symbolDictionary.endsInRectangular, ".*RECTANGULAR$"), \
+              (symbolDictionary.endsInIrregular, ".*IRREGULAR$"), \
+              (symbolDictionary.startsWithTaskScreen, "^(TASK - SCREEN).*")]
+
+    names = ["Infantry H", "Infantry h", " F", "F", "Infantry HQ", "Infantry  U", "Boundary Left", \
+             "Boundary left", "Left Boundary", "Boundary Right", "Area (SAFE)", "Area (safe) ", \
+             "Point (PAA)", "(PAA)", "Target Circular", "Target Rectangular", "Target Irregular", \
+             "Task - Screen", "task - screen Left", "Task Screen", "", "X"]
+
+    for check, regex in checks :
+        for name in names :
+            if check(name) != bool(re.match(regex, name.upper())) :
+                raise Exception('Test Failed - ' + check.__name__ + ' differs for: ' + name)
+
+def TestRuleIdCache() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    ruleDictionary = SymbolDictionary.SymbolDictionary(symbolDictionary.getDictionaryPath())
+
+    # stands in for initializeRulesByMilitaryFeatures (needs a Military Features layer)
+    ruleDictionary.RuleID2Name = dict([(1, "Main Attack"), (2, "Screen"), (3, "Infantry")])
+    ruleDictionary.Name2RuleID = dict([(name, ruleId) for ruleId, name in ruleDictionary.RuleID2Name.items()])
+
+    expected = [("GFGPOLAGS-****X", 1), ("GFTPS-----****X", 2), ("SHGPUCI----D---", 3), \
+                ("SFGPUCI----E---", 3), ("XXXXXXXXXXXXXXX", -1)]
+
+    for i in range(2) :
+        for sic, expectedRuleId in expected :
+            ruleId, symbolName = ruleDictionary.symbolIdToRuleId(sic)
+            print "SIC: " + sic + ", RuleId: " + str(ruleId) + ", Name: " + str(symbolName)
+            if ruleId != expectedRuleId :
+                raise Exception('Test Failed - wrong RuleId for ' + sic)
+
+    # the second pass is all cache hits
+    statistics = ruleDictionary.getRuleIdCache().getStatistics()
+    if (statistics['misses'] != len(expected)) or (statistics['hits'] != len(expected)) :
+        raise Exception('Test Failed - rule IDs not cached')
+
+    ruleDictionary.close()
+
+def TestDomainCatalog() :
+
+    # stands in for arcpy (ListDomains needs a real geodatabase), counts the reads
+    class Domain(object) :
+        def __init__(self, name, domainType, codedValues) :
+            self.name = name
+            self.domainType = domainType
+            self.codedValues = codedValues
+
+    class StandInDa(object) :
+        def __init__(self) :
+            self.listCount = 0
+        def ListDomains(self, gdbPath) :
+            self.listCount += 1
+            return [Domain("ruleid", "CodedValue", dict([(2, "Screen"), (1, "Main Attack")])), \
+                    Domain("echelon", "CodedValue", dict([(15, "Battalion")])), \
+                    Domain("range", "Range", dict())]
+
+    class StandInArcpy(object) :
+        def __init__(self) :
+            self.da = StandInDa()
+
+    standIn = StandInArcpy()
+    gdbPath = os.path.join(tempfile.mkdtemp(), "test.gdb")
+    os.mkdir(gdbPath)
+    FileCache.CACHE_DIRECTORY = tempfile.mkdtemp()
+
+    try :
+        catalog = DomainCatalog.DomainCatalog(gdbPath, standIn)
+        if catalog.getCodedValues("ruleid") != [(1, "Main Attack"), (2, "Screen")] :
+            raise Exception('Test Failed - wrong coded values')
+        if (catalog.getDescription("echelon", 15) != "Battalion") or \
+            (catalog.getDescription("echelon", 16) is not None) or catalog.hasDomain("range") :
+            raise Exception('Test Failed - wrong descriptions')
+        if (standIn.da.listCount != 1) or catalog.loadedFromCache :
+            raise Exception('Test Failed - domains not read in one pass')
+
+        # the next run reads them from the cache file
+        nextRun = DomainCatalog.DomainCatalog(gdbPath, standIn)
+        if (nextRun.getDescription("ruleid", 2) != "Screen") or not nextRun.loadedFromCache or \
+            (standIn.da.listCount != 1) :
+            raise Exception('Test Failed - domains not cached')
+
+        # and read again once the geodatabase is edited
+        editedFile = os.path.join(gdbPath, "a00000001.gdbtable")
+        open(editedFile, "w").close()
+        os.utime(editedFile, (catalog.modifiedTime + 10, catalog.modifiedTime + 10))
+        nextRun.reloadIfModified()
+        if (standIn.da.listCount != 2) or nextRun.loadedFromCache :
+            raise Exception('Test Failed - domains not reloaded after an edit')
+
+    finally :
+        shutil.rmtree(os.path.dirname(gdbPath), True)
+        shutil.rmtree(FileCache.CACHE_DIRECTORY, True)
+        FileCache.CACHE_DIRECTORY = None
+
+def TestSymbolIdCode() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    code = SymbolIdCode.decode("SHGPUCI----D---")
+    fields = [code.scheme, code.affiliation, code.battleDimension, code.status, \
+              code.functionId, code.symbolModifier, code.country, code.orderOfBattle]
+    if (fields != ["S", "H", "G", "P", "UCI---", "-D", "--", "-"]) or \
+        (code.toString() != "SHGPUCI----D---") or (code.getMaskedId() != "SHGPUCI---") :
+        raise Exception('Test Failed - SIDC not decoded')
+
+    if SymbolIdCode.replaceSymbolModifier("SFGPUCI--------", "-E") != "SFGPUCI----E---" :
+        raise Exception('Test Failed - echelon not set')
+
+    if SymbolIdCode.numpy is None :
+        print "numpy not found, skipping the SIDC array tests"
+        return
+
+    # the array version must mask the SIDCs the same way as one at a time
+    sidcs = ["SHGPUCI----D---", "sfgpuci----e---", "GFGPOLAGS-****X", "SJGPUCI--------", \
+             "SXGPUCI--------", "short", "", "GPGPOLAGS-****X"]
+    records = SymbolIdCode.decodeArray(sidcs)
+    maskedIds = SymbolIdCode.getMaskedIds(records).tolist()
+    for sidc, maskedId in zip(sidcs, maskedIds) :
+        if maskedId != symbolDictionary.getMaskedSymbolIdFirst10(sidc) :
+            raise Exception('Test Failed - wrong masked ID for: ' + sidc)
+
+    if SymbolIdCode.encodeArray(records).tolist()[2] != "GFGPOLAGS-****X" :
+        raise Exception('Test Failed - SIDC not encoded')
+
+    groups = SymbolIdCode.groupIndexes(records, "scheme")
+    if (groups["S"].tolist() != [0, 1, 3, 4, 5]) or (groups["G"].tolist() != [2, 7]) :
+        raise Exception('Test Failed - SIDCs not grouped')
+
+    # validation must agree with isValidSidc, the keys with getMaskedSymbolIdFirst10
+    sidcs = sidcs + ["SFGPUCI----D---X", "SFGPUCI----D--", "SFGPUCI----D--Q", "SFGPUCI*---D---", \
+                     "GFGPOLAGS-----X", "EFGPUCI----D---", "SFGPUCI----1---", "OFGPUCI----D--A"]
+    valid, maskedIds, normalizedIds = SymbolIdCode.validateAndMaskArray(sidcs)
+    for sidc, isValid, maskedId, normalizedId in zip(sidcs, valid.tolist(), maskedIds.tolist(), normalizedIds.tolist()) :
+        if isValid != symbolDictionary.isValidSidc(sidc) :
+            raise Exception('Test Failed - validation differs for: ' + sidc)
+        if maskedId != symbolDictionary.getMaskedSymbolIdFirst10(sidc) :
+            raise Exception('Test Failed - wrong masked ID for: ' + sidc)
+        if normalizedId != sidc.upper().replace("*", "-")[0:15] :
+            raise Exception('Test Failed - wrong normalized SIDC for: ' + sidc)
+
+def createTestDictionary(dictionaryFile, rows) :
+    # a dictionary with just the SymbolInfo rows (ID, Name, GeometryType) given
+    connection = sqlite3.connect(dictionaryFile)
+    connection.execute("CREATE TABLE SymbolInfo (ID TEXT, SymbolId TEXT, StyleFile TEXT, Category TEXT, GeometryType TEXT, Name TEXT)")
+    connection.executemany("INSERT INTO SymbolInfo VALUES (?, ?, '', '', ?, ?)", \
+        [(row[0], row[0] + "-----", row[2], row[1]) for row in rows])
+    connection.commit()
+    connection.close()
+
+def TestSymbolCrosswalk() :
+
+    testDirectory = tempfile.mkdtemp()
+    FileCache.CACHE_DIRECTORY = testDirectory
+
+    try :
+        sourceFile = os.path.join(testDirectory, "Source.dat")
+        targetFile = os.path.join(testDirectory, "Target.dat")
+        createTestDictionary(sourceFile, [("SFGPUCI---", "Infantry F", "P"), ("SHGPUCI---", "Infantry H", "P"), \
+                                          ("GFGPOLAGS-", "Main Attack", "L"), ("GFGPGPP---", "Point", "P"), \
+                                          ("SFGPUCR---", "Recon F", "P")])
+        createTestDictionary(targetFile, [("SFGPUCII--", "INFANTRY  F", "P"), ("SHGPUCII--", "Infantry H", "P"), \
+                                          ("GFGPOLAGM-", "Main Attack", "L"), ("GHGPOLAGM-", "Main Attack", "L"), \
+                                          ("GFGPGPP---", "Point Of Interest", "P"), ("GFGPOLAGS-", "Main Attack", "A")])
+
+        crosswalk = SymbolCrosswalk.SymbolCrosswalk(sourceFile, targetFile)
+        expected = [("SFGPUCI----D---", "SFGPUCII---D---"), # name match, echelon kept
+                    ("SJGAUCI----E---", "SJGAUCII---E---"), # affiliation & status kept
+                    ("GHGPOLAGS-****X", "GHGPOLAGM-****X"), # only the F version is in the dictionary
+                    ("gfgpolags-****x", "GFGPOLAGM-****X"), # same affiliation wins, any case
+                    ("GFGPGPP-------X", "GFGPGPP-------X"), # same ID & geometry
+                    ("SFGPUCR--------", None), ("SFGPU", None)]
+        for sidc, expectedSidc in expected :
+            translatedSidc = crosswalk.translateSidc(sidc)
+            print "SIC: " + sidc + ", translated: " + str(translatedSidc)
+            if translatedSidc != expectedSidc :
+                raise Exception('Test Failed - wrong translation of ' + sidc)
+
+        # built once, the next one comes from the cache
+        if crosswalk.loadedFromCache or not SymbolCrosswalk.SymbolCrosswalk(sourceFile, targetFile).loadedFromCache :
+            raise Exception('Test Failed - crosswalk not cached')
+
+        # message files are rewritten with only the SIDCs changed
+        inputFile = os.path.join(testDirectory, "messages.xml")
+        outputFile = os.path.join(testDirectory, "translated.xml")
+        messages = "<geomessages>\n<geomessage><sic>%s</sic><_id>1</_id></geomessage>\n" \
+            + "<geomessage><sic> %s </sic><_id>2</_id></geomessage>\n</geomessages>\n"
+        with open(inputFile, "w") as messageFile :
+            messageFile.write(messages % ("SFGPUCI----D---", "SFGPUCR--------"))
+
+        translatedCount, untranslated = crosswalk.translateMessageFile(inputFile, outputFile)
+        with open(outputFile, "r") as messageFile :
+            translatedMessages = messageFile.read()
+        if (translatedCount != 1) or (untranslated != set(["SFGPUCR--------"])) or \
+            (translatedMessages != messages % ("SFGPUCII---D---", "SFGPUCR--------")) :
+            raise Exception('Test Failed - message file not translated')
+
+    finally :
+        shutil.rmtree(testDirectory, True)
+        FileCache.CACHE_DIRECTORY = None
+
+def TestDictionaryReload() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    testDirectory = tempfile.mkdtemp()
+    FileCache.CACHE_DIRECTORY = testDirectory
+    dictionaryFile = os.path.join(testDirectory, os.path.basename(symbolDictionary.getDictionaryPath()))
+    shutil.copyfile(symbolDictionary.getDictionaryPath(), dictionaryFile)
+
+    sic = "SFGPUCI----D---"
+    try :
+        modes = [("file", dict()), ("hydrated", dict([("hydrate", True)])), ("compiled", dict([("compiled", True)]))]
+        dictionaries = []
+        for mode, options in modes :
+            dictionaries.append(SymbolDictionary.SymbolDictionary(dictionaryFile, reloadInterval = 0, **options))
+        throttled = SymbolDictionary.SymbolDictionary(dictionaryFile, True, reloadInterval = 3600)
+
+        originalName = symbolDictionary.symbolIdToName(sic)
+        for reloadDictionary in dictionaries + [throttled] :
+            if reloadDictionary.symbolIdToName(sic) != originalName :
+                raise Exception('Test Failed - wrong name before the update')
+
+        # update the dictionary file (as a new version would)
+        connection = sqlite3.connect(dictionaryFile)
+        connection.execute("UPDATE SymbolInfo SET Name = 'Reloaded Infantry' WHERE ID = ?", \
+                           (symbolDictionary.getMaskedSymbolIdFirst10(sic),))
+        connection.commit()
+        connection.close()
+        fileTime = os.path.getmtime(dictionaryFile) + 10
+        os.utime(dictionaryFile, (fileTime, fileTime))
+
+        for (mode, options), reloadDictionary in zip(modes, dictionaries) :
+            if reloadDictionary.symbolIdToName(sic) != "Reloaded Infantry" :
+                raise Exception('Test Failed - ' + mode + ' dictionary not reloaded')
+
+        # only checked every reloadInterval seconds (unless forced)
+        if throttled.symbolIdToName(sic) != originalName :
+            raise Exception('Test Failed - reload check not throttled')
+        if (not throttled.checkForUpdates(True)) or (throttled.symbolIdToName(sic) != "Reloaded Infantry") :
+            raise Exception('Test Failed - forced reload failed')
+
+        # a new mtime alone (same contents) doesn't reload
+        os.utime(dictionaryFile, (fileTime + 10, fileTime + 10))
+        if throttled.checkForUpdates(True) :
+            raise Exception('Test Failed - reloaded an unchanged dictionary')
+
+        for reloadDictionary in dictionaries + [throttled] :
+            reloadDictionary.close()
+
+    finally :
+        shutil.rmtree(testDirectory, True)
+        FileCache.CACHE_DIRECTORY = None
+
+def TestTableArrays() :
+
+    if (symbolDictionary is None) :
+        raise Exception('Null SymbolDictionary')
+
+    if DictionaryArrays.numpy is None :
+        print "numpy not found, skipping the table array tests"
+        return
+
+    tableArrays = symbolDictionary.getTableArrays()
+    ids = tableArrays.symbolInfo["ID"]
+    if (len(tableArrays) == 0) or (ids[:-1] > ids[1:]).any() :
+        raise Exception('Test Failed - table arrays not sorted by ID')
+
+    # one call must give the same answers as lookup() for each SIDC
+    sidcs = ["GFGPOLAGS-****X", "GHGPOLAGS-****X", "SHGPUCI----D---", "sfgpuci----e---", \
+             "GHMPOGL-----USG", "GHGPGAY-------X", "XXXXXXXXXXXXXXX", "short", "SUGPU----------"]
+    results = symbolDictionary.lookupArray(sidcs)
+    gcts = DictionaryArrays.getGctNames(results["GctCode"])
+    for i, sidc in enumerate(sidcs) :
+        record = symbolDictionary.lookup(sidc)
+        geometryType = SymbolDictionary.getGeometryStringFromGeometryChar(results["GeometryType"][i])
+        if (bool(results["Found"][i]) != record.Found) or (geometryType != record.GeometryType) or \
+            (gcts[i] != record.GCT) :
+            raise Exception('Test Failed - array lookup differs for: ' + sidc)
+        if record.Found and (tableArrays.symbolInfo["Name"][results["Index"][i]] != record.Name) :
+            raise Exception('Test Failed - wrong row for: ' + sidc)
+
 def CustomTest():
     if (symbolDictionary is None) :
         raise Exception('Null SymbolDictionary')
@@ -139,6 +895,26 @@ def RunTests2525() :
     TestNameSicMapping()
     TestNameSicMappingExt()
     TestSimpleDictionaryGeometryException()
+    TestConnectionReuse()
+    TestReadOnlyConnection()
+    TestContextManager()
+    TestHydratedLookups()
+    TestLookupCacheStatistics()
+    TestSymbolRecordLookup()
+    TestLookupMany()
+    TestPrewarm()
+    TestNameIndex()
+    TestMissCache()
+    TestCompiledDictionary()
+    TestThreadSafety()
+    TestLearnedNames()
+    TestNameSuffixChecks()
+    TestRuleIdCache()
+    TestDomainCatalog()
+    TestSymbolIdCode()
+    TestSymbolCrosswalk()
+    TestDictionaryReload()
+    TestTableArrays()
 
 def RunTestsAPP6() :
     
@@ -163,6 +939,33 @@ def RunTestsAPP6() :
     TestSicNameMappingApp6()
     TestNameSicMappingApp6()
     
+def TestStandardRegistry() :
+
+    # One dictionary/converter per standard, kept when switching between them
+    dictionary2525 = MilitaryUtilities.getSymbolDictionaryStandard("2525")
+    converter2525 = MilitaryUtilities.getGeometryConverterStandard("2525")
+    dictionaryApp6 = MilitaryUtilities.getSymbolDictionaryStandard("APP6")
+    converterApp6 = MilitaryUtilities.getGeometryConverterStandard("APP6")
+
+    if (dictionary2525 is dictionaryApp6) or (dictionaryApp6.getSymbologyStandard() != "APP6") :
+        raise Exception('Test Failed - standards share a dictionary')
+
+    if (converter2525.getSymbolDictionary() is not dictionary2525) or \
+        (converterApp6.getSymbolDictionary() is not dictionaryApp6) :
+        raise Exception('Test Failed - converter uses the wrong dictionary')
+
+    for i in range(3) :
+        if (MilitaryUtilities.getSymbolDictionaryStandard("2525") is not dictionary2525) or \
+            (MilitaryUtilities.getGeometryConverter() is not converter2525) or \
+            (MilitaryUtilities.getSymbolDictionaryStandard("APP6B") is not dictionaryApp6) or \
+            (MilitaryUtilities.getGeometryConverter() is not converterApp6) :
+            raise Exception('Test Failed - dictionary recreated when switching standards')
+
+    # and they are recreated after the registry is cleared
+    MilitaryUtilities.clearRegistry()
+    if MilitaryUtilities.getSymbolDictionaryStandard("2525") is dictionary2525 :
+        raise Exception('Test Failed - registry not cleared')
+
 try:
 
     print("Starting Test: TestSymbolDictionary")    
@@ -171,9 +974,18 @@ try:
     # assumes it is run from the current dir & exists at this relative location  
     sys.path.append('../../../toolboxes/scripts') 
     import MilitaryUtilities
+    import SymbolDictionary
+    import DictionaryConstants
+    import CompiledDictionary
+    import FileCache
+    import DomainCatalog
+    import SymbolIdCode
+    import SymbolCrosswalk
+    import DictionaryArrays
         
     RunTests2525()
     RunTestsAPP6()
+    TestStandardRegistry()
             
     print "Test Successful"    
 
@@ -23,6 +23,7 @@ import traceback
 import arcpy
 import MilitaryUtilities
 import DictionaryConstants
+import DomainCatalog
 
 ### Params:
 ### 0 - inputFC
@@ -111,8 +112,6 @@ try :
         
         raise arcpy.ExecuteError()
         
-    CODE_FIELD_NAME = "code"
-    DESCRIPTION_FIELD_NAME = "description"
     fieldNameToDomainName = {}
 
     symbolNameFieldName = "symbolname"
@@ -132,18 +131,15 @@ try :
             # Get domain if any
             if (field.domain is not None and field.domain != ""):
                 fieldNameToDomainName[field.name] = field.domain
-                if arcpy.Exists("in_memory/" + field.domain):
-                    arcpy.Delete_management("in_memory/" + field.domain)
-                try:
-                    #If path is feature class
-                    arcpy.DomainToTable_management(desc.path, field.domain,
-                                                   "in_memory/" + field.domain,
-                                                   CODE_FIELD_NAME, DESCRIPTION_FIELD_NAME)
-                except:
-                    #If path is feature dataset
-                    arcpy.DomainToTable_management(arcpy.Describe(desc.path).path, field.domain,
-                                                   "in_memory/" + field.domain,
-                                                   CODE_FIELD_NAME, DESCRIPTION_FIELD_NAME)
+
+    # code -> description maps of the domains (path is the gdb or a feature dataset in it)
+    domainPath = desc.path
+    if domainPath.find(".gdb") >= 0 :
+        domainPath = DomainCatalog.getGeodatabasePath(domainPath)
+    elif arcpy.Describe(domainPath).dataType == "FeatureDataset" :
+        # SDE/personal geodatabases: the domains are in the workspace of the feature dataset
+        domainPath = arcpy.Describe(domainPath).path
+    domainCatalog = DomainCatalog.getDomainCatalog(domainPath)
         
     with arcpy.da.UpdateCursor(inputFC, updatefields) as cursor:
         for row in cursor:
@@ -152,10 +148,9 @@ try :
             echelonString = ""
             if (symbolNameFieldName in fieldNameToDomainName):
                 domain = fieldNameToDomainName[symbolNameFieldName]
-                whereClause = "%s = %s" % (CODE_FIELD_NAME, row[1])
-                domainRows = arcpy.SearchCursor("in_memory/" + domain, whereClause)
-                for domainRow in domainRows:
-                    symbolname = domainRow.getValue(DESCRIPTION_FIELD_NAME)
+                description = domainCatalog.getDescription(domain, row[1])
+                if description is not None:
+                    symbolname = description
                     # if (desc.shapeType == "Point" ) and (MilitaryUtilities.symbolDictionary.endsInAffilationString(symbolname)) :
                     # if (MilitaryUtilities.symbolDictionary.endsInAffilationString(symbolname)) :
                     # affiliationChar = symbolname[-1:]
@@ -167,11 +162,9 @@ try :
                 echelonString = row[2]
                 if (EchelonField in fieldNameToDomainName):
                     domain = fieldNameToDomainName[EchelonField]
-                    whereClause = "%s = %s" % (CODE_FIELD_NAME, row[2])
-                    domainRows = arcpy.SearchCursor("in_memory/" + domain, whereClause)
-                    for domainRow in domainRows:
-                        echelonString = domainRow.getValue(DESCRIPTION_FIELD_NAME)
-                        echelonString = echelonString.upper()
+                    description = domainCatalog.getDescription(domain, row[2])
+                    if description is not None:
+                        echelonString = description.upper()
 
             expectedGeometry = DictionaryConstants.getGeometryStringFromShapeType(desc.shapeType)
                         
@@ -198,6 +191,11 @@ try :
             # update the feature
             cursor.updateRow(row)
             
+    arcpy.AddMessage("Unmapped symbol names: " + str(symbolDictionary.getMissingNameCache()))
+
+    if MilitaryUtilities.PERSIST_LEARNED_SYMBOL_NAMES :
+        symbolDictionary.saveLearnedNames()
+
     # Set output
     arcpy.SetParameter(5, inputFC)            
 
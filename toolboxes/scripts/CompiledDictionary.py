@@ -0,0 +1,215 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# CompiledDictionary.py
+# Description: Compact binary copy of the dictionary lookup tables (SymbolInfo/LnAExceptions),
+#              memory-mapped and binary-searched by SIDC (no sqlite needed for lookups)
+#----------------------------------------------------------------------------------
+# File layout (little-endian):
+#   Header : magic, sha1 of the source .dat, record count, exception count,
+#            records offset, exceptions offset, string pool offset
+#   Records (sorted by ID) : ID (10 chars), geometry char, GCT code, name offset, name length
+#   Exceptions (sorted by Significant8Chars) : Significant8Chars (8 chars), GCT code
+#   String pool : the names (utf-8)
+# GCT codes are the indexes of DictionaryConstants.GCT_CODES (0 = no exception)
+#----------------------------------------------------------------------------------
+
+import mmap
+import struct
+import DictionaryConstants
+import FileCache
+
+COMPILED_EXTENSION = ".mfdict"
+
+MAGIC = b"MFDICT01"
+HEADER = struct.Struct("<8s20sIIIII")
+RECORD = struct.Struct("<10s1sBIH")
+EXCEPTION = struct.Struct("<8sB")
+
+ID_LENGTH = 10
+SIGNIFICANT_LENGTH = 8
+NO_NAME = 0xFFFFFFFF
+MAX_NAME_LENGTH = 0xFFFF
+UNKNOWN_GEOMETRY_CHAR = b"?"
+
+def getCompiledFileName(dictionaryFile) :
+    return FileCache.getCacheFileName(dictionaryFile, COMPILED_EXTENSION)
+
+def toKey(value, length) :
+    # Table/lookup value -> fixed width key bytes, or None if it can never match one
+    if value is None :
+        return None
+    try :
+        key = value.encode("ascii")
+    except (UnicodeError, AttributeError) :
+        return None
+    if len(key) != length :
+        return None
+    return key
+
+def getGctCode(gct) :
+    if not (gct in DictionaryConstants.GCT_CODES) :
+        raise ValueError("Conversion type has no code in DictionaryConstants.GCT_CODES: " + str(gct))
+    return DictionaryConstants.GCT_CODES.index(gct)
+
+def compileDictionary(connection, sourceHash, compiledFile) :
+    """
+    Writes the compiled form of the dictionary open on connection to compiledFile.
+    If an ID or Significant8Chars is repeated the first row is kept (the row the
+    sqlite lookups return).
+    """
+    sqliteCursor = connection.cursor()
+
+    sqliteCursor.execute("select Significant8Chars, GCT from LnAExceptions order by rowid")
+    gctCodes = {}
+    for sqliteRow in sqliteCursor :
+        significantKey = toKey(sqliteRow[0], SIGNIFICANT_LENGTH)
+        if (significantKey is not None) and not (significantKey in gctCodes) :
+            gctCodes[significantKey] = getGctCode(sqliteRow[1])
+
+    sqliteCursor.execute("select ID, Name, GeometryType from SymbolInfo order by rowid")
+    symbols = {}
+    for sqliteRow in sqliteCursor :
+        idKey = toKey(sqliteRow[0], ID_LENGTH)
+        if (idKey is not None) and not (idKey in symbols) :
+            symbols[idKey] = (sqliteRow[1], sqliteRow[2])
+
+    pool = []
+    poolSize = 0
+    records = []
+    for idKey in sorted(symbols.keys()) :
+        name, geometryType = symbols[idKey]
+
+        geometryChar = toKey(geometryType, 1)
+        if geometryChar is None :
+            geometryChar = UNKNOWN_GEOMETRY_CHAR
+
+        if name is None :
+            nameOffset, nameLength = NO_NAME, 0
+        else :
+            encodedName = name.encode("utf-8")
+            if len(encodedName) > MAX_NAME_LENGTH :
+                raise ValueError("Name too long to compile: " + name)
+            nameOffset, nameLength = poolSize, len(encodedName)
+            pool.append(encodedName)
+            poolSize += nameLength
+
+        gctCode = gctCodes.get(idKey[2:10], 0)
+        records.append(RECORD.pack(idKey, geometryChar, gctCode, nameOffset, nameLength))
+
+    exceptions = [EXCEPTION.pack(significantKey, gctCodes[significantKey]) \
+                  for significantKey in sorted(gctCodes.keys())]
+
+    recordsOffset = HEADER.size
+    exceptionsOffset = recordsOffset + (len(records) * RECORD.size)
+    poolOffset = exceptionsOffset + (len(exceptions) * EXCEPTION.size)
+
+    header = HEADER.pack(MAGIC, sourceHash, len(records), len(exceptions), \
+                         recordsOffset, exceptionsOffset, poolOffset)
+
+    FileCache.atomicWrite(compiledFile, b"".join([header] + records + exceptions + pool))
+
+    return len(records)
+
+class CompiledDictionary(object) :
+    """
+    Read-only view of a compiled dictionary file. The file is memory-mapped, so
+    opening it costs next to nothing and processes using the same file share its pages.
+    """
+
+    def __init__(self, compiledFile) :
+        self.compiledFile = compiledFile
+        self.file = open(compiledFile, "rb")
+        try :
+            self.data = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        except :
+            self.file.close()
+            raise
+
+        if len(self.data) < HEADER.size :
+            self.close()
+            raise ValueError("Not a compiled dictionary: " + compiledFile)
+
+        magic, self.sourceHash, self.recordCount, self.exceptionCount, \
+            self.recordsOffset, self.exceptionsOffset, self.poolOffset = \
+            HEADER.unpack(self.data[0:HEADER.size])
+
+        if (magic != MAGIC) or (len(self.data) < self.poolOffset) :
+            self.close()
+            raise ValueError("Not a compiled dictionary: " + compiledFile)
+
+    def __len__(self) :
+        return self.recordCount
+
+    def close(self) :
+        if self.data is not None :
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+    def isCompiledFrom(self, sourceHash) :
+        return self.sourceHash == sourceHash
+
+    def findKey(self, key, offset, size, count) :
+        # Binary search of the count entries (of size bytes, sorted by their leading key)
+        # starting at offset, returns the start of the matching entry or -1
+        keyLength = len(key)
+        low = 0
+        high = count
+        while low < high :
+            middle = (low + high) // 2
+            start = offset + (middle * size)
+            if self.data[start:start + keyLength] < key :
+                low = middle + 1
+            else :
+                high = middle
+
+        start = offset + (low * size)
+        if (low < count) and (self.data[start:start + keyLength] == key) :
+            return start
+        return -1
+
+    def getExceptionGct(self, lookupSic) :
+        significantKey = toKey(lookupSic[2:10], SIGNIFICANT_LENGTH)
+        if significantKey is None :
+            return None
+        start = self.findKey(significantKey, self.exceptionsOffset, EXCEPTION.size, self.exceptionCount)
+        if start < 0 :
+            return None
+        return DictionaryConstants.GCT_CODES[EXCEPTION.unpack(self.data[start:start + EXCEPTION.size])[1]]
+
+    def findSymbol(self, lookupSic, fallbackSic) :
+        """
+        Returns (lookupKey, found, name, geometryChar, gct), the SymbolRecord fields
+        for lookupSic, or its fallbackSic ('F' version) if lookupSic isn't in the table
+        """
+        for lookupKey in [lookupSic, fallbackSic] :
+            idKey = toKey(lookupKey, ID_LENGTH)
+            if idKey is None :
+                continue
+            start = self.findKey(idKey, self.recordsOffset, RECORD.size, self.recordCount)
+            if start < 0 :
+                continue
+
+            geometryChar, gctCode, nameOffset, nameLength = \
+                RECORD.unpack(self.data[start:start + RECORD.size])[1:]
+            name = None
+            if nameOffset != NO_NAME :
+                nameStart = self.poolOffset + nameOffset
+                name = self.data[nameStart:nameStart + nameLength].decode("utf-8")
+
+            return (lookupKey, True, name, geometryChar.decode("ascii"), \
+                    DictionaryConstants.GCT_CODES[gctCode])
+
+        return (lookupSic, False, None, None, self.getExceptionGct(lookupSic))
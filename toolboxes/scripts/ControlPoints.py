@@ -0,0 +1,165 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# ControlPoints.py
+# Description: The control points of a symbol as one flat array of doubles, parsed
+#              once from (and written once to) the "x,y;x,y" message format
+#----------------------------------------------------------------------------------
+
+from array import array
+
+POINT_SEPARATOR = ";"
+XY_SEPARATOR = ","
+
+def getStringFromXY(x, y) :
+    return str(x) + XY_SEPARATOR + str(y)
+
+class ControlPoints(object) :
+    """
+    x,y points held in one array('d') as x0, y0, x1, y1, ...
+    Indexed like a list of (x, y) tuples: points[0], points[-1], points[0:-1] (a slice
+    is a new ControlPoints). str() gives the message format "x,y;x,y" (see toString).
+    """
+
+    __slots__ = ["coordinates"]
+
+    def __init__(self, coordinates = None) :
+        if coordinates is None :
+            self.coordinates = array('d')
+        else :
+            self.coordinates = array('d', coordinates)
+
+    def __len__(self) :
+        return len(self.coordinates) // 2
+
+    def __iter__(self) :
+        # (x, y) of each point
+        coordinates = self.coordinates
+        for i in xrange(0, len(coordinates) - 1, 2) :
+            yield coordinates[i], coordinates[i + 1]
+
+    def __str__(self) :
+        return self.toString()
+
+    def __repr__(self) :
+        return "ControlPoints(" + self.toString() + ")"
+
+    def __eq__(self, other) :
+        return isinstance(other, ControlPoints) and (self.coordinates == other.coordinates)
+
+    def __ne__(self, other) :
+        return not self.__eq__(other)
+
+    def __getitem__(self, index) :
+        if isinstance(index, slice) :
+            return self.select(range(*index.indices(len(self))))
+        return self.getXY(index)
+
+    def getXY(self, index) :
+        if index < 0 :
+            index += len(self)
+        if (index < 0) or (index >= len(self)) :
+            raise IndexError("control point index out of range: " + str(index))
+        return self.coordinates[2 * index], self.coordinates[(2 * index) + 1]
+
+    def getXYOrOrigin(self, index) :
+        # 0, 0 past the last point (as getXYFromListAtIndex)
+        if index >= len(self) :
+            return 0, 0
+        return self.getXY(index)
+
+    def append(self, x, y) :
+        self.coordinates.append(x)
+        self.coordinates.append(y)
+
+    def appendXY(self, point) :
+        # append an (x, y) tuple, ex. points.appendXY(otherPoints[0])
+        self.coordinates.append(point[0])
+        self.coordinates.append(point[1])
+
+    def copy(self) :
+        return ControlPoints(self.coordinates)
+
+    def select(self, indexes) :
+        # new ControlPoints of the points at indexes, in that order
+        selected = ControlPoints()
+        for index in indexes :
+            selected.appendXY(self.getXY(index))
+        return selected
+
+    def reversed(self) :
+        return self.select(range(len(self) - 1, -1, -1))
+
+    def getExtent(self) :
+        # minx, miny, maxx, maxy (all nan if there are no points), the same
+        # answers as GeometryConverter.getmaxmin gives for the point strings
+        minx = float('nan')
+        miny = float('nan')
+        maxx = float('nan')
+        maxy = float('nan')
+
+        first = True
+        for x, y in self :
+            if first :
+                minx = x
+                miny = y
+                maxx = x
+                maxy = y
+                first = False
+            else :
+                if x > maxx :
+                    maxx = x
+                elif x < minx :
+                    minx = x
+                elif y > maxy :
+                    maxy = y
+                elif y < miny :
+                    miny = y
+
+        return minx, miny, maxx, maxy
+
+    def toStringList(self) :
+        # ["x,y", ...] for callers that still use point strings
+        return [getStringFromXY(x, y) for x, y in self]
+
+    def toString(self) :
+        return POINT_SEPARATOR.join(self.toStringList())
+
+def fromString(pointsString) :
+    # "x,y;x,y" -> ControlPoints, a point without an "x,y" pair is 0,0 (as getXYFromString)
+    return fromStringList(pointsString.split(POINT_SEPARATOR))
+
+def fromStringList(pointStrings) :
+    # ["x,y", ...] -> ControlPoints
+    controlPoints = ControlPoints()
+    coordinates = controlPoints.coordinates
+    for pointString in pointStrings :
+        xy = pointString.split(XY_SEPARATOR)
+        if len(xy) > 1 :
+            coordinates.append(float(xy[0]))
+            coordinates.append(float(xy[1]))
+        else :
+            coordinates.append(0.0)
+            coordinates.append(0.0)
+    return controlPoints
+
+def toControlPoints(points) :
+    # ControlPoints from any of the forms the scripts pass around: ControlPoints (returned
+    # as is), a "x,y;x,y" string or a list of "x,y" strings
+    if isinstance(points, ControlPoints) :
+        return points
+    elif isinstance(points, basestring) :
+        return fromString(points)
+    else :
+        return fromStringList(points)
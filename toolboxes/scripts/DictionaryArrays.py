@@ -0,0 +1,157 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# DictionaryArrays.py
+# Description: The dictionary lookup tables (SymbolInfo/LnAExceptions) as numpy
+#              structured arrays sorted by ID, to resolve many SIDCs at once
+#----------------------------------------------------------------------------------
+# GCT codes are the indexes of DictionaryConstants.GCT_CODES, the same codes as the
+# compiled dictionary (see CompiledDictionary). GeometryType is the SymbolInfo char
+# (P/L/A), see SymbolDictionary.getGeometryStringFromGeometryChar
+#----------------------------------------------------------------------------------
+
+import DictionaryConstants
+import SymbolIdCode
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+ID_LENGTH = SymbolIdCode.MASKED_LENGTH
+SIGNIFICANT_LENGTH = 8
+
+EXCEPTIONS_DTYPE = [("Significant8Chars", "S8"), ("GctCode", "u1")]
+
+# the result of lookup(): Index is the SymbolInfo row (-1 if not found)
+LOOKUP_DTYPE = [("Found", "?"), ("Index", "i4"), ("GeometryType", "S1"), ("GctCode", "u1")]
+
+# geometry char -> the conversion type of symbols with no line/area exception
+# (as SymbolDictionary.getDefaultConversionTypeForGeometryString)
+DEFAULT_GCTS = dict([('P', DictionaryConstants.GCT_POINT), \
+                     ('L', DictionaryConstants.GCT_POLYLINE), \
+                     ('A', DictionaryConstants.GCT_POLYGON)])
+
+def getSymbolInfoDtype(nameLength) :
+    return [("ID", "S10"), ("Name", "U" + str(max(nameLength, 1))), ("GeometryType", "S1"), ("GctCode", "u1")]
+
+def getGctCode(gct) :
+    if not (gct in DictionaryConstants.GCT_CODES) :
+        raise ValueError("Conversion type has no code in DictionaryConstants.GCT_CODES: " + str(gct))
+    return DictionaryConstants.GCT_CODES.index(gct)
+
+def getDefaultGctCode(geometryChar) :
+    return getGctCode(DEFAULT_GCTS.get(geometryChar, DictionaryConstants.GCT_INDETERMINATE))
+
+def getGctNames(gctCodes) :
+    # array of GCT codes -> array of the conversion type names
+    return numpy.array(DictionaryConstants.GCT_CODES, dtype = object)[gctCodes]
+
+def isFixedWidthKey(value, length) :
+    # the table values that can ever match a lookup key (ASCII, exactly length chars)
+    if value is None :
+        return False
+    try :
+        return len(value.encode("ascii")) == length
+    except (UnicodeError, AttributeError) :
+        return False
+
+def searchSorted(keys, values) :
+    # For each value its position in the sorted keys, -1 if it isn't there
+    if len(keys) == 0 :
+        return numpy.zeros(len(values), dtype = numpy.int32) - 1
+    positions = numpy.searchsorted(keys, values)
+    positions = numpy.minimum(positions, len(keys) - 1)
+    return numpy.where(keys[positions] == values, positions, -1).astype(numpy.int32)
+
+class DictionaryArrays(object) :
+    """
+    symbolInfo : SymbolInfo as a structured array (ID, Name, GeometryType, GctCode) sorted by ID,
+                 GctCode is the symbol's conversion type (its exception or the geometry default)
+    exceptions : LnAExceptions as a structured array (Significant8Chars, GctCode) sorted
+                 by Significant8Chars
+    If an ID (or Significant8Chars) is repeated the first row is kept, the row the
+    one-at-a-time lookups use. lookup() resolves a whole array of SIDCs with searchsorted.
+    """
+
+    def __init__(self, connection) :
+        if numpy is None :
+            raise ImportError("numpy is needed for the dictionary arrays")
+
+        sqliteCursor = connection.cursor()
+
+        sqliteCursor.execute("select Significant8Chars, GCT from LnAExceptions order by rowid")
+        gctCodes = {}
+        for sqliteRow in sqliteCursor :
+            if isFixedWidthKey(sqliteRow[0], SIGNIFICANT_LENGTH) and not (sqliteRow[0] in gctCodes) :
+                gctCodes[sqliteRow[0]] = getGctCode(sqliteRow[1])
+
+        sqliteCursor.execute("select ID, Name, GeometryType from SymbolInfo order by rowid")
+        symbols = {}
+        for sqliteRow in sqliteCursor :
+            if isFixedWidthKey(sqliteRow[0], ID_LENGTH) and not (sqliteRow[0] in symbols) :
+                symbols[sqliteRow[0]] = (sqliteRow[1] or u"", sqliteRow[2] or "")
+
+        nameLength = max([len(name) for name, geometryType in symbols.values()] + [1])
+        self.symbolInfo = numpy.array([(symbolId, name, geometryType, \
+            gctCodes.get(symbolId[2:10], getDefaultGctCode(geometryType))) \
+            for symbolId, (name, geometryType) in sorted(symbols.items())], \
+            dtype = getSymbolInfoDtype(nameLength))
+
+        self.exceptions = numpy.array(sorted(gctCodes.items()), dtype = EXCEPTIONS_DTYPE)
+
+    def __len__(self) :
+        return len(self.symbolInfo)
+
+    def findIds(self, maskedIds) :
+        # Row of each ("S10" array) masked ID, or its 'F' version, -1 if neither is in SymbolInfo
+        ids = self.symbolInfo["ID"]
+        indexes = searchSorted(ids, maskedIds)
+
+        missing = indexes < 0
+        if missing.any() :
+            fallbackBytes = maskedIds[missing].view(numpy.uint8).reshape(-1, ID_LENGTH).copy()
+            fallbackBytes[:, 1] = ord(SymbolIdCode.FALLBACK_AFFILIATION)
+            indexes[missing] = searchSorted(ids, fallbackBytes.view("S" + str(ID_LENGTH)).reshape(-1))
+
+        return indexes
+
+    def findGctCodes(self, maskedIds, defaultCode = 0) :
+        # Line/area exception code of each ("S10" array) masked ID, defaultCode if it has none
+        significantChars = numpy.ascontiguousarray(maskedIds).view(numpy.uint8).reshape(-1, ID_LENGTH)[:, 2:ID_LENGTH]
+        significantChars = numpy.ascontiguousarray(significantChars).view("S" + str(SIGNIFICANT_LENGTH)).reshape(-1)
+        positions = searchSorted(self.exceptions["Significant8Chars"], significantChars)
+        return numpy.where(positions >= 0, self.exceptions["GctCode"][positions], defaultCode).astype(numpy.uint8)
+
+    def lookup(self, symbolIds) :
+        """
+        Resolves a sequence of SIDCs at once, returns a LOOKUP_DTYPE array (one entry per SIDC):
+        Found, Index (SymbolInfo row, -1 if not found), GeometryType (char, "" if not found)
+        and GctCode, the same answers as SymbolDictionary.lookup (see getGctNames for the GCTs)
+        """
+        maskedIds = SymbolIdCode.getMaskedIds(SymbolIdCode.decodeArray(symbolIds))
+
+        indexes = self.findIds(maskedIds)
+        found = indexes >= 0
+
+        results = numpy.zeros(len(maskedIds), dtype = LOOKUP_DTYPE)
+        results["Found"] = found
+        results["Index"] = indexes
+        results["GeometryType"][found] = self.symbolInfo["GeometryType"][indexes[found]]
+        results["GctCode"][found] = self.symbolInfo["GctCode"][indexes[found]]
+        # not in SymbolInfo: only an exception gives these a conversion type
+        missing = ~found
+        results["GctCode"][missing] = self.findGctCodes(maskedIds[missing], \
+            getDefaultGctCode(None))
+        return results
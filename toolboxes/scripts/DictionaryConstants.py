@@ -94,6 +94,15 @@ GCT_TWOLINE              	= "GCT_TwoLine"
 GCT_TWOLINE3OR4PT        	= "GCT_TwoLine3Or4Pt"
 GCT_UORTSHAPE           	= "GCT_UOrTShape"
 
+# Fixed numbering of the conversion types for binary formats (index = code, 0 = not set)
+# IMPORTANT: only append to this list, existing codes must not change
+GCT_CODES = [None, GCT_POINT, GCT_POLYLINE, GCT_POLYGON, GCT_INDETERMINATE, GCT_ARROW, \
+    GCT_ARROWWITHOFFSET, GCT_ARROWWITHTAIL, GCT_CIRCLE, GCT_CIRCULAR, GCT_FREEHANDARROW, \
+    GCT_FREEHANDLINE, GCT_FREEHANDREVERSEARROW, GCT_FREEHANDU, GCT_HOOK, GCT_HORNS, \
+    GCT_OPENTRIANGLE, GCT_PARALLELLINES, GCT_PARALLELLINESMIDLINE, GCT_PARALLELLINESWITHTICKS, \
+    GCT_RECTANGULAR, GCT_RECTANGULAR1PT, GCT_T, GCT_TRIPLEARROW, GCT_TWOLINE, \
+    GCT_TWOLINE3OR4PT, GCT_UORTSHAPE]
+
 # Exclude these fields from copy/updates
 MILFEATURES_FIELD_EXCLUDE_LIST = ["shape", "Shape", "SHAPE", "objectid", "sort", "OBJECTID",\
     "messagetype", "sidc", "createdby", "editedby", "createdtime", "editedtime", "override",\
@@ -0,0 +1,169 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# DomainCatalog.py
+# Description: Code -> description maps of the coded value domains of a geodatabase,
+#              read in one pass (arcpy.da.ListDomains) and cached on disk between runs
+#----------------------------------------------------------------------------------
+
+import os
+import json
+import FileCache
+
+DOMAINS_EXTENSION = ".domains.json"
+DOMAINS_VERSION = 1
+CODED_VALUE_DOMAIN = "CodedValue"
+LOCK_FILE_EXTENSION = ".lock"
+
+# Path of the geodatabase -> DomainCatalog, so all tools in a process share one catalog
+catalogs = {}
+
+def getGeodatabasePath(dataPath) :
+    # The geodatabase a feature class/dataset path is in
+    # Note Bene: only works with FGDBs (assumes MilFeature only stored in these)
+    if dataPath.find(".gdb") < 0 :
+        return dataPath
+    return dataPath.split(".gdb")[0] + ".gdb"
+
+def getModifiedTime(gdbPath) :
+    # Newest modification time of the geodatabase (a file geodatabase is a folder of files),
+    # None if it can't be determined
+    if os.path.isdir(gdbPath) :
+        # not the folder's own time or the lock files, those change whenever it is just read
+        modifiedTime = 0.0
+        for fileName in os.listdir(gdbPath) :
+            if fileName.endswith(LOCK_FILE_EXTENSION) :
+                continue
+            try :
+                modifiedTime = max(modifiedTime, os.path.getmtime(os.path.join(gdbPath, fileName)))
+            except OSError :
+                pass
+        return modifiedTime
+    elif os.path.isfile(gdbPath) :
+        return os.path.getmtime(gdbPath)
+    else :
+        return None
+
+def getDomainCatalog(gdbPath, arcpyModule = None) :
+    key = os.path.normcase(os.path.abspath(gdbPath))
+    if not (key in catalogs) :
+        catalogs[key] = DomainCatalog(gdbPath, arcpyModule)
+    else :
+        # the geodatabase (and so maybe its domains) could have been edited since
+        catalogs[key].reloadIfModified()
+    return catalogs[key]
+
+class DomainCatalog(object) :
+    """
+    The coded value domains of one geodatabase: domain name -> (code -> description).
+    Replaces DomainToTable_management + a cursor per domain. The domains are read with
+    one arcpy.da.ListDomains call, or from the on-disk copy if the geodatabase has not
+    been modified since it was written.
+    arcpyModule is the arcpy to use (ex. a stand-in for tests), the real one if None.
+    """
+
+    def __init__(self, gdbPath, arcpyModule = None, useCache = True) :
+        self.gdbPath = gdbPath
+        self.arcpyModule = arcpyModule
+        self.useCache = useCache
+        self.codedValues = None # domain name -> [(code, description)], sorted by code
+        self.descriptions = None # domain name -> dict code -> description
+        self.modifiedTime = None
+        self.loadedFromCache = False
+
+    def getCacheFile(self) :
+        return FileCache.getCacheFileName(self.gdbPath, DOMAINS_EXTENSION)
+
+    def load(self) :
+        # (re)reads the domains, from the cache file if it is still current
+        modifiedTime = getModifiedTime(self.gdbPath)
+        codedValues = None
+
+        self.loadedFromCache = False
+        if self.useCache and (modifiedTime is not None) :
+            codedValues = self.readCache(modifiedTime)
+            self.loadedFromCache = codedValues is not None
+
+        if codedValues is None :
+            codedValues = self.readDomains()
+            if self.useCache and (modifiedTime is not None) :
+                self.writeCache(modifiedTime, codedValues)
+
+        self.modifiedTime = modifiedTime
+        self.codedValues = codedValues
+        self.descriptions = dict([(domainName, dict(values)) for domainName, values in codedValues.items()])
+
+    def reloadIfModified(self) :
+        if (self.codedValues is not None) and (getModifiedTime(self.gdbPath) != self.modifiedTime) :
+            self.load()
+
+    def readDomains(self) :
+        arcpyModule = self.arcpyModule
+        if arcpyModule is None :
+            import arcpy
+            arcpyModule = arcpy
+
+        codedValues = {}
+        for domain in arcpyModule.da.ListDomains(self.gdbPath) :
+            if domain.domainType == CODED_VALUE_DOMAIN :
+                codedValues[domain.name] = sorted(domain.codedValues.items())
+        return codedValues
+
+    def readCache(self, modifiedTime) :
+        cacheFile = self.getCacheFile()
+        if not os.path.isfile(cacheFile) :
+            return None
+
+        try :
+            with open(cacheFile, "r") as domainsFile :
+                cached = json.load(domainsFile)
+            if (cached.get("version") != DOMAINS_VERSION) or \
+                (cached.get("gdbPath") != os.path.abspath(self.gdbPath)) or \
+                (cached.get("modifiedTime") != modifiedTime) :
+                return None
+            return dict([(domainName, [(code, description) for code, description in values]) \
+                         for domainName, values in cached["domains"].items()])
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError) :
+            return None
+
+    def writeCache(self, modifiedTime, codedValues) :
+        cached = dict([("version", DOMAINS_VERSION), \
+                       ("gdbPath", os.path.abspath(self.gdbPath)), \
+                       ("modifiedTime", modifiedTime), \
+                       ("domains", codedValues)])
+        try :
+            FileCache.atomicWrite(self.getCacheFile(), json.dumps(cached).encode("utf-8"))
+        except (IOError, OSError) as ex :
+            # only costs the next run a ListDomains
+            print "Could not cache domains of " + self.gdbPath + " : " + str(ex)
+
+    def getDescriptionMaps(self) :
+        if self.descriptions is None :
+            self.load()
+        return self.descriptions
+
+    def getDomainNames(self) :
+        return sorted(self.getDescriptionMaps().keys())
+
+    def hasDomain(self, domainName) :
+        return domainName in self.getDescriptionMaps()
+
+    def getCodedValues(self, domainName) :
+        # [(code, description)] of the domain, sorted by code (empty if no such domain)
+        if self.codedValues is None :
+            self.load()
+        return self.codedValues.get(domainName, [])
+
+    def getDescription(self, domainName, code, default = None) :
+        return self.getDescriptionMaps().get(domainName, {}).get(code, default)
@@ -0,0 +1,82 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# FileCache.py
+# Description: Helpers for the files the tools derive from their inputs and keep
+#              between runs (ex. compiled dictionaries)
+#----------------------------------------------------------------------------------
+
+import os
+import hashlib
+import tempfile
+
+# Set this to keep the derived files somewhere else (ex. a shared/fast disk),
+# if None they go under the system temp directory
+CACHE_DIRECTORY = None
+CACHE_DIRECTORY_NAME = "MilitaryFeaturesCache"
+
+def getCacheDirectory() :
+    cacheDirectory = CACHE_DIRECTORY
+    if cacheDirectory is None :
+        cacheDirectory = os.path.join(tempfile.gettempdir(), CACHE_DIRECTORY_NAME)
+
+    if not os.path.isdir(cacheDirectory) :
+        try :
+            os.makedirs(cacheDirectory)
+        except OSError :
+            # another process may have just created it
+            if not os.path.isdir(cacheDirectory) :
+                raise
+
+    return cacheDirectory
+
+def getCacheFileName(sourceFile, extension) :
+    # Name for a file derived from sourceFile, the path hash keeps files from
+    # sources with the same name (ex. 2 copies of Mil2525C.dat) apart
+    sourcePath = os.path.normcase(os.path.abspath(sourceFile))
+    pathHash = hashlib.sha1(sourcePath.encode("utf-8")).hexdigest()[0:8]
+    baseName = os.path.splitext(os.path.basename(sourceFile))[0]
+    return os.path.join(getCacheDirectory(), baseName + "." + pathHash + extension)
+
+def fileHash(fileName) :
+    # sha1 of the file contents (binary digest)
+    sha = hashlib.sha1()
+    with open(fileName, "rb") as hashFile :
+        while True :
+            block = hashFile.read(1024 * 1024)
+            if not block :
+                break
+            sha.update(block)
+    return sha.digest()
+
+def atomicWrite(fileName, data) :
+    # Write to a temp file next to fileName then rename it into place, so readers
+    # (ex. other worker processes) never see a partly written file
+    directory = os.path.dirname(os.path.abspath(fileName))
+    handle, tempFileName = tempfile.mkstemp(dir = directory, suffix = ".tmp")
+    try :
+        with os.fdopen(handle, "wb") as tempFile :
+            tempFile.write(data)
+
+        try :
+            os.rename(tempFileName, fileName)
+        except OSError :
+            # Windows won't rename over an existing file
+            if os.path.exists(fileName) :
+                os.remove(fileName)
+            os.rename(tempFileName, fileName)
+    except :
+        if os.path.exists(tempFileName) :
+            os.remove(tempFileName)
+        raise
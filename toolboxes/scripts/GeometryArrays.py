@@ -0,0 +1,166 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# GeometryArrays.py
+# Description: The GeometryConverter point math (rotate, scale, angles, envelopes,
+#              circles) as numpy operations over many features at once
+#----------------------------------------------------------------------------------
+# Points are numpy arrays with x, y as the last axis: a point of each feature is (m, 2),
+# the points of m features with n points each (m, n, 2). Angles are in degrees and the
+# results are the same as the GeometryConverter functions of the same name give for
+# each feature.
+#----------------------------------------------------------------------------------
+
+import math
+import ControlPoints
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+def checkNumpy() :
+    if numpy is None :
+        raise ImportError("numpy is needed for the batch geometry conversions")
+
+def toPointsArray(controlPointsList, pointCount) :
+    # ControlPoints of m features (all with pointCount points) -> (m, pointCount, 2) array
+    coordinates = "".join([controlPoints.coordinates.tostring() for controlPoints in controlPointsList])
+    return numpy.frombuffer(coordinates, dtype = numpy.float64).reshape(len(controlPointsList), pointCount, 2)
+
+def toControlPoints(pointsArray) :
+    # (n, 2) array -> ControlPoints
+    controlPoints = ControlPoints.ControlPoints()
+    controlPoints.coordinates.fromstring(numpy.ascontiguousarray(pointsArray, dtype = numpy.float64).tostring())
+    return controlPoints
+
+def fromCoordinates(coordinates) :
+    # (n, 2) or flat x0, y0, x1, y1 ... array -> ControlPoints
+    return toControlPoints(numpy.asarray(coordinates, dtype = numpy.float64).reshape(-1))
+
+def perPoint(values) :
+    # a scalar or one value per feature, shaped to apply to the x and y of each point
+    values = numpy.asarray(values, dtype = numpy.float64)
+    if values.ndim == 0 :
+        return values
+    return values[..., numpy.newaxis]
+
+def makePoints(x, y) :
+    return numpy.concatenate((x[..., numpy.newaxis], y[..., numpy.newaxis]), axis = -1)
+
+def degreesToRadians(degrees) :
+    return (degrees * math.pi) / 180.0
+
+def radiansToDegrees(radians) :
+    return (radians * (180.0 / math.pi))
+
+def getLength(p0, p1) :
+    return numpy.sqrt((p1[..., 0] - p0[..., 0]) ** 2 + (p1[..., 1] - p0[..., 1]) ** 2)
+
+def getAngleFromY(p1, p2) :
+    return radiansToDegrees(numpy.arctan2(p2[..., 0] - p1[..., 0], p2[..., 1] - p1[..., 1]))
+
+def getAzimuth(p1, p2) :
+    azimuth = getAngleFromY(p1, p2)
+    return numpy.where(azimuth < 0.0, azimuth + 360.0, azimuth)
+
+def getIncline(p1, p2) :
+    # -1.0 or 1.0 for each feature, see GeometryConverter.getIncline
+    return numpy.where(getAngleFromY(p1, p2) >= 0.0, -1.0, 1.0)
+
+def scale(scaleFactor, p0, p1) : # Vector V0(p0)->V1(p1)
+    return (perPoint(scaleFactor) * (p1 - p0)) + p0
+
+def rotate(angle, p0, p1) : # rotate p1 about p0 by angle (degrees, scalar or per feature)
+    theta = degreesToRadians(numpy.asarray(angle, dtype = numpy.float64))
+
+    cosa = numpy.cos(theta)
+    sina = numpy.sin(theta)
+
+    dx = p1[..., 0] - p0[..., 0]
+    dy = p1[..., 1] - p0[..., 1]
+
+    xp = p0[..., 0] + (dx * cosa) - (dy * sina)
+    yp = p0[..., 1] + (dy * cosa) + (dx * sina)
+
+    return makePoints(xp, yp)
+
+def rotateAndScale(angle, scaleFactor, p0, p1) :
+    return scale(scaleFactor, p0, rotate(angle, p0, p1))
+
+def getMatrixArray(matrices) :
+    # [(a, b, c, d), ...] 2x2 matrices (see GeometryConverter.AffineTemplate) -> (2, 2k) array,
+    # so all k of them apply to a vector in one multiply
+    return numpy.array(matrices, dtype = numpy.float64).reshape(-1, 2).T.copy()
+
+def applyMatrices(matrixArray, p0, p1) :
+    # (m, k, 2): p0 + M * (p1 - p0) for each of the k matrices of matrixArray
+    derived = numpy.dot(p1 - p0, matrixArray).reshape(len(p0), -1, 2)
+    return derived + p0[:, numpy.newaxis]
+
+def getExtent(points) :
+    """
+    minx, miny, maxx, maxy arrays of (m, n, 2) points, all nan if n is 0.
+    Each point only updates one of the 4 (the same as ControlPoints.getExtent), so this
+    walks the points in order, each step over all of the features.
+    """
+    featureCount, pointCount = points.shape[0], points.shape[1]
+    if pointCount == 0 :
+        nan = numpy.empty(featureCount)
+        nan.fill(numpy.nan)
+        return nan, nan.copy(), nan.copy(), nan.copy()
+
+    minx = points[:, 0, 0].copy()
+    miny = points[:, 0, 1].copy()
+    maxx = minx.copy()
+    maxy = miny.copy()
+
+    for i in xrange(1, pointCount) :
+        x = points[:, i, 0]
+        y = points[:, i, 1]
+
+        updated = x > maxx
+        maxx = numpy.where(updated, x, maxx)
+
+        update = ~updated & (x < minx)
+        minx = numpy.where(update, x, minx)
+        updated |= update
+
+        update = ~updated & (y > maxy)
+        maxy = numpy.where(update, y, maxy)
+        updated |= update
+
+        update = ~updated & (y < miny)
+        miny = numpy.where(update, y, miny)
+
+    return minx, miny, maxx, maxy
+
+def getEnvelope(minx, miny, maxx, maxy) :
+    # (m, 4, 2): upper left, lower left, lower right, upper right
+    return numpy.concatenate((makePoints(minx, maxy)[:, numpy.newaxis], \
+                              makePoints(minx, miny)[:, numpy.newaxis], \
+                              makePoints(maxx, miny)[:, numpy.newaxis], \
+                              makePoints(maxx, maxy)[:, numpy.newaxis]), axis = 1)
+
+def getCirclePoints(centers, radii, startAzimuths, unitCircle) :
+    # (m, k, 2): the unit circle points (k, 2 array of sin, cos) rotated to the start azimuth
+    # (degrees) of each feature, scaled by its radius and moved to its center (m, 2)
+    theta = degreesToRadians(startAzimuths)
+    a = perPoint(radii * numpy.sin(theta))
+    b = perPoint(radii * numpy.cos(theta))
+    sina = unitCircle[:, 0]
+    cosa = unitCircle[:, 1]
+    x = centers[:, 0:1] + (a * cosa) + (b * sina)
+    y = centers[:, 1:2] + (b * cosa) - (a * sina)
+    return makePoints(x, y)
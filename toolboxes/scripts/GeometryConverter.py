@@ -18,12 +18,23 @@
 
 import SymbolDictionary
 import DictionaryConstants
+import ControlPoints
+import GeometryArrays
+import LookupCache
 import os
 import math
 import arcpy
 
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+# The point helpers below take the control points as ControlPoints or (as they used to)
+# a list of "x,y" strings, see ControlPoints.toControlPoints
+
 def getStringFromXY(x, y) : 
-    return str(x) + "," + str(y)
+    return ControlPoints.getStringFromXY(x, y)
 
 def getXYFromString(pointString) : 
     if "," in pointString : 
@@ -35,6 +46,8 @@ def getXYFromString(pointString) :
     return x, y
 
 def getXYFromListAtIndex(pointList, index) :
+    if isinstance(pointList, ControlPoints.ControlPoints) :
+        return pointList.getXYOrOrigin(index)
     if index >= len(pointList) :
         return 0, 0
     else :
@@ -43,32 +56,11 @@ def getXYFromListAtIndex(pointList, index) :
 
 def getmaxmin(pointList) :
 
-    minx = float('nan')
-    miny = float('nan')
-    maxx = float('nan')
-    maxy = float('nan')
-
-    if not (pointList is None ) : 
-        first = True
-        for point in pointList: 
-            x, y = getXYFromString(point)
-            if first :
-                minx = x
-                miny = y 
-                maxx = x
-                maxy = y
-                first = False
-            else :
-                if x > maxx :
-                    maxx = x
-                elif x < minx :
-                    minx = x
-                elif y > maxy :
-                    maxy = y
-                elif y < miny :
-                    miny = y
+    if pointList is None :
+        nan = float('nan')
+        return nan, nan, nan, nan
 
-    return minx, miny, maxx, maxy
+    return ControlPoints.toControlPoints(pointList).getExtent()
 
 def getEnvelopeLengthWidthCenterXY(pointList) :
     minx, miny, maxx, maxy = getmaxmin(pointList) 
@@ -84,33 +76,34 @@ def getEnvelopeLengthWidthCenterXY(pointList) :
 
     return length, width, centerX, centerY
 
+def getEnvelopeControlPoints(minx, miny, maxx, maxy) :
+    # upper left, lower left, lower right, upper right
+    return ControlPoints.ControlPoints([minx, maxy, minx, miny, maxx, miny, maxx, maxy])
+
 def getEnvelopeFromCenterXYLengthWidth(x, y, length, width) :
+    return getEnvelopeControlPointsFromCenterXYLengthWidth(x, y, length, width).toStringList()
+
+def getEnvelopeControlPointsFromCenterXYLengthWidth(x, y, length, width) :
 
     halfWidth  = width / 2.0
     halfLength = length / 2.0
 
-    bounding = []
-    bounding.append(getStringFromXY(x - halfWidth, y + halfLength)) # upper left
-    bounding.append(getStringFromXY(x - halfWidth, y - halfLength)) # lower left 
-    bounding.append(getStringFromXY(x + halfWidth, y - halfLength)) # lower right
-    bounding.append(getStringFromXY(x + halfWidth, y + halfLength)) # upper right
-
-    return bounding
+    return getEnvelopeControlPoints(x - halfWidth, y - halfLength, x + halfWidth, y + halfLength)
 
 def minimumBoundingEnvelope(pointList) :
+    bounding = minimumBoundingEnvelopeControlPoints(pointList)
+    if bounding is None :
+        return None
+    return bounding.toStringList()
+
+def minimumBoundingEnvelopeControlPoints(pointList) :
 
     minx, miny, maxx, maxy = getmaxmin(pointList) 
 
     if math.isnan(minx) or math.isnan(miny) or math.isnan(maxx) or math.isnan(maxy) :
         return None
 
-    bounding = []
-    bounding.append(getStringFromXY(minx, maxy)) # upper left
-    bounding.append(getStringFromXY(minx, miny)) # lower left 
-    bounding.append(getStringFromXY(maxx, miny)) # lower right
-    bounding.append(getStringFromXY(maxx, maxy)) # upper right
-
-    return bounding
+    return getEnvelopeControlPoints(minx, miny, maxx, maxy)
         
 def getLength(x0, y0, x1, y1) : 
     return math.sqrt((x1-x0)**2 + (y1-y0)**2)        
@@ -186,6 +179,63 @@ def rotateAndScale(angle, scaleFactor, x0, y0, x1, y1) :
     x, y = scale(scaleFactor, x0, y0, rx, ry) # Vector V0(x1,y1)->V1(rx,ry)
     return x, y
 
+def getRotateAndScaleMatrix(angle, scaleFactor) :
+    # 2x2 matrix (a, b, c, d) = scaleFactor * rotation by angle (degrees)
+    theta = degreesToRadians(angle)
+    cosa = scaleFactor * math.cos(theta)
+    sina = scaleFactor * math.sin(theta)
+    return (cosa, -sina, sina, cosa)
+
+class AffineTemplate(object) :
+    """
+    The points a GCT derives from its base vector p0->p1, each p0 + M * (p1 - p0) with M
+    a 2x2 matrix worked out once from its (angle, scaleFactor): the points
+    rotateAndScale(angle, scaleFactor, p0, p1) gives, without a cos/sin per point.
+    apply() is for one feature, applyArray() for (m, 2) arrays of them (see GeometryArrays).
+    """
+
+    def __init__(self, angleScales) :
+        self.angleScales = list(angleScales)
+        self.matrices = [getRotateAndScaleMatrix(angle, scaleFactor) for angle, scaleFactor in self.angleScales]
+        self.matrixArray = None
+
+    def __len__(self) :
+        return len(self.matrices)
+
+    def __repr__(self) :
+        return "AffineTemplate(" + str(self.angleScales) + ")"
+
+    def apply(self, x0, y0, x1, y1) :
+        # [(x, y), ...] one for each (angle, scaleFactor)
+        dx = x1 - x0
+        dy = y1 - y0
+        return [(x0 + (a * dx) + (b * dy), y0 + (c * dx) + (d * dy)) for a, b, c, d in self.matrices]
+
+    def applyArray(self, p0, p1) :
+        # (m, k, 2) points for (m, 2) arrays p0, p1
+        if self.matrixArray is None :
+            self.matrixArray = GeometryArrays.getMatrixArray(self.matrices)
+        return GeometryArrays.applyMatrices(self.matrixArray, p0, p1)
+
+def getInclineTemplates(angleScales) :
+    # incline (see getIncline) -> AffineTemplate with the angles multiplied by the incline
+    return dict([(incline, AffineTemplate([(incline * angle, scaleFactor) for angle, scaleFactor in angleScales])) \
+        for incline in [-1.0, 1.0]])
+
+# The fixed angle/scale constructions of the GCTs (the same for the scalar and batch conversions)
+ARROWWITHOFFSET_TEMPLATE = AffineTemplate([(45.0, 0.5)])
+ARROWWITHTAIL_TEMPLATE = AffineTemplate([(90.0, 1.0), (-90.0, 1.0)])
+FREEHANDARROW_TEMPLATES = getInclineTemplates([(30.0, 0.5)])
+FREEHANDU_TEMPLATE = AffineTemplate([(60.0, 1.2), (90.0, 1.0)])
+HOOK_TEMPLATE = AffineTemplate([(30.0, 1.2)])  # 1.2 = 2 / sqrt(3)
+HORNS_TEMPLATE = AffineTemplate([(90.0, 1.5), (-90.0, 1.5), (45.0, 1.5), (-45.0, 1.5)])
+PARALLELLINES_TEMPLATE = AffineTemplate([(30.0, 0.6)]) # 0.5 * 1.2 = 2 / sqrt(3)
+PARALLELLINESWITHTICKS_TEMPLATES = getInclineTemplates([(-90.0, 0.6), (-30.0, 1.2), (90.0, 0.6), (30.0, 1.2)])
+T_TEMPLATE = AffineTemplate([(30.0, 0.8)])
+TRIPLEARROW_TEMPLATE = AffineTemplate([(90.0, 0.6), (-90.0, 0.6), (-30.0, 1.2)])
+TWOLINE_TEMPLATE = AffineTemplate([(45.0, 1.0)])
+UORTSHAPE_TEMPLATE = AffineTemplate([(-30.0, 1.2), (30.0, 1.2)])
+
 def getMetersFromLength(distance, wkid) :
     ##TODO: if needed plug in call to convert distance to meters
     ## determine if SR is in meters, if not project to meters
@@ -198,975 +248,1816 @@ def getMapUnitsFromMeters(meters, wkid) :
     print "getMapUnitsFromMeters"
     return meters
 
-class GeometryConverter() :
-    """description of class"""
+# Circles are densified so no chord strays further than the chord tolerance from the arc.
+# The vertex count is worked out in meters (Tag_Radius, or the radius from getCircleRadiusMeters),
+# only the vertices are in map units. 50 meters keeps full circles up to ~12 km at or below
+# the 36 vertices (10 degree steps) they had before.
+DEFAULT_CHORD_TOLERANCE = 50.0 # meters
+MIN_CIRCLE_VERTICES = 8
+MAX_CIRCLE_VERTICES = 360
+METERS_PER_DEGREE = 111320.0 # at the equator
+
+# wkid -> True if its coordinates are in degrees
+geographicWkids = { }
+
+def isGeographicWkid(wkid) :
+    if not (wkid in geographicWkids) :
+        try :
+            geographicWkids[wkid] = (arcpy.SpatialReference(wkid).type == "Geographic")
+        except :
+            # unknown wkid (or no arcpy spatial references), the default is WGS84
+            geographicWkids[wkid] = (wkid == 4326)
+    return geographicWkids[wkid]
+
+def getCircleRadiusMeters(radius, wkid) :
+    # radius (map units) in meters, only to work out the vertex count of a circle: degrees
+    # are taken at the equator (getMetersFromLength is not done yet), other units as meters
+    if isGeographicWkid(wkid) :
+        return radius * METERS_PER_DEGREE
+    return radius
+
+def getCircleVertexCount(radius, tolerance) :
+    # The vertices of a full circle so each chord is within tolerance (meters) of the arc
+    # of radius (meters): the sagitta radius * (1 - cos(pi / n)) <= tolerance, from MIN_ to MAX_CIRCLE_VERTICES
+    if not (tolerance > 0.0) :
+        return MAX_CIRCLE_VERTICES
+    if not (radius > tolerance) :
+        return MIN_CIRCLE_VERTICES
+
+    vertexCount = int(math.ceil(math.pi / math.acos(1.0 - (tolerance / radius))))
+    return min(max(vertexCount, MIN_CIRCLE_VERTICES), MAX_CIRCLE_VERTICES)
+
+def getArcVertexCount(arc, vertexCount) :
+    # the vertices of a full circle of vertexCount that are within arc degrees of the start
+    return min(vertexCount, int(math.ceil((arc * vertexCount) / 360.0)))
+
+# vertex count -> [(sin, cos), ...] of the unit circle, every 360 / vertex count degrees
+unitCircles = { }
+
+def getUnitCircle(vertexCount) :
+    if not (vertexCount in unitCircles) :
+        step = 360.0 / vertexCount
+        unitCircles[vertexCount] = [(math.sin(degreesToRadians(i * step)), math.cos(degreesToRadians(i * step))) \
+            for i in xrange(vertexCount)]
+    return unitCircles[vertexCount]
+
+def getCircleControlPoints(centerX, centerY, radius, startAzimuth, arc, vertexCount) :
+    # ControlPoints along arc degrees (clockwise) from startAzimuth, vertexCount for a full
+    # circle: the cached unit circle rotated to startAzimuth, scaled by radius and moved to the center
+    theta = degreesToRadians(startAzimuth)
+    a = radius * math.sin(theta)
+    b = radius * math.cos(theta)
+
+    outPoints = ControlPoints.ControlPoints()
+    for sina, cosa in getUnitCircle(vertexCount)[0:getArcVertexCount(arc, vertexCount)] :
+        outPoints.append(centerX + (a * cosa) + (b * sina), centerY + (b * cosa) - (a * sina))
+    return outPoints
+
+class ConversionProfile(object) :
+    """
+    How the points of one SIDC are converted, worked out once per SIDC (see
+    GeometryConverter.getConversionProfile):
+    geometryType : POINT_STRING, LINE_STRING, AREA_STRING or "None" (see SymbolRecord)
+    gct : the geometry conversion type (GCT)
+    handler : the GctHandler registered for the GCT (None if there isn't one)
+    requiresConversion : False if the points are the same in both formats
+    """
+    __slots__ = ('geometryType', 'gct', 'handler', 'requiresConversion')
+
+    def __init__(self, geometryType, gct) :
+        self.geometryType = geometryType
+        self.gct = gct
+        self.handler = getGctHandler(gct)
+        self.requiresConversion = not (((geometryType == DictionaryConstants.POINT_STRING)) or \
+            ((geometryType == DictionaryConstants.LINE_STRING) and (gct == DictionaryConstants.GCT_POLYLINE)) or \
+            ((geometryType == DictionaryConstants.AREA_STRING) and (gct == DictionaryConstants.GCT_POLYGON)))
+
+    def __repr__(self) :
+        return "ConversionProfile(%s, %s, %s)" % (self.geometryType, self.gct, self.requiresConversion)
+
+class GctHandler(object) :
+    """
+    The point conversions of one GCT, both are called as
+    (converter, profile, inPoints, attributes, wkid) with inPoints as ControlPoints:
+    toMessage : geometry points -> message control points (see geometrytoControlPoints)
+    toGeometry : message control points -> geometry points (see controlPointsToGeometry)
+    Each returns (outPoints, None), or (None, conversion notes) if the conversion failed.
+    outPoints of None (with no notes) means "keep the original points".
+    toMessageBatch, toGeometryBatch : the same for many features at once (see convertBatch),
+    None to convert them one at a time
+    """
+
+    def __init__(self, gct, toMessage, toGeometry, toMessageBatch = None, toGeometryBatch = None) :
+        self.gct = gct
+        self.toMessage = toMessage
+        self.toGeometry = toGeometry
+        self.toMessageBatch = toMessageBatch
+        self.toGeometryBatch = toGeometryBatch
+
+    def __repr__(self) :
+        return "GctHandler(" + str(self.gct) + ")"
+
+# GCT -> GctHandler, each conversion dispatches with one lookup here
+gctHandlers = {}
+
+def registerGctHandler(gct, toMessage, toGeometry, toMessageBatch = None, toGeometryBatch = None) :
+    # Adds (or replaces) the conversions of a GCT, register before converting any of its SIDCs
+    # (GeometryConverter keeps the handler of each SIDC it has seen)
+    gctHandlers[gct] = GctHandler(gct, toMessage, toGeometry, toMessageBatch, toGeometryBatch)
+
+def getGctHandler(gct) :
+    return gctHandlers.get(gct)
+
+# The conversions of each GCT: name + "ToMessage" is the geometrytoControlPoints direction,
+# name + "ToGeometry" the controlPointsToGeometry one
+
+def checkPointPoints(converter, profile, inPoints, attributes, wkid) :
+    geoConversion = profile.gct
+    geoType = profile.geometryType
+    pointCount = len(inPoints)
+    outPoints = None
+
+    print "GCT_POINT"
+    if (pointCount != 1) or (geoType != DictionaryConstants.POINT_STRING) :
+        conversionNotes = geoConversion + " - Conversion Failed, not Point"
+        return None, conversionNotes
+    else :
+        outPoints = inPoints
 
-    def __init__(self, symbolDictionaryIn) :
-        print "GeometryConverter Init"
-        if (symbolDictionaryIn is None) : 
-            print "SymbolDictionary is None"
-        self.symbolDictionary = symbolDictionaryIn
-        self.ignoreSecondTwoLine = False
+    return outPoints, None
 
-    def getSymbolDictionary(self) :
-        return self.symbolDictionary
+def checkPolylinePoints(converter, profile, inPoints, attributes, wkid) :
+    geoConversion = profile.gct
+    geoType = profile.geometryType
+    pointCount = len(inPoints)
+    outPoints = None
 
-    def expectedGeometryType(self, sic) :
-        if (sic == None) :
-            return DictionaryConstants.UNKNOWN_GEOMETRY_STRING
-        return self.symbolDictionary.symbolIdToGeometryType(sic)
+    print "GCT_POLYLINE"
+    if (pointCount < 2) or (geoType != DictionaryConstants.LINE_STRING) :
+        conversionNotes = geoConversion + " - Conversion Failed, not Line"
+        return None, conversionNotes
+    else :
+        outPoints = inPoints
 
-    def requiresConversion(self, sic) :
+    return outPoints, None
 
-        if (sic == None) :
-            return False
+def checkPolygonPoints(converter, profile, inPoints, attributes, wkid) :
+    geoConversion = profile.gct
+    geoType = profile.geometryType
+    pointCount = len(inPoints)
+    outPoints = None
 
-        geoType = self.symbolDictionary.symbolIdToGeometryType(sic)
-        geoConversion = self.symbolDictionary.symbolIdToGeometryConversionType(sic)
+    print "GCT_POLYGON"
+    if (pointCount < 3) or (geoType != DictionaryConstants.AREA_STRING) :
+        conversionNotes = geoConversion + " - Conversion Failed, not Polygon"
+        return None, conversionNotes
+    else :
+        outPoints = inPoints
 
-        if (geoType == DictionaryConstants.POINT_STRING) :
-            return False
-        elif (geoType == DictionaryConstants.LINE_STRING) \
-            & (geoConversion == DictionaryConstants.GCT_POLYLINE) :
-            return False
-        elif (geoType == DictionaryConstants.AREA_STRING) \
-            & (geoConversion == DictionaryConstants.GCT_POLYGON) :
-            return False
+    return outPoints, None
+
+def rejectIndeterminatePoints(converter, profile, inPoints, attributes, wkid) :
+    geoConversion = profile.gct
+
+    conversionNotes = geoConversion + " - Unexpected Conversion type"
+    return None, conversionNotes
+
+def arrowToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_ARROW"
+    print "Reverse the points"
+
+    if pointCount < 2 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = inPoints.reversed()
+
+    return outPoints, None
+
+def arrowWithOffsetToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_ARROWWITHOFFSET"
+    print "Reverse the points and add offset Point"
+
+    if pointCount < 2 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = inPoints.reversed()
+
+    # calculate arrowhead point
+    x0, y0 = getXYFromListAtIndex(outPoints, 1)
+    x1, y1 = getXYFromListAtIndex(outPoints, 0)
+
+    rsx, rsy = ARROWWITHOFFSET_TEMPLATE.apply(x0, y0, x1, y1)[0]
+    lastPoint = (rsx, rsy)
+
+    outPoints.appendXY(lastPoint)
+
+    return outPoints, None
+
+def arrowWithTailToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_ARROWWITHTAIL"
+    print "Use 1st and last point, and calculate the tail points 2, 3"
+
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    startPoint = inPoints[0]
+    endPoint = inPoints[pointCount-1] # pointCount - just in case more than 2 points were input in ArcMap
+
+    x0, y0 = startPoint
+    x1, y1 = endPoint
+
+    magnitude = getLength(x0, y0, x1, y1)
+
+    # make tail points by just rotating the original line
+    (x2, y2), (x3, y3) = ARROWWITHTAIL_TEMPLATE.apply(x0, y0, x1, y1)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(x1, y1)
+    outPoints.append(x2, y2)
+    outPoints.append(x3, y3)
+
+    return outPoints, None
+
+def circleToMessage(converter, profile, inPoints, attributes, wkid) :
+    geoConversion = profile.gct
+    pointCount = len(inPoints)
+    outPoints = None
+
+    print "GCT_CIRCLE / GCT_CIRCULAR"
+    print "Get Bounding Rectangle and create center and circle point"
+    if (pointCount < 2) or (pointCount == 3) :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    if pointCount == 2 :
+        centerPoint = inPoints[0]
+        circlePoint = inPoints[1]
+    else :
+        minx, miny, maxx, maxy = getmaxmin(inPoints)
+
+        if math.isnan(minx) or math.isnan(miny) or math.isnan(maxx) or math.isnan(maxy):
+            # get envelope failed
+            print "Could not determine circle envelope"
+            return None, None
         else :
-            return True
+            midx = (minx + maxx) / 2.0
+            midy = (miny + maxy) / 2.0
 
-    def geometrytoControlPoints(self, sic, control_points, attributes) : 
+            centerPoint = (midx, midy)
+            circlePoint = (midx, miny)
 
-        if (sic == None) or (control_points == None) :
-            return None, DictionaryConstants.CONVERSION_ERROR_VALIDATION
+    xc, yc = centerPoint
+    xr, yr = circlePoint
 
-        inPoints = control_points.split(';')
-        outPoints = None
-        pointCount = len(inPoints)
+    radius = getLength(xc, yc,  xr, yr)
 
-        geoType = self.symbolDictionary.symbolIdToGeometryType(sic)
-        geoConversion = self.symbolDictionary.symbolIdToGeometryConversionType(sic)
+    if radius > 0.0 :
+        attributes[DictionaryConstants.Tag_Radius] = getMetersFromLength(radius, wkid)
+        outPoints = ControlPoints.ControlPoints()
+        outPoints.appendXY(centerPoint)
+        # GCT_CIRCLE has center & cirlce point
+        if geoConversion == DictionaryConstants.GCT_CIRCLE :
+            outPoints.appendXY(circlePoint)
+    else :
+        # if radius == 0 it was probably a source circle geometry (start point = end point)
+        msg = "IMPORTANT: Circle geometries are not supported by ArcPy"
+        print msg
+        arcpy.AddWarning(msg)
+        msg = "You will need to use a polyline, polygon or run GP.Densify_edit Tool"
+        print msg
+        arcpy.AddWarning(msg)
 
-        wkid = 4326 # default to WGS84
-        if attributes.has_key(DictionaryConstants.Tag_Wkid) : 
-            wkid = int(attributes[DictionaryConstants.Tag_Wkid])
+    return outPoints, None
 
-        conversionNotes = None
+def freehandArrowToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-        if geoConversion == DictionaryConstants.GCT_POINT : 
-            print "GCT_POINT"
-            if (pointCount != 1) or (geoType != DictionaryConstants.POINT_STRING) :
-                conversionNotes = geoConversion + " - Conversion Failed, not Point"
-                return None, conversionNotes
-            else :
-                outPoints = inPoints
+    print "GCT_FREEHANDARROW"
+    print "Use 1st and last point, and calculate the 3rd, middle point half way between them."
 
-        elif geoConversion == DictionaryConstants.GCT_POLYLINE : 
-            print "GCT_POLYLINE"
-            if (pointCount < 2) or (geoType != DictionaryConstants.LINE_STRING) :
-                conversionNotes = geoConversion + " - Conversion Failed, not Line"
-                return None, conversionNotes
-            else :
-                outPoints = inPoints
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-        elif geoConversion == DictionaryConstants.GCT_POLYGON  :             	
-            print "GCT_POLYGON"
-            if (pointCount < 3) or (geoType != DictionaryConstants.AREA_STRING) :
-                conversionNotes = geoConversion + " - Conversion Failed, not Polygon"
-                return None, conversionNotes
-            else :
-                outPoints = inPoints
+    if pointCount == 2 :
+        startPoint = inPoints[0]
+        endPoint = inPoints[-1]
 
-        elif geoConversion == DictionaryConstants.GCT_INDETERMINATE  :  
-            conversionNotes = geoConversion + " - Unexpected Conversion type"             	 	
-            return None, conversionNotes 
+        xs, ys = startPoint
+        xe, ye = endPoint
 
-        elif geoConversion == DictionaryConstants.GCT_ARROW  :               	
-            print "GCT_ARROW"
-            print "Reverse the points"
+        # make tail points by just rotating/scaling the original line
+        incline = getIncline(xs, ys, xe, ye)
+        x3, y3 = FREEHANDARROW_TEMPLATES[incline].apply(xs, ys, xe, ye)[0]
+        middlePoint = (x3, y3)
 
-            if pointCount < 2 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    else : # pointCount > 2
 
-            outPoints = inPoints
-            outPoints.reverse()
+        startPoint = inPoints[0] # pointCount - just in case more than 2 points were input in ArcMap
+        endPoint = inPoints[-1]
 
-        elif geoConversion == DictionaryConstants.GCT_ARROWWITHOFFSET :  	    
-            print "GCT_ARROWWITHOFFSET"
-            print "Reverse the points and add offset Point"
+        middlePointIndex = int((pointCount - 1) / 2)
+        if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :
+            middlePoint = inPoints[middlePointIndex]
+        else :
+            middlePoint = inPoints[1]
 
-            if pointCount < 2 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(endPoint)
+    outPoints.appendXY(middlePoint)
 
-            outPoints = inPoints
-            outPoints.reverse()
+    return outPoints, None
 
-            # calculate arrowhead point
-            x0, y0 = getXYFromListAtIndex(outPoints, 1)
-            x1, y1 = getXYFromListAtIndex(outPoints, 0)
+def freehandLineToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-            rsx, rsy = rotateAndScale(45, 0.5, x0, y0, x1, y1) 
-            lastPoint = getStringFromXY(rsx, rsy)
+    print "GCT_FREEHANDLINE"
+    print "Use 1st and last point, and calculate the 3rd, middle point half way between them."
 
-            outPoints.append(lastPoint)
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-        elif geoConversion == DictionaryConstants.GCT_ARROWWITHTAIL :     	 	
-            print "GCT_ARROWWITHTAIL"
-            print "Use 1st and last point, and calculate the tail points 2, 3"
+    startPoint = inPoints[0]
+    endPoint = inPoints[pointCount-1] # pointCount - just in case more than 2 points were input in ArcMap
 
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    xs, ys = startPoint
+    xe, ye = endPoint
 
-            startPoint = inPoints[0]
-            endPoint = inPoints[pointCount-1] # pointCount - just in case more than 2 points were input in ArcMap
+    # make tail points by just rotating/scaling the original line
+    # x3, y3 = rotateAndScale(45.0, 0.7, xs, ys, xe, ye)
 
-            x0, y0 = getXYFromString(startPoint)
-            x1, y1 = getXYFromString(endPoint)
+    # Workaround: Just use middle point to handle cases when > 3 points
+    middlePointIndex = int((pointCount - 1) / 2)
+    middlePoint = inPoints[middlePointIndex]
 
-            magnitude = getLength(x0, y0, x1, y1)
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(endPoint)
+    # outPoints.append(x3, y3)
+    outPoints.appendXY(middlePoint)
 
-            # make tail points by just rotating the original line 
-            x2, y2 = rotate(90.0, x0, y0, x1, y1)
-            x3, y3 = rotate(-90.0, x0, y0, x1, y1)
+    return outPoints, None
 
-            outPoints = [] 
-            outPoints.append(getStringFromXY(x1, y1))
-            outPoints.append(getStringFromXY(x2, y2))
-            outPoints.append(getStringFromXY(x3, y3))
+def freehandReverseArrowToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-        elif geoConversion == DictionaryConstants.GCT_CIRCLE or \
-            geoConversion == DictionaryConstants.GCT_CIRCULAR : 			
-            print "GCT_CIRCLE / GCT_CIRCULAR"
-            print "Get Bounding Rectangle and create center and circle point"
-            if pointCount == 1 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-            if pointCount == 2 :
-                centerPoint = inPoints[0]
-                circlePoint = inPoints[1]
-            elif pointCount > 3 :
-                minx, miny, maxx, maxy = getmaxmin(inPoints) 
+    print "GCT_FREEHANDREVERSEARROW"
+    print "Use 1st and last point, and calculate the 3rd, middle point half way between them."
 
-                if math.isnan(minx) or math.isnan(miny) or math.isnan(maxx) or math.isnan(maxy):
-                    # get envelope failed
-                    print "Could not determine circle envelope"
-                else :
-                    midx = (minx + maxx) / 2.0
-                    midy = (miny + maxy) / 2.0
-
-                    centerPoint = getStringFromXY(midx, midy)
-                    circlePoint = getStringFromXY(midx, miny) 
-                
-            xc, yc = getXYFromString(centerPoint)
-            xr, yr = getXYFromString(circlePoint)
-
-            radius = getLength(xc, yc,  xr, yr)            
-
-            if radius > 0.0 :
-                attributes[DictionaryConstants.Tag_Radius] = getMetersFromLength(radius, wkid)
-                outPoints = [] 
-                outPoints.append(centerPoint)
-                # GCT_CIRCLE has center & cirlce point
-                if geoConversion == DictionaryConstants.GCT_CIRCLE : 
-                    outPoints.append(circlePoint) 
-            else :  
-                # if radius == 0 it was probably a source circle geometry (start point = end point)
-                msg = "IMPORTANT: Circle geometries are not supported by ArcPy"
-                print msg
-                arcpy.AddWarning(msg)
-                msg = "You will need to use a polyline, polygon or run GP.Densify_edit Tool"
-                print msg
-                arcpy.AddWarning(msg)
-
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDARROW	:		
-            print "GCT_FREEHANDARROW"
-            print "Use 1st and last point, and calculate the 3rd, middle point half way between them."
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            if pointCount == 2 : 
-                startPoint = inPoints[0]
-                endPoint = inPoints[-1]   
-    
-                xs, ys = getXYFromString(startPoint)
-                xe, ye = getXYFromString(endPoint)
-    
-                # make tail points by just rotating/scaling the original line 
-                incline = getIncline(xs, ys, xe, ye)
-                x3, y3 = rotateAndScale(incline * 30.0, 0.5, xs, ys, xe, ye)
-                middlePoint = getStringFromXY(x3, y3) 
-
-            else : # pointCount > 2 
-                
-                startPoint = inPoints[0] # pointCount - just in case more than 2 points were input in ArcMap
-                endPoint = inPoints[-1] 
-                
-                middlePointIndex = int((pointCount - 1) / 2)   
-                if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :             
-                    middlePoint = inPoints[middlePointIndex]
-                else :
-                    middlePoint = inPoints[1]     
-                    
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(endPoint)
-            outPoints.append(middlePoint)
-
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDLINE :         	
-            print "GCT_FREEHANDLINE"
-            print "Use 1st and last point, and calculate the 3rd, middle point half way between them."
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0]
-            endPoint = inPoints[pointCount-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # make tail points by just rotating/scaling the original line 
-            # x3, y3 = rotateAndScale(45.0, 0.7, xs, ys, xe, ye)
-            
-            # Workaround: Just use middle point to handle cases when > 3 points
-            middlePointIndex = int((pointCount - 1) / 2)
-            middlePoint = inPoints[middlePointIndex]                        
-
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(endPoint)
-            # outPoints.append(getStringFromXY(x3, y3))
-            outPoints.append(middlePoint)
-
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDREVERSEARROW 	:
-            print "GCT_FREEHANDREVERSEARROW"
-            print "Use 1st and last point, and calculate the 3rd, middle point half way between them."
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            if pointCount == 2 : 
-                startPoint = inPoints[0]
-                endPoint = inPoints[pointCount-1] # pointCount - just in case more than 2 points were input in ArcMap
-    
-                xs, ys = getXYFromString(startPoint)
-                xe, ye = getXYFromString(endPoint)
-    
-                # make tail points by just rotating/scaling the original line 
-                incline = getIncline(xs, ys, xe, ye)
-                x3, y3 = rotateAndScale((incline * 30.0), 0.5, xs, ys, xe, ye)
-                
-                middlePoint = getStringFromXY(x3, y3)
-            else : # pointCount > 2 
-                
-                startPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-                endPoint = inPoints[0] 
-                
-                middlePointIndex = int((pointCount - 1) / 2)   
-                if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :             
-                    middlePoint = inPoints[middlePointIndex]
-                else :
-                    middlePoint = inPoints[1]                
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(endPoint)
-            outPoints.append(middlePoint)
+    if pointCount == 2 :
+        startPoint = inPoints[0]
+        endPoint = inPoints[pointCount-1] # pointCount - just in case more than 2 points were input in ArcMap
 
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDU  :         	
-            print "GCT_FREEHANDU"
+        xs, ys = startPoint
+        xe, ye = endPoint
 
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+        # make tail points by just rotating/scaling the original line
+        incline = getIncline(xs, ys, xe, ye)
+        x3, y3 = FREEHANDARROW_TEMPLATES[incline].apply(xs, ys, xe, ye)[0]
 
-            print "Take input points 1, 2 then derive envelope with points 1, 2, 4, 3"
+        middlePoint = (x3, y3)
+    else : # pointCount > 2
 
-            if pointCount == 4 : 
-                # if it is 4 points, just use the original points
-                outPoints = inPoints
-                outPoints.reverse()
-            else :
-                startPoint = inPoints[0]
-                endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-                xs, ys = getXYFromString(startPoint)
-                xe, ye = getXYFromString(endPoint)
-
-                incline = getIncline(xs, ys, xe, ye)
-                print "Incline = " + str(incline)
-
-                incline = 1.0 # getIncline(xs, ys, xe, ye)
-
-                # make tail points by just rotating/scaling the original line 
-                x2, y2 = rotateAndScale(incline*60.0, 1.2, xs, ys, xe, ye)
-                x3, y3 = rotateAndScale(incline*90.0, 1.0, xs, ys, xe, ye)
-
-                outPoints = [] 
-                outPoints.append(endPoint)
-                outPoints.append(getStringFromXY(x2, y2))
-                outPoints.append(getStringFromXY(x3, y3))
-                outPoints.append(startPoint)
-
-            if pointCount >= 4 :
-                print "> 4 points use bounding envelope with points 1, 2, 3, 4"
-                bounding = minimumBoundingEnvelope(inPoints)
-                if bounding != None :
-                    # TODO need to determine polygon winding (clockwise or counter) of original points
-                    # to determing if arrows are pointed left or right
-                    outPoints = [] 
-                    outPoints.append(bounding[0]) # upper left
-                    outPoints.append(bounding[3]) # upper right
-                    outPoints.append(bounding[2]) # lower right
-                    outPoints.append(bounding[1]) # lower left                                                                
-
-        elif geoConversion == DictionaryConstants.GCT_HOOK :                 	
-            print "GCT_HOOK"
-            
-            print "Points ordered 1, 2, ... n -> n, 3/4n, 0"
-            
-            # OLD: Turns out points are not really ordered this way in ArcMap
-            # print "Points ordered 1, 2 -> 2, 1, derived 3(90 degrees to line 21)"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-            
-            if pointCount == 2 :
-                
-                print "Points ordered 1, 2 -> 2, 1, derived 3(90 degrees to line 21)"
-
-                startPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-                endPoint = inPoints[0] 
-    
-                xs, ys = getXYFromString(startPoint)
-                xe, ye = getXYFromString(endPoint)
-    
-                # make tail points by just rotating/scaling the original line 
-                x3, y3 = rotateAndScale(30.0, 1.2, xs, ys, xe, ye)  # 1.2 = 2 / sqrt(3) 
-    
-                middlePoint = getStringFromXY(x3, y3)
-            else : # pointCount > 2 
-                
-                startPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-                endPoint = inPoints[0] 
-                
-                middlePointIndex = int((pointCount - 1) * 0.75)   
-                if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :             
-                    middlePoint = inPoints[middlePointIndex]
-                else :
-                    middlePoint = inPoints[1]
-                
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(middlePoint)                
-            outPoints.append(endPoint)
-
-        elif geoConversion == DictionaryConstants.GCT_HORNS	:				
-            print "GCT_HORNS"
-            print "Take input points 1, 2 then derive envelope with points 1, 2, 4, 3"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0]
-            endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # make tail points by just rotating/scaling the original line 
-            x1, y1 = rotateAndScale(90.0, 1.5, xs, ys, xe, ye)
-            x2, y2 = rotateAndScale(-90.0, 1.5, xs, ys, xe, ye)
-            x3, y3 = rotateAndScale(45.0, 1.5, xs, ys, xe, ye)
-            x4, y4 = rotateAndScale(-45.0, 1.5, xs, ys, xe, ye)
-
-            outPoints = [] 
-            outPoints.append(getStringFromXY(x1, y1))
-            outPoints.append(getStringFromXY(x2, y2))
-            outPoints.append(getStringFromXY(x3, y3))
-            outPoints.append(getStringFromXY(x4, y4))
-
-        elif geoConversion == DictionaryConstants.GCT_OPENTRIANGLE	:		
-            print "GCT_OPENTRIANGLE"
-            print "Points ordered 1, 2, 3 -> 2, 1, 3, if more than 3 points, only 1st 3 points are used"
-
-            if pointCount < 3 :
-                print "3 Points Required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-            elif pointCount > 3 :
-                print "WARNING: more than 3 points in input Geometry, dropping extra points"
-
-            outPoints = [] 
-            outPoints.append(inPoints[1])
-            outPoints.append(inPoints[0])
-            outPoints.append(inPoints[2])
-
-        elif (geoConversion == DictionaryConstants.GCT_PARALLELLINES) or \
-            (geoConversion == DictionaryConstants.GCT_PARALLELLINESMIDLINE)  :	
-            print "GCT_PARALLELLINESMIDLINE"
-            print "Points ordered 1, 2 -> 1, 2, derived 3(at mid point of 1, 2)"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0]
-            endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # Workaround: Just use middle point to handle cases when > 3 points
-            # middlePointIndex = int((pointCount - 1) / 2)
-            # middlePoint = inPoints[middlePointIndex]    
-            
-            # make tail points by just rotating/scaling the original line 
-            x3, y3 = rotateAndScale(30.0, 0.6, xs, ys, xe, ye) # 0.5 * 1.2 = 2 / sqrt(3) 
-
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(endPoint)
-            # outPoints.append(middlePoint) # getStringFromXY(x3, y3))
-            outPoints.append(getStringFromXY(x3, y3))
-
-        elif geoConversion == DictionaryConstants.GCT_PARALLELLINESWITHTICKS :
-            print "GCT_PARALLELLINESWITHTICKS"
-            print "Take input points 1, 2 then derive envelope with points 1, 2, 4, 3"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0]
-            endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # make tail points by just rotating/scaling the original line 
-            
-            incline = getIncline(xs, ys, xe, ye)
-                        
-            x1, y1 = rotateAndScale(-90.0 * incline, 0.6, xs, ys, xe, ye)
-            x2, y2 = rotateAndScale(-30.0 * incline, 1.2, xs, ys, xe, ye)
-            x3, y3 = rotateAndScale(90.0 * incline, 0.6, xs, ys, xe, ye)
-            x4, y4 = rotateAndScale(30.0 * incline, 1.2, xs, ys, xe, ye)
-
-            outPoints = [] 
-            outPoints.append(getStringFromXY(x1, y1))
-            outPoints.append(getStringFromXY(x2, y2))
-            outPoints.append(getStringFromXY(x3, y3))
-            outPoints.append(getStringFromXY(x4, y4))
-
-        elif (geoConversion == DictionaryConstants.GCT_RECTANGULAR) or \
-            (geoConversion == DictionaryConstants.GCT_RECTANGULAR1PT) :        	
-            print "GCT_RECTANGULAR/GCT_RECTANGULAR1PT"
-
-            length = 0.0
-            width = 0.0
-            orientation = 0.0
-
-            if pointCount >= 3 : 
-                length, width, centerX, centerY = getEnvelopeLengthWidthCenterXY(inPoints)
-
-                if (length > 0.0) and (width > 0.0) :
-                    attributes[DictionaryConstants.Tag_Length] = getMetersFromLength(length, wkid)
-                    attributes[DictionaryConstants.Tag_Width] = getMetersFromLength(width, wkid)
-
-                    outPoints = [] 
-                    if geoConversion == DictionaryConstants.GCT_RECTANGULAR : 
-                        outPoints.append(getStringFromXY(centerX - (length / 2.0), centerY))
-                        outPoints.append(getStringFromXY(centerX + (length / 2.0), centerY))
-                    if geoConversion == DictionaryConstants.GCT_RECTANGULAR1PT : 
-                        outPoints.append(getStringFromXY(centerX, centerY))
-                        if orientation > 0.0 :
-                            attributes[DictionaryConstants.Tag_Orientation] = orientation
-                                                    
-        elif geoConversion == DictionaryConstants.GCT_T :                    	
-            print "GCT_T"
-            print "Points ordered 1, 2 -> 1, 2, derived 3(3/4 length of Line 12)"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0]
-            endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # make tail points by just rotating/scaling the original line 
-            x3, y3 = rotateAndScale(30.0, 0.8, xe, ye, xs, ys) 
-
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(endPoint)
-            outPoints.append(getStringFromXY(x3, y3))
-
-        elif geoConversion == DictionaryConstants.GCT_TRIPLEARROW :       	    
-            print "GCT_TRIPLEARROW"
-            print "Points ordered 1, 2 -> derived 1, derived 2, derived 3"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0] 
-            endPoint = inPoints[-1]  # last point - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # make tail points by just rotating/scaling the original line 
-            x1, y1 = rotateAndScale(90.0, 0.6, xs, ys, xe, ye)
-            x2, y2 = rotateAndScale(-90.0, 0.6, xs, ys, xe, ye)
-            x3, y3 = rotateAndScale(-30.0, 1.2, xs, ys, xe, ye) # 1.2 = 2 / sqrt(3) 
-
-            outPoints = [] 
-            outPoints.append(getStringFromXY(x1, y1))
-            outPoints.append(getStringFromXY(x2, y2))
-            outPoints.append(getStringFromXY(x3, y3))
-
-        elif (geoConversion == DictionaryConstants.GCT_TWOLINE) or \
-             (geoConversion == DictionaryConstants.GCT_TWOLINE3OR4PT) :      
-            
-            if self.ignoreSecondTwoLine :
-                # IMPORTANT: assumes the 2nd part will always be next
-                self.ignoreSecondTwoLine = False
-                return None, DictionaryConstants.CONVERSION_IGNORE_SECOND_LINE
-                	
-            print "GCT_TWOLINE (2PT) or (3OR4PT)"
-            print "Points ordered 1, 2 -> 1, 2, derived 3 (45 degrees rotated)"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0] 
-            endPoint = inPoints[1] 
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            x3, y3 = rotate(45.0, xs, ys, xe, ye)
-
-            outPoints = [] 
-            outPoints.append(startPoint)
-            outPoints.append(endPoint)
-            outPoints.append(getStringFromXY(x3, y3))
-
-            self.ignoreSecondTwoLine = True
-
-        elif geoConversion == DictionaryConstants.GCT_UORTSHAPE  :         	
-            print "GCT_UORTSHAPE"
-            print "Points ordered 1, 2 -> derived 1, derived 2, 3(originally pt 1)"
-
-            if pointCount < 2 :
-                print ">= 2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            startPoint = inPoints[0]
-            endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
-
-            xs, ys = getXYFromString(startPoint)
-            xe, ye = getXYFromString(endPoint)
-
-            # make tail points by just rotating/scaling the original line 
-            x1, y1 = rotateAndScale(-30.0, 1.2, xs, ys, xe, ye) # 1.2 = 2 / sqrt(3) 
-            x2, y2 = rotateAndScale(30.0, 1.2, xs, ys, xe, ye)
-
-            outPoints = [] 
-            outPoints.append(getStringFromXY(x1, y1))
-            outPoints.append(getStringFromXY(x2, y2))
-            outPoints.append(startPoint)
-        
-        if not ((geoConversion == DictionaryConstants.GCT_TWOLINE) or \
-             (geoConversion == DictionaryConstants.GCT_TWOLINE3OR4PT)) :      
-            self.ignoreSecondTwoLine = False
+        startPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
+        endPoint = inPoints[0]
 
-        # Conversion done, now format output and return message
-        msg = "Geometry Conversion: " + geoConversion
-        if outPoints is None :
-            msg =  "Geometry Conversion: " + geoConversion + " failed. Returning original points."
-            print msg
-            arcpy.AddWarning(msg)
-            outPoints = inPoints
+        middlePointIndex = int((pointCount - 1) / 2)
+        if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :
+            middlePoint = inPoints[middlePointIndex]
+        else :
+            middlePoint = inPoints[1]
 
-        # Convert the point list back to a string before returning
-        outPointsString = ""
-        for point in outPoints :
-            outPointsString += point + ";"
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(endPoint)
+    outPoints.appendXY(middlePoint)
 
-        #remove last ";"        
-        if len(outPointsString) > 0 : 
-            outPointsString = outPointsString[:-1]
+    return outPoints, None
 
-        return outPointsString, msg
+def freehandUToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+    outPoints = None
 
-    ########################################################################################
-    ########################################################################################
+    print "GCT_FREEHANDU"
 
-    def controlPointsToGeometry(self, sic, control_points, attributes) :        
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-        inPoints = control_points.split(';')
-        outPoints = None
+    print "Take input points 1, 2 then derive envelope with points 1, 2, 4, 3"
 
-        if not self.requiresConversion(sic) : 
-            return inPoints, "No conversion required"
+    if pointCount == 4 :
+        # if it is 4 points, just use the original points
+        # (reversed, the envelope below is also taken in this order)
+        inPoints = inPoints.reversed()
+        outPoints = inPoints
+    else :
+        startPoint = inPoints[0]
+        endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
 
-        print "controlPointsToGeometry-->Original Points:"
-        for point in inPoints : 
-            x = point.split(',')[0]
-            y = point.split(',')[1]
-            print x, y
+        xs, ys = startPoint
+        xe, ye = endPoint
 
-        pointCount = len(inPoints)
+        incline = getIncline(xs, ys, xe, ye)
+        print "Incline = " + str(incline)
 
-        geoType = self.symbolDictionary.symbolIdToGeometryType(sic)
+        # make tail points by just rotating/scaling the original line
+        # (always with incline 1.0, not getIncline(xs, ys, xe, ye))
+        (x2, y2), (x3, y3) = FREEHANDU_TEMPLATE.apply(xs, ys, xe, ye)
 
-        geoConversion = self.symbolDictionary.symbolIdToGeometryConversionType(sic)
+        outPoints = ControlPoints.ControlPoints()
+        outPoints.appendXY(endPoint)
+        outPoints.append(x2, y2)
+        outPoints.append(x3, y3)
+        outPoints.appendXY(startPoint)
 
-        wkid = 4326 # default to WGS84
-        if attributes.has_key(DictionaryConstants.Tag_Wkid) : 
-            wkid = int(attributes[DictionaryConstants.Tag_Wkid])
+    if pointCount >= 4 :
+        print "> 4 points use bounding envelope with points 1, 2, 3, 4"
+        bounding = minimumBoundingEnvelopeControlPoints(inPoints)
+        if bounding != None :
+            # TODO need to determine polygon winding (clockwise or counter) of original points
+            # to determing if arrows are pointed left or right
+            outPoints = ControlPoints.ControlPoints()
+            outPoints.appendXY(bounding[0]) # upper left
+            outPoints.appendXY(bounding[3]) # upper right
+            outPoints.appendXY(bounding[2]) # lower right
+            outPoints.appendXY(bounding[1]) # lower left
 
-        if geoConversion == DictionaryConstants.GCT_POINT : 
-            print "GCT_POINT"
-            if (pointCount != 1) or (geoType != DictionaryConstants.POINT_STRING) :
-                conversionNotes = geoConversion + " - Conversion Failed, not Point"
-                return None, conversionNotes
-            else :
-                outPoints = inPoints
+    return outPoints, None
 
-        elif geoConversion == DictionaryConstants.GCT_POLYLINE : 
-            print "GCT_POLYLINE"
-            if (pointCount < 2) or (geoType != DictionaryConstants.LINE_STRING) :
-                conversionNotes = geoConversion + " - Conversion Failed, not Line"
-                return None, conversionNotes
-            else :
-                outPoints = inPoints
+def hookToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-        elif geoConversion == DictionaryConstants.GCT_POLYGON  :             	
-            print "GCT_POLYGON"
-            if (pointCount < 3) or (geoType != DictionaryConstants.AREA_STRING) :
-                conversionNotes = geoConversion + " - Conversion Failed, not Polygon"
-                return None, conversionNotes
-            else :
-                outPoints = inPoints
+    print "GCT_HOOK"
 
-        elif geoConversion == DictionaryConstants.GCT_INDETERMINATE  :   	 	
-            conversionNotes = geoConversion + " - Unexpected Conversion type"             	 	
-            return None, conversionNotes 
+    print "Points ordered 1, 2, ... n -> n, 3/4n, 0"
 
-        elif geoConversion == DictionaryConstants.GCT_ARROW  :               	
-            print "GCT_ARROW"
-            print "Reverse the points"
-            outPoints = inPoints
-            outPoints.reverse()
+    # OLD: Turns out points are not really ordered this way in ArcMap
+    # print "Points ordered 1, 2 -> 2, 1, derived 3(90 degrees to line 21)"
 
-        elif geoConversion == DictionaryConstants.GCT_ARROWWITHOFFSET :  	    
-            print "GCT_ARROWWITHOFFSET"
-            print "Discard last point, and reverse the remaining points (>3 points required)"
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-            if pointCount < 2 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    if pointCount == 2 :
 
-            outPoints = inPoints[0:-1]
-            outPoints.reverse()
+        print "Points ordered 1, 2 -> 2, 1, derived 3(90 degrees to line 21)"
 
-        elif geoConversion == DictionaryConstants.GCT_ARROWWITHTAIL :     	 	
-            print "GCT_ARROWWITHTAIL"
-            print "Use 1st point, and calculate the midpoint of 2, 3 (>3 points required)"
+        startPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
+        endPoint = inPoints[0]
 
-            if pointCount < 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+        xs, ys = startPoint
+        xe, ye = endPoint
 
-            x0, y0 = getXYFromString(inPoints[2])
-            x1, y1 = getXYFromString(inPoints[1]) 
+        # make tail points by just rotating/scaling the original line
+        x3, y3 = HOOK_TEMPLATE.apply(xs, ys, xe, ye)[0]
 
-            midPointX, midPointY = scale(0.5, x0, y0, x1, y1) 
+        middlePoint = (x3, y3)
+    else : # pointCount > 2
 
-            outPoints = []
-            outPoints.append(getStringFromXY(midPointX, midPointY))
-            outPoints.append(inPoints[0])
+        startPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
+        endPoint = inPoints[0]
 
-        elif geoConversion == DictionaryConstants.GCT_CIRCLE :					
-            print "GCT_CIRCLE"
-            print "1, 2, -> circle with center pt 1, arcpoint start point 2, 330 degrees of arc"
+        middlePointIndex = int((pointCount - 1) * 0.75)
+        if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :
+            middlePoint = inPoints[middlePointIndex]
+        else :
+            middlePoint = inPoints[1]
 
-            if pointCount != 2 :
-                print "2 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(middlePoint)
+    outPoints.appendXY(endPoint)
 
-            x1, y1 = getXYFromString(inPoints[0])
-            x2, y2 = getXYFromString(inPoints[1]) 
-            
-            radius = getLength(x1, y1,  x2, y2)
+    return outPoints, None
 
-            if radius <= 0.0 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_RADIUS
+def hornsToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-            startAzimuth = getAzimuth(x1, y1,  x2, y2)
+    print "GCT_HORNS"
+    print "Take input points 1, 2 then derive envelope with points 1, 2, 4, 3"
 
-            endAzimuth = startAzimuth + 330.0
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-            outPoints = []
-            azi = startAzimuth
-            while azi < endAzimuth : 
-                x = x1 + radius * math.sin(degreesToRadians(azi))
-                y = y1 + radius * math.cos(degreesToRadians(azi))
-                azi += 10.0 
-                outPoints.append(getStringFromXY(x, y))
+    startPoint = inPoints[0]
+    endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
 
-        elif geoConversion == DictionaryConstants.GCT_CIRCULAR :           	
-            print "GCT_CIRCULAR"
+    xs, ys = startPoint
+    xe, ye = endPoint
 
-            radius = 0.0
-            if attributes.has_key(DictionaryConstants.Tag_Radius) :
-                radius = float(attributes[DictionaryConstants.Tag_Radius])
+    # make tail points by just rotating/scaling the original line
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = HORNS_TEMPLATE.apply(xs, ys, xe, ye)
 
-            radius = getMapUnitsFromMeters(radius, wkid)
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(x1, y1)
+    outPoints.append(x2, y2)
+    outPoints.append(x3, y3)
+    outPoints.append(x4, y4)
 
-            outPoints = []
+    return outPoints, None
 
-            if (pointCount == 1 ) :
-                if radius <= 0.0 :
-                    return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_RADIUS
+def openTriangleToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-                x1, y1 = getXYFromString(inPoints[0])
-                azi = 0.0
-                while azi < 360.0 : 
-                    x = x1 + radius * math.sin(degreesToRadians(azi))
-                    y = y1 + radius * math.cos(degreesToRadians(azi))
-                    azi += 10.0 
-                    outPoints.append(getStringFromXY(x, y))
-            elif (pointCount > 2) : 
-                outPoints = inPoints
+    print "GCT_OPENTRIANGLE"
+    print "Points ordered 1, 2, 3 -> 2, 1, 3, if more than 3 points, only 1st 3 points are used"
 
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDARROW	:		
-            print "GCT_FREEHANDARROW"
-            print "1, 2, 3 -> 1, 2"
+    if pointCount < 3 :
+        print "3 Points Required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    elif pointCount > 3 :
+        print "WARNING: more than 3 points in input Geometry, dropping extra points"
 
-            if pointCount != 3 :
-                print "3 points required"
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[1])
+    outPoints.appendXY(inPoints[0])
+    outPoints.appendXY(inPoints[2])
 
-            outPoints = []
-            outPoints.append(inPoints[0])
-            # TODO: may need to add interpolation points along an arc between these 2 points 
-            outPoints.append(inPoints[1])
+    return outPoints, None
 
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDLINE :         	
-            print "GCT_FREEHANDLINE"
-            print "1, 2, 3 -> 1, 3, 2"
+def parallelLinesToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-            if pointCount != 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    print "GCT_PARALLELLINESMIDLINE"
+    print "Points ordered 1, 2 -> 1, 2, derived 3(at mid point of 1, 2)"
 
-            outPoints = []
-            outPoints.append(inPoints[0])
-            outPoints.append(inPoints[2])
-            outPoints.append(inPoints[1])
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
 
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDREVERSEARROW 	:
-            print "GCT_FREEHANDREVERSEARROW"
-            print "1, 2, 3 -> 2, 3, 1"
+    startPoint = inPoints[0]
+    endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
 
-            if pointCount != 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    xs, ys = startPoint
+    xe, ye = endPoint
 
-            outPoints = []
-            outPoints.append(inPoints[1])
-            outPoints.append(inPoints[2])
-            outPoints.append(inPoints[0])
+    # Workaround: Just use middle point to handle cases when > 3 points
+    # middlePointIndex = int((pointCount - 1) / 2)
+    # middlePoint = inPoints[middlePointIndex]
 
-        elif geoConversion == DictionaryConstants.GCT_FREEHANDU  :         	
-            print "GCT_FREEHANDU"
-            print "Reverse Points"
-            outPoints = inPoints
-            # TODO: add interpolation circular arc between pts 2,3 (center is midpoint of L23)
-            outPoints.reverse()
-
-        elif geoConversion == DictionaryConstants.GCT_HOOK :                 	
-            print "GCT_HOOK"
-            print "Points ordered 1, 2, 3 -> 2, 1"
-
-            if pointCount != 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            outPoints = []
-            outPoints.append(inPoints[1])
-            outPoints.append(inPoints[0])
-
-        elif geoConversion == DictionaryConstants.GCT_HORNS	:				
-            print "GCT_HORNS"
-            print "Take input points 1, 2, 3, 4 then derive 1 (midpt of 1,2), 2 (midpt of 3, 4)"
-
-            if pointCount < 4 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            x1, y1 = getXYFromString(inPoints[0])
-            x2, y2 = getXYFromString(inPoints[1]) 
-            x3, y3 = getXYFromString(inPoints[2])
-            x4, y4 = getXYFromString(inPoints[3]) 
-
-            midPointX1, midPointY1 = scale(0.5, x1, y1, x2, y2) 
-            midPointX2, midPointY2 = scale(0.5, x3, y3, x4, y4) 
-
-            outPoints = []
-            outPoints.append(getStringFromXY(midPointX1, midPointY1))
-            outPoints.append(getStringFromXY(midPointX2, midPointY2))
-
-        elif geoConversion == DictionaryConstants.GCT_OPENTRIANGLE	:		
-            print "GCT_OPENTRIANGLE"
-            print "Points ordered 2, 1, 3 -> 1, 2, 3"
-
-            if pointCount != 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            outPoints = [] 
-            outPoints.append(inPoints[1])
-            outPoints.append(inPoints[0])
-            outPoints.append(inPoints[2])
-
-        elif (geoConversion == DictionaryConstants.GCT_PARALLELLINES) or \
-            (geoConversion == DictionaryConstants.GCT_PARALLELLINESMIDLINE) or \
-            (geoConversion == DictionaryConstants.GCT_T) :	
-            print "GCT_PARALLELLINES / GCT_PARALLELLINESMIDLINE"
-            print "Points ordered 1, 2, 3  -> 1, 2"
-
-            if not ((pointCount == 2) or (pointCount == 3)) :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            outPoints = [] 
-            outPoints.append(inPoints[0])
-            outPoints.append(inPoints[1])
-
-            # TODO: 3rd point should define the width
-            # TODO: Refine GCT_PARALLELLINESMIDLINE so it is aligned with the midline, shift it up 
-
-        elif geoConversion == DictionaryConstants.GCT_PARALLELLINESWITHTICKS :
-            print "GCT_PARALLELLINESWITHTICKS"
-            print "Take input points 1, 2, 3, 4 then derive 1 (midpt of 1,3), 2 (midpt of 2, 4)"
-
-            if pointCount < 4 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            x1, y1 = getXYFromString(inPoints[0])
-            x2, y2 = getXYFromString(inPoints[1]) 
-            x3, y3 = getXYFromString(inPoints[2])
-            x4, y4 = getXYFromString(inPoints[3]) 
-
-            midPointX1, midPointY1 = scale(0.5, x1, y1, x3, y3) 
-            midPointX2, midPointY2 = scale(0.5, x2, y2, x4, y4) 
-
-            outPoints = []
-            outPoints.append(getStringFromXY(midPointX1, midPointY1))
-            outPoints.append(getStringFromXY(midPointX2, midPointY2))
-
-        elif (geoConversion == DictionaryConstants.GCT_RECTANGULAR) or \
-            (geoConversion == DictionaryConstants.GCT_RECTANGULAR1PT) :        	
-            print "GCT_RECTANGULAR/GCT_RECTANGULAR1PT"
-
-            x = 0.0
-            y = 0.0
-            if pointCount == 1 :
-                x, y = getXYFromString(inPoints[0])
-            elif pointCount == 2 :
-                x0, y0 = getXYFromString(inPoints[0])
-                x1, y1 = getXYFromString(inPoints[1])
-                x = x0 + ((x1 - x0) / 2.0)
-                y = y0 + ((y1 - y0) / 2.0)
-            else : 
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-                
-            length = 0.0
-            width = 0.0
-            orientation = 0.0
-
-            if attributes.has_key(DictionaryConstants.Tag_Length) :
-                length = float(attributes[DictionaryConstants.Tag_Length])
-                length = getMapUnitsFromMeters(length, wkid)
-            if attributes.has_key(DictionaryConstants.Tag_Width) :
-                width = float(attributes[DictionaryConstants.Tag_Width])
-                width = getMapUnitsFromMeters(width, wkid)
-            if attributes.has_key(DictionaryConstants.Tag_Orientation) :
-                orientation = float(attributes[DictionaryConstants.Tag_Orientation])
-
-            if (length > 0.0) and (width > 0.0) :
-                outPoints = getEnvelopeFromCenterXYLengthWidth(x, y, length, width)
-            else :
-                return None, "Length/Width not set"
-                
-        elif geoConversion == DictionaryConstants.GCT_TRIPLEARROW :       	    
-            print "GCT_TRIPLEARROW"
-            print "1, 2, 3 -> 1, 3" 
-            if pointCount != 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            outPoints = [] 
-            outPoints.append(inPoints[0])
-            outPoints.append(inPoints[2])
-            # TODO move line down
-
-        elif (geoConversion == DictionaryConstants.GCT_TWOLINE) or \
-             (geoConversion == DictionaryConstants.GCT_TWOLINE3OR4PT) :      	
-                       	
-            print "GCT_TWOLINE/GCT_TWOLINE3OR4PT"
-
-            if pointCount < 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
-
-            outPoints = [] 
-
-            if attributes.has_key(DictionaryConstants.Tag_TwoLinesNeeded) and \
-                attributes[DictionaryConstants.Tag_TwoLinesNeeded] == "True" :
-                print "Second Line"
-                outPoints.append(inPoints[0])
-                outPoints.append(inPoints[2])
-            else :
-                print "First Line"
-                outPoints.append(inPoints[0])
-                outPoints.append(inPoints[1])
+    # make tail points by just rotating/scaling the original line
+    x3, y3 = PARALLELLINES_TEMPLATE.apply(xs, ys, xe, ye)[0]
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(endPoint)
+    # outPoints.appendXY(middlePoint) # (x3, y3)
+    outPoints.append(x3, y3)
+
+    return outPoints, None
+
+def parallelLinesWithTicksToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_PARALLELLINESWITHTICKS"
+    print "Take input points 1, 2 then derive envelope with points 1, 2, 4, 3"
+
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    startPoint = inPoints[0]
+    endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
+
+    xs, ys = startPoint
+    xe, ye = endPoint
+
+    # make tail points by just rotating/scaling the original line
+
+    incline = getIncline(xs, ys, xe, ye)
+
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = PARALLELLINESWITHTICKS_TEMPLATES[incline].apply(xs, ys, xe, ye)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(x1, y1)
+    outPoints.append(x2, y2)
+    outPoints.append(x3, y3)
+    outPoints.append(x4, y4)
+
+    return outPoints, None
+
+def rectangularToMessage(converter, profile, inPoints, attributes, wkid) :
+    geoConversion = profile.gct
+    pointCount = len(inPoints)
+    outPoints = None
+
+    print "GCT_RECTANGULAR/GCT_RECTANGULAR1PT"
+
+    length = 0.0
+    width = 0.0
+    orientation = 0.0
+
+    if pointCount >= 3 :
+        length, width, centerX, centerY = getEnvelopeLengthWidthCenterXY(inPoints)
+
+        if (length > 0.0) and (width > 0.0) :
+            attributes[DictionaryConstants.Tag_Length] = getMetersFromLength(length, wkid)
+            attributes[DictionaryConstants.Tag_Width] = getMetersFromLength(width, wkid)
+
+            outPoints = ControlPoints.ControlPoints()
+            if geoConversion == DictionaryConstants.GCT_RECTANGULAR :
+                outPoints.append(centerX - (length / 2.0), centerY)
+                outPoints.append(centerX + (length / 2.0), centerY)
+            if geoConversion == DictionaryConstants.GCT_RECTANGULAR1PT :
+                outPoints.append(centerX, centerY)
+                if orientation > 0.0 :
+                    attributes[DictionaryConstants.Tag_Orientation] = orientation
+
+    return outPoints, None
+
+def tToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_T"
+    print "Points ordered 1, 2 -> 1, 2, derived 3(3/4 length of Line 12)"
+
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    startPoint = inPoints[0]
+    endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
+
+    xs, ys = startPoint
+    xe, ye = endPoint
+
+    # make tail points by just rotating/scaling the original line
+    x3, y3 = T_TEMPLATE.apply(xe, ye, xs, ys)[0]
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(endPoint)
+    outPoints.append(x3, y3)
+
+    return outPoints, None
+
+def tripleArrowToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_TRIPLEARROW"
+    print "Points ordered 1, 2 -> derived 1, derived 2, derived 3"
+
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    startPoint = inPoints[0]
+    endPoint = inPoints[-1]  # last point - just in case more than 2 points were input in ArcMap
+
+    xs, ys = startPoint
+    xe, ye = endPoint
+
+    # make tail points by just rotating/scaling the original line
+    (x1, y1), (x2, y2), (x3, y3) = TRIPLEARROW_TEMPLATE.apply(xs, ys, xe, ye)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(x1, y1)
+    outPoints.append(x2, y2)
+    outPoints.append(x3, y3)
+
+    return outPoints, None
+
+def twoLineToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+
+    if converter.ignoreSecondTwoLine :
+        # IMPORTANT: assumes the 2nd part will always be next
+        converter.ignoreSecondTwoLine = False
+        return None, DictionaryConstants.CONVERSION_IGNORE_SECOND_LINE
+
+    print "GCT_TWOLINE (2PT) or (3OR4PT)"
+    print "Points ordered 1, 2 -> 1, 2, derived 3 (45 degrees rotated)"
+
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    startPoint = inPoints[0]
+    endPoint = inPoints[1]
+
+    xs, ys = startPoint
+    xe, ye = endPoint
+
+    x3, y3 = TWOLINE_TEMPLATE.apply(xs, ys, xe, ye)[0]
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(startPoint)
+    outPoints.appendXY(endPoint)
+    outPoints.append(x3, y3)
+
+    converter.ignoreSecondTwoLine = True
+
+    return outPoints, None
+
+def uOrTShapeToMessage(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_UORTSHAPE"
+    print "Points ordered 1, 2 -> derived 1, derived 2, 3(originally pt 1)"
+
+    if pointCount < 2 :
+        print ">= 2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    startPoint = inPoints[0]
+    endPoint = inPoints[-1] # pointCount - just in case more than 2 points were input in ArcMap
+
+    xs, ys = startPoint
+    xe, ye = endPoint
+
+    # make tail points by just rotating/scaling the original line
+    (x1, y1), (x2, y2) = UORTSHAPE_TEMPLATE.apply(xs, ys, xe, ye)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(x1, y1)
+    outPoints.append(x2, y2)
+    outPoints.appendXY(startPoint)
+
+    return outPoints, None
+
+def arrowToGeometry(converter, profile, inPoints, attributes, wkid) :
+
+    print "GCT_ARROW"
+    print "Reverse the points"
+    outPoints = inPoints.reversed()
+
+    return outPoints, None
+
+def arrowWithOffsetToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_ARROWWITHOFFSET"
+    print "Discard last point, and reverse the remaining points (>3 points required)"
+
+    if pointCount < 2 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = inPoints[0:-1].reversed()
+
+    return outPoints, None
+
+def arrowWithTailToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_ARROWWITHTAIL"
+    print "Use 1st point, and calculate the midpoint of 2, 3 (>3 points required)"
+
+    if pointCount < 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    x0, y0 = inPoints[2]
+    x1, y1 = inPoints[1]
+
+    midPointX, midPointY = scale(0.5, x0, y0, x1, y1)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(midPointX, midPointY)
+    outPoints.appendXY(inPoints[0])
+
+    return outPoints, None
+
+def circleToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_CIRCLE"
+    print "1, 2, -> circle with center pt 1, arcpoint start point 2, 330 degrees of arc"
+
+    if pointCount != 2 :
+        print "2 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    x1, y1 = inPoints[0]
+    x2, y2 = inPoints[1]
+
+    radius = getLength(x1, y1,  x2, y2)
 
-        #elif geoConversion == DictionaryConstants.GCT_TWOLINE3OR4PT  :      	
-        #    print "GCT_TWOLINE3OR4PT"
+    if radius <= 0.0 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_RADIUS
 
-        elif geoConversion == DictionaryConstants.GCT_UORTSHAPE  :         	
-            print "GCT_UORTSHAPE"
-            print "Points ordered 1, 2, 3 -> 1(orig 3), 2 (derived midpt of 1, 2)"
+    startAzimuth = getAzimuth(x1, y1,  x2, y2)
 
-            if pointCount != 3 :
-                return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+    vertexCount = getCircleVertexCount(getCircleRadiusMeters(radius, wkid), converter.getChordTolerance())
+    outPoints = getCircleControlPoints(x1, y1, radius, startAzimuth, 330.0, vertexCount)
 
-            x0, y0 = getXYFromString(inPoints[1]) 
-            x1, y1 = getXYFromString(inPoints[0]) 
+    return outPoints, None
 
-            midPointX, midPointY = scale(0.5, x0, y0, x1, y1) 
+def circularToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
 
-            outPoints = []
-            outPoints.append(inPoints[2])
+    print "GCT_CIRCULAR"
 
-            outPoints.append(getStringFromXY(midPointX, midPointY))
+    radiusMeters = 0.0
+    if attributes.has_key(DictionaryConstants.Tag_Radius) :
+        radiusMeters = float(attributes[DictionaryConstants.Tag_Radius])
 
+    radius = getMapUnitsFromMeters(radiusMeters, wkid)
+
+    outPoints = ControlPoints.ControlPoints()
+
+    if (pointCount == 1 ) :
+        if radius <= 0.0 :
+            return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_RADIUS
+
+        x1, y1 = inPoints[0]
+        vertexCount = getCircleVertexCount(radiusMeters, converter.getChordTolerance())
+        outPoints = getCircleControlPoints(x1, y1, radius, 0.0, 360.0, vertexCount)
+    elif (pointCount > 2) :
+        outPoints = inPoints
+
+    return outPoints, None
+
+def freehandArrowToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_FREEHANDARROW"
+    print "1, 2, 3 -> 1, 2"
+
+    if pointCount != 3 :
+        print "3 points required"
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[0])
+    # TODO: may need to add interpolation points along an arc between these 2 points
+    outPoints.appendXY(inPoints[1])
+
+    return outPoints, None
+
+def freehandLineToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_FREEHANDLINE"
+    print "1, 2, 3 -> 1, 3, 2"
+
+    if pointCount != 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[0])
+    outPoints.appendXY(inPoints[2])
+    outPoints.appendXY(inPoints[1])
+
+    return outPoints, None
+
+def freehandReverseArrowToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_FREEHANDREVERSEARROW"
+    print "1, 2, 3 -> 2, 3, 1"
+
+    if pointCount != 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[1])
+    outPoints.appendXY(inPoints[2])
+    outPoints.appendXY(inPoints[0])
+
+    return outPoints, None
+
+def freehandUToGeometry(converter, profile, inPoints, attributes, wkid) :
+
+    print "GCT_FREEHANDU"
+    print "Reverse Points"
+    # TODO: add interpolation circular arc between pts 2,3 (center is midpoint of L23)
+    outPoints = inPoints.reversed()
+
+    return outPoints, None
+
+def hookToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_HOOK"
+    print "Points ordered 1, 2, 3 -> 2, 1"
+
+    if pointCount != 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[1])
+    outPoints.appendXY(inPoints[0])
+
+    return outPoints, None
+
+def hornsToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_HORNS"
+    print "Take input points 1, 2, 3, 4 then derive 1 (midpt of 1,2), 2 (midpt of 3, 4)"
+
+    if pointCount < 4 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    x1, y1 = inPoints[0]
+    x2, y2 = inPoints[1]
+    x3, y3 = inPoints[2]
+    x4, y4 = inPoints[3]
+
+    midPointX1, midPointY1 = scale(0.5, x1, y1, x2, y2)
+    midPointX2, midPointY2 = scale(0.5, x3, y3, x4, y4)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(midPointX1, midPointY1)
+    outPoints.append(midPointX2, midPointY2)
+
+    return outPoints, None
+
+def openTriangleToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_OPENTRIANGLE"
+    print "Points ordered 2, 1, 3 -> 1, 2, 3"
+
+    if pointCount != 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[1])
+    outPoints.appendXY(inPoints[0])
+    outPoints.appendXY(inPoints[2])
+
+    return outPoints, None
+
+def parallelLinesToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_PARALLELLINES / GCT_PARALLELLINESMIDLINE"
+    print "Points ordered 1, 2, 3  -> 1, 2"
+
+    if not ((pointCount == 2) or (pointCount == 3)) :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[0])
+    outPoints.appendXY(inPoints[1])
+
+    # TODO: 3rd point should define the width
+    # TODO: Refine GCT_PARALLELLINESMIDLINE so it is aligned with the midline, shift it up
+
+    return outPoints, None
+
+def parallelLinesWithTicksToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_PARALLELLINESWITHTICKS"
+    print "Take input points 1, 2, 3, 4 then derive 1 (midpt of 1,3), 2 (midpt of 2, 4)"
+
+    if pointCount < 4 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    x1, y1 = inPoints[0]
+    x2, y2 = inPoints[1]
+    x3, y3 = inPoints[2]
+    x4, y4 = inPoints[3]
+
+    midPointX1, midPointY1 = scale(0.5, x1, y1, x3, y3)
+    midPointX2, midPointY2 = scale(0.5, x2, y2, x4, y4)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.append(midPointX1, midPointY1)
+    outPoints.append(midPointX2, midPointY2)
+
+    return outPoints, None
+
+def rectangularToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+    outPoints = None
+
+    print "GCT_RECTANGULAR/GCT_RECTANGULAR1PT"
+
+    x = 0.0
+    y = 0.0
+    if pointCount == 1 :
+        x, y = inPoints[0]
+    elif pointCount == 2 :
+        x0, y0 = inPoints[0]
+        x1, y1 = inPoints[1]
+        x = x0 + ((x1 - x0) / 2.0)
+        y = y0 + ((y1 - y0) / 2.0)
+    else :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    length = 0.0
+    width = 0.0
+    orientation = 0.0
+
+    if attributes.has_key(DictionaryConstants.Tag_Length) :
+        length = float(attributes[DictionaryConstants.Tag_Length])
+        length = getMapUnitsFromMeters(length, wkid)
+    if attributes.has_key(DictionaryConstants.Tag_Width) :
+        width = float(attributes[DictionaryConstants.Tag_Width])
+        width = getMapUnitsFromMeters(width, wkid)
+    if attributes.has_key(DictionaryConstants.Tag_Orientation) :
+        orientation = float(attributes[DictionaryConstants.Tag_Orientation])
+
+    if (length > 0.0) and (width > 0.0) :
+        outPoints = getEnvelopeControlPointsFromCenterXYLengthWidth(x, y, length, width)
+    else :
+        return None, "Length/Width not set"
+
+    return outPoints, None
+
+def tripleArrowToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_TRIPLEARROW"
+    print "1, 2, 3 -> 1, 3"
+    if pointCount != 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[0])
+    outPoints.appendXY(inPoints[2])
+    # TODO move line down
+
+    return outPoints, None
+
+def twoLineToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+
+    print "GCT_TWOLINE/GCT_TWOLINE3OR4PT"
+
+    if pointCount < 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    outPoints = ControlPoints.ControlPoints()
+
+    if attributes.has_key(DictionaryConstants.Tag_TwoLinesNeeded) and \
+        attributes[DictionaryConstants.Tag_TwoLinesNeeded] == "True" :
+        print "Second Line"
+        outPoints.appendXY(inPoints[0])
+        outPoints.appendXY(inPoints[2])
+    else :
+        print "First Line"
+        outPoints.appendXY(inPoints[0])
+        outPoints.appendXY(inPoints[1])
+
+    return outPoints, None
+
+def uOrTShapeToGeometry(converter, profile, inPoints, attributes, wkid) :
+    pointCount = len(inPoints)
+
+    print "GCT_UORTSHAPE"
+    print "Points ordered 1, 2, 3 -> 1(orig 3), 2 (derived midpt of 1, 2)"
+
+    if pointCount != 3 :
+        return None, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT
+
+    x0, y0 = inPoints[1]
+    x1, y1 = inPoints[0]
+
+    midPointX, midPointY = scale(0.5, x0, y0, x1, y1)
+
+    outPoints = ControlPoints.ControlPoints()
+    outPoints.appendXY(inPoints[2])
+
+    outPoints.append(midPointX, midPointY)
+
+    return outPoints, None
+
+# Batch versions of the conversions (see GeometryConverter.convertBatch), called as
+# (converter, profile, points, attributes, wkids) for m features of one GCT with the same
+# number of points: points is an (m, n, 2) array, attributes and wkids have one entry per feature.
+# Each returns (outPoints, conversionNotes) as the scalar version does for every feature:
+# outPoints an (m, k, 2) array or a list with an (k, 2) array (or None) per feature,
+# conversionNotes None or a list with the notes of each feature (None if it converted).
+# Returning None instead converts the features one at a time with the scalar version.
+
+def batchNotes(points, conversionNotes) :
+    # the same notes for every feature of the batch
+    return None, [conversionNotes] * len(points)
+
+def getBatchMiddlePointIndex(pointCount, middlePointIndex) :
+    # the middle point used for > 2 points (point 1 if middlePointIndex is an end point)
+    if (middlePointIndex > 0) and (middlePointIndex < (pointCount - 1)) :
+        return middlePointIndex
+    return 1
+
+def applyInclineTemplates(templates, incline, p0, p1) :
+    # getInclineTemplates points for an array of inclines (-1.0 or 1.0 per feature)
+    return numpy.where((incline < 0.0)[:, numpy.newaxis, numpy.newaxis], \
+        templates[-1.0].applyArray(p0, p1), templates[1.0].applyArray(p0, p1))
+
+# vertex count -> getUnitCircle as an (n, 2) array
+unitCircleArrays = { }
+
+def getUnitCircleArray(vertexCount) :
+    if not (vertexCount in unitCircleArrays) :
+        unitCircleArrays[vertexCount] = numpy.array(getUnitCircle(vertexCount), dtype = numpy.float64)
+    return unitCircleArrays[vertexCount]
+
+def getBatchCirclePoints(converter, centerPoints, radii, radiiMeters, startAzimuths, arc) :
+    # getCircleControlPoints for each feature (m arrays, radii in map units and meters), the
+    # features with the same vertex count are done together, radius <= 0 fails
+    outPoints = [None] * len(centerPoints)
+    conversionNotes = [None] * len(centerPoints)
+
+    featuresByVertexCount = { }
+    for i in xrange(len(centerPoints)) :
+        if radii[i] <= 0.0 :
+            conversionNotes[i] = DictionaryConstants.CONVERSION_ERROR_VALIDATE_RADIUS
+        else :
+            vertexCount = getCircleVertexCount(radiiMeters[i], converter.getChordTolerance())
+            featuresByVertexCount.setdefault(vertexCount, []).append(i)
+
+    for vertexCount, indexes in featuresByVertexCount.items() :
+        unitCircle = getUnitCircleArray(vertexCount)[0:getArcVertexCount(arc, vertexCount)]
+        circlePoints = GeometryArrays.getCirclePoints(centerPoints[indexes], radii[indexes], \
+            startAzimuths[indexes], unitCircle)
+        for j, i in enumerate(indexes) :
+            outPoints[i] = circlePoints[j]
+
+    return outPoints, conversionNotes
+
+def stackPoints(*pointArrays) :
+    # (m, 2) arrays -> (m, k, 2)
+    return numpy.concatenate([pointArray[:, numpy.newaxis] for pointArray in pointArrays], axis = 1)
+
+def checkPointPointsBatch(converter, profile, points, attributes, wkids) :
+    if (points.shape[1] != 1) or (profile.geometryType != DictionaryConstants.POINT_STRING) :
+        return batchNotes(points, profile.gct + " - Conversion Failed, not Point")
+    return points, None
+
+def checkPolylinePointsBatch(converter, profile, points, attributes, wkids) :
+    if (points.shape[1] < 2) or (profile.geometryType != DictionaryConstants.LINE_STRING) :
+        return batchNotes(points, profile.gct + " - Conversion Failed, not Line")
+    return points, None
+
+def checkPolygonPointsBatch(converter, profile, points, attributes, wkids) :
+    if (points.shape[1] < 3) or (profile.geometryType != DictionaryConstants.AREA_STRING) :
+        return batchNotes(points, profile.gct + " - Conversion Failed, not Polygon")
+    return points, None
+
+def rejectIndeterminatePointsBatch(converter, profile, points, attributes, wkids) :
+    return batchNotes(points, profile.gct + " - Unexpected Conversion type")
+
+def arrowToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, ::-1], None
+
+def arrowWithOffsetToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    reversedPoints = points[:, ::-1]
+    arrowPoints = ARROWWITHOFFSET_TEMPLATE.applyArray(reversedPoints[:, 1], reversedPoints[:, 0])
+    return numpy.concatenate((reversedPoints, arrowPoints), axis = 1), None
+
+def arrowWithTailToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return numpy.concatenate((endPoints[:, numpy.newaxis], \
+        ARROWWITHTAIL_TEMPLATE.applyArray(startPoints, endPoints)), axis = 1), None
+
+def circleToMessageBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if (pointCount < 2) or (pointCount == 3) :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    if pointCount == 2 :
+        centerPoints = points[:, 0]
+        circlePoints = points[:, 1]
+    else :
+        minx, miny, maxx, maxy = GeometryArrays.getExtent(points)
+        if numpy.isnan(minx).any() or numpy.isnan(miny).any() or numpy.isnan(maxx).any() or numpy.isnan(maxy).any() :
+            # (the features with no envelope are done by circleToMessage)
+            return None
+        midx = (minx + maxx) / 2.0
+        midy = (miny + maxy) / 2.0
+        centerPoints = GeometryArrays.makePoints(midx, midy)
+        circlePoints = GeometryArrays.makePoints(midx, miny)
+
+    radii = GeometryArrays.getLength(centerPoints, circlePoints)
+
+    if profile.gct == DictionaryConstants.GCT_CIRCLE :
+        controlPoints = stackPoints(centerPoints, circlePoints)
+    else :
+        controlPoints = centerPoints[:, numpy.newaxis]
+
+    outPoints = []
+    for i in xrange(len(points)) :
+        if radii[i] > 0.0 :
+            attributes[i][DictionaryConstants.Tag_Radius] = getMetersFromLength(float(radii[i]), wkids[i])
+            outPoints.append(controlPoints[i])
+        else :
+            arcpy.AddWarning("IMPORTANT: Circle geometries are not supported by ArcPy")
+            arcpy.AddWarning("You will need to use a polyline, polygon or run GP.Densify_edit Tool")
+            outPoints.append(None)
+
+    return outPoints, None
+
+def freehandArrowToMessageBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    if pointCount == 2 :
+        incline = GeometryArrays.getIncline(startPoints, endPoints)
+        middlePoints = applyInclineTemplates(FREEHANDARROW_TEMPLATES, incline, startPoints, endPoints)[:, 0]
+    else :
+        middlePoints = points[:, getBatchMiddlePointIndex(pointCount, int((pointCount - 1) / 2))]
+
+    return stackPoints(startPoints, endPoints, middlePoints), None
+
+def freehandLineToMessageBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    return stackPoints(points[:, 0], points[:, -1], points[:, int((pointCount - 1) / 2)]), None
+
+def freehandReverseArrowToMessageBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    if pointCount == 2 :
+        startPoints = points[:, 0]
+        endPoints = points[:, 1]
+        incline = GeometryArrays.getIncline(startPoints, endPoints)
+        middlePoints = applyInclineTemplates(FREEHANDARROW_TEMPLATES, incline, startPoints, endPoints)[:, 0]
+    else :
+        startPoints = points[:, -1]
+        endPoints = points[:, 0]
+        middlePoints = points[:, getBatchMiddlePointIndex(pointCount, int((pointCount - 1) / 2))]
+
+    return stackPoints(startPoints, endPoints, middlePoints), None
+
+def freehandUToMessageBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    if pointCount >= 4 :
+        # (4 points are reversed first, as the scalar version does)
+        if pointCount == 4 :
+            points = points[:, ::-1]
+        envelope = GeometryArrays.getEnvelope(*GeometryArrays.getExtent(points))
+        # upper left, upper right, lower right, lower left
+        return envelope[:, [0, 3, 2, 1]], None
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return numpy.concatenate((endPoints[:, numpy.newaxis], FREEHANDU_TEMPLATE.applyArray(startPoints, endPoints), \
+        startPoints[:, numpy.newaxis]), axis = 1), None
+
+def hookToMessageBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, -1]
+    endPoints = points[:, 0]
+    if pointCount == 2 :
+        middlePoints = HOOK_TEMPLATE.applyArray(startPoints, endPoints)[:, 0]
+    else :
+        middlePoints = points[:, getBatchMiddlePointIndex(pointCount, int((pointCount - 1) * 0.75))]
+
+    return stackPoints(startPoints, middlePoints, endPoints), None
+
+def hornsToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return HORNS_TEMPLATE.applyArray(startPoints, endPoints), None
+
+def openTriangleToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [1, 0, 2]], None
+
+def parallelLinesToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return stackPoints(startPoints, endPoints, \
+        PARALLELLINES_TEMPLATE.applyArray(startPoints, endPoints)[:, 0]), None
+
+def parallelLinesWithTicksToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    incline = GeometryArrays.getIncline(startPoints, endPoints)
+    return applyInclineTemplates(PARALLELLINESWITHTICKS_TEMPLATES, incline, startPoints, endPoints), None
+
+def rectangularToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 3 :
+        return [None] * len(points), None
+
+    minx, miny, maxx, maxy = GeometryArrays.getExtent(points)
+    lengths = numpy.fabs(maxy - miny)
+    widths = numpy.fabs(maxx - minx)
+    centerX = minx + (widths / 2.0)
+    centerY = miny + (lengths / 2.0)
+
+    if profile.gct == DictionaryConstants.GCT_RECTANGULAR :
+        controlPoints = stackPoints(GeometryArrays.makePoints(centerX - (lengths / 2.0), centerY), \
+            GeometryArrays.makePoints(centerX + (lengths / 2.0), centerY))
+    elif profile.gct == DictionaryConstants.GCT_RECTANGULAR1PT :
+        controlPoints = GeometryArrays.makePoints(centerX, centerY)[:, numpy.newaxis]
+    else :
+        controlPoints = numpy.empty((len(points), 0, 2))
+
+    # (nan if the envelope failed, so no length/width)
+    outPoints = []
+    for i in xrange(len(points)) :
+        if (lengths[i] > 0.0) and (widths[i] > 0.0) :
+            attributes[i][DictionaryConstants.Tag_Length] = getMetersFromLength(float(lengths[i]), wkids[i])
+            attributes[i][DictionaryConstants.Tag_Width] = getMetersFromLength(float(widths[i]), wkids[i])
+            outPoints.append(controlPoints[i])
+        else :
+            outPoints.append(None)
+
+    return outPoints, None
+
+def tToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return stackPoints(startPoints, endPoints, \
+        T_TEMPLATE.applyArray(endPoints, startPoints)[:, 0]), None
+
+def tripleArrowToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return TRIPLEARROW_TEMPLATE.applyArray(startPoints, endPoints), None
+
+def uOrTShapeToMessageBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    startPoints = points[:, 0]
+    endPoints = points[:, -1]
+    return numpy.concatenate((UORTSHAPE_TEMPLATE.applyArray(startPoints, endPoints), \
+        startPoints[:, numpy.newaxis]), axis = 1), None
+
+def arrowToGeometryBatch(converter, profile, points, attributes, wkids) :
+    return points[:, ::-1], None
+
+def arrowWithOffsetToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, -2::-1], None
+
+def arrowWithTailToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return stackPoints(GeometryArrays.scale(0.5, points[:, 2], points[:, 1]), points[:, 0]), None
+
+def circleToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 2 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    centerPoints = points[:, 0]
+    radii = GeometryArrays.getLength(centerPoints, points[:, 1])
+    startAzimuths = GeometryArrays.getAzimuth(centerPoints, points[:, 1])
+    radiiMeters = [getCircleRadiusMeters(float(radii[i]), wkids[i]) for i in xrange(len(points))]
+
+    return getBatchCirclePoints(converter, centerPoints, radii, radiiMeters, startAzimuths, 330.0)
+
+def circularToGeometryBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount > 2 :
+        return points, None
+    elif pointCount != 1 :
+        return numpy.empty((len(points), 0, 2)), None
+
+    radii = numpy.zeros(len(points))
+    radiiMeters = numpy.zeros(len(points))
+    for i in xrange(len(points)) :
+        if attributes[i].has_key(DictionaryConstants.Tag_Radius) :
+            radiiMeters[i] = float(attributes[i][DictionaryConstants.Tag_Radius])
+            radii[i] = getMapUnitsFromMeters(radiiMeters[i], wkids[i])
+
+    return getBatchCirclePoints(converter, points[:, 0], radii, radiiMeters, numpy.zeros(len(points)), 360.0)
+
+def freehandArrowToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [0, 1]], None
+
+def freehandLineToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [0, 2, 1]], None
+
+def freehandReverseArrowToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [1, 2, 0]], None
+
+def freehandUToGeometryBatch(converter, profile, points, attributes, wkids) :
+    return points[:, ::-1], None
+
+def hookToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [1, 0]], None
+
+def hornsToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 4 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return stackPoints(GeometryArrays.scale(0.5, points[:, 0], points[:, 1]), \
+        GeometryArrays.scale(0.5, points[:, 2], points[:, 3])), None
+
+def openTriangleToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [1, 0, 2]], None
+
+def parallelLinesToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if not ((points.shape[1] == 2) or (points.shape[1] == 3)) :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [0, 1]], None
+
+def parallelLinesWithTicksToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 4 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return stackPoints(GeometryArrays.scale(0.5, points[:, 0], points[:, 2]), \
+        GeometryArrays.scale(0.5, points[:, 1], points[:, 3])), None
+
+def rectangularToGeometryBatch(converter, profile, points, attributes, wkids) :
+    pointCount = points.shape[1]
+    if pointCount == 1 :
+        centerPoints = points[:, 0]
+    elif pointCount == 2 :
+        centerPoints = points[:, 0] + ((points[:, 1] - points[:, 0]) / 2.0)
+    else :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    lengths = numpy.zeros(len(points))
+    widths = numpy.zeros(len(points))
+    for i in xrange(len(points)) :
+        if attributes[i].has_key(DictionaryConstants.Tag_Length) :
+            lengths[i] = getMapUnitsFromMeters(float(attributes[i][DictionaryConstants.Tag_Length]), wkids[i])
+        if attributes[i].has_key(DictionaryConstants.Tag_Width) :
+            widths[i] = getMapUnitsFromMeters(float(attributes[i][DictionaryConstants.Tag_Width]), wkids[i])
+
+    halfWidths = widths / 2.0
+    halfLengths = lengths / 2.0
+    envelopes = GeometryArrays.getEnvelope(centerPoints[:, 0] - halfWidths, centerPoints[:, 1] - halfLengths, \
+        centerPoints[:, 0] + halfWidths, centerPoints[:, 1] + halfLengths)
+
+    outPoints = []
+    conversionNotes = []
+    for i in xrange(len(points)) :
+        if (lengths[i] > 0.0) and (widths[i] > 0.0) :
+            outPoints.append(envelopes[i])
+            conversionNotes.append(None)
+        else :
+            outPoints.append(None)
+            conversionNotes.append("Length/Width not set")
+
+    return outPoints, conversionNotes
+
+def tripleArrowToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return points[:, [0, 2]], None
+
+def twoLineToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] < 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+
+    secondLine = numpy.array([attributes[i].has_key(DictionaryConstants.Tag_TwoLinesNeeded) and \
+        (attributes[i][DictionaryConstants.Tag_TwoLinesNeeded] == "True") for i in xrange(len(points))], \
+        dtype = bool)
+    return stackPoints(points[:, 0], numpy.where(secondLine[:, numpy.newaxis], points[:, 2], points[:, 1])), None
+
+def uOrTShapeToGeometryBatch(converter, profile, points, attributes, wkids) :
+    if points.shape[1] != 3 :
+        return batchNotes(points, DictionaryConstants.CONVERSION_ERROR_VALIDATE_COUNT)
+    return stackPoints(points[:, 2], GeometryArrays.scale(0.5, points[:, 1], points[:, 0])), None
+
+# the standard GCTs (DictionaryConstants.GCT_CODES)
+registerGctHandler(DictionaryConstants.GCT_POINT, checkPointPoints, checkPointPoints, \
+    checkPointPointsBatch, checkPointPointsBatch)
+registerGctHandler(DictionaryConstants.GCT_POLYLINE, checkPolylinePoints, checkPolylinePoints, \
+    checkPolylinePointsBatch, checkPolylinePointsBatch)
+registerGctHandler(DictionaryConstants.GCT_POLYGON, checkPolygonPoints, checkPolygonPoints, \
+    checkPolygonPointsBatch, checkPolygonPointsBatch)
+registerGctHandler(DictionaryConstants.GCT_INDETERMINATE, rejectIndeterminatePoints, rejectIndeterminatePoints, \
+    rejectIndeterminatePointsBatch, rejectIndeterminatePointsBatch)
+registerGctHandler(DictionaryConstants.GCT_ARROW, arrowToMessage, arrowToGeometry, \
+    arrowToMessageBatch, arrowToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_ARROWWITHOFFSET, arrowWithOffsetToMessage, arrowWithOffsetToGeometry, \
+    arrowWithOffsetToMessageBatch, arrowWithOffsetToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_ARROWWITHTAIL, arrowWithTailToMessage, arrowWithTailToGeometry, \
+    arrowWithTailToMessageBatch, arrowWithTailToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_CIRCLE, circleToMessage, circleToGeometry, \
+    circleToMessageBatch, circleToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_CIRCULAR, circleToMessage, circularToGeometry, \
+    circleToMessageBatch, circularToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_FREEHANDARROW, freehandArrowToMessage, freehandArrowToGeometry, \
+    freehandArrowToMessageBatch, freehandArrowToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_FREEHANDLINE, freehandLineToMessage, freehandLineToGeometry, \
+    freehandLineToMessageBatch, freehandLineToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_FREEHANDREVERSEARROW, freehandReverseArrowToMessage, freehandReverseArrowToGeometry, \
+    freehandReverseArrowToMessageBatch, freehandReverseArrowToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_FREEHANDU, freehandUToMessage, freehandUToGeometry, \
+    freehandUToMessageBatch, freehandUToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_HOOK, hookToMessage, hookToGeometry, \
+    hookToMessageBatch, hookToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_HORNS, hornsToMessage, hornsToGeometry, \
+    hornsToMessageBatch, hornsToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_OPENTRIANGLE, openTriangleToMessage, openTriangleToGeometry, \
+    openTriangleToMessageBatch, openTriangleToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_PARALLELLINES, parallelLinesToMessage, parallelLinesToGeometry, \
+    parallelLinesToMessageBatch, parallelLinesToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_PARALLELLINESMIDLINE, parallelLinesToMessage, parallelLinesToGeometry, \
+    parallelLinesToMessageBatch, parallelLinesToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_PARALLELLINESWITHTICKS, parallelLinesWithTicksToMessage, parallelLinesWithTicksToGeometry, \
+    parallelLinesWithTicksToMessageBatch, parallelLinesWithTicksToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_RECTANGULAR, rectangularToMessage, rectangularToGeometry, \
+    rectangularToMessageBatch, rectangularToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_RECTANGULAR1PT, rectangularToMessage, rectangularToGeometry, \
+    rectangularToMessageBatch, rectangularToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_T, tToMessage, parallelLinesToGeometry, \
+    tToMessageBatch, parallelLinesToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_TRIPLEARROW, tripleArrowToMessage, tripleArrowToGeometry, \
+    tripleArrowToMessageBatch, tripleArrowToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_TWOLINE, twoLineToMessage, twoLineToGeometry, \
+    None, twoLineToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_TWOLINE3OR4PT, twoLineToMessage, twoLineToGeometry, \
+    None, twoLineToGeometryBatch)
+registerGctHandler(DictionaryConstants.GCT_UORTSHAPE, uOrTShapeToMessage, uOrTShapeToGeometry, \
+    uOrTShapeToMessageBatch, uOrTShapeToGeometryBatch)
+
+class GeometryConverter() :
+    """description of class"""
+
+    def __init__(self, symbolDictionaryIn, threadSafe = False, chordTolerance = DEFAULT_CHORD_TOLERANCE) :
+        print "GeometryConverter Init"
+        if (symbolDictionaryIn is None) : 
+            print "SymbolDictionary is None"
+        self.symbolDictionary = symbolDictionaryIn
+        self.ignoreSecondTwoLine = False
+        # SIDC -> ConversionProfile, dropped when the dictionary is reloaded
+        self.conversionProfiles = LookupCache.LookupCache(LookupCache.DEFAULT_MAX_SIZE, threadSafe)
+        self.profileGeneration = None
+        self.setChordTolerance(chordTolerance)
+
+    def getSymbolDictionary(self) :
+        return self.symbolDictionary
+
+    def setChordTolerance(self, chordTolerance) :
+        # How far (meters) the chords of densified circles may be from the arc (see getCircleVertexCount)
+        self.chordTolerance = chordTolerance
+
+    def getChordTolerance(self) :
+        return self.chordTolerance
+
+    def createConversionProfile(self, sic) :
+        symbolRecord = self.symbolDictionary.lookup(sic)
+        return ConversionProfile(symbolRecord.GeometryType, symbolRecord.GCT)
+
+    def getConversionProfile(self, sic) :
+        # The (cached) ConversionProfile of sic, so each SIDC is looked up and its GCT
+        # handler found once
+        self.symbolDictionary.checkForUpdates()
+        generation = getattr(self.symbolDictionary, "generation", None)
+        if generation != self.profileGeneration :
+            self.conversionProfiles.clear()
+            self.profileGeneration = generation
+
+        return self.conversionProfiles.getOrLoad(sic, self.createConversionProfile, sic)
+
+    def expectedGeometryType(self, sic) :
+        if (sic == None) :
+            return DictionaryConstants.UNKNOWN_GEOMETRY_STRING
+        return self.getConversionProfile(sic).geometryType
+
+    def requiresConversion(self, sic) :
+
+        if (sic == None) :
+            return False
+
+        return self.getConversionProfile(sic).requiresConversion
+
+    def getWkid(self, attributes) :
+        wkid = 4326 # default to WGS84
+        if attributes.has_key(DictionaryConstants.Tag_Wkid) : 
+            wkid = int(attributes[DictionaryConstants.Tag_Wkid])
+        return wkid
+
+    def completeConversion(self, profile, inPoints, outPoints, conversionNotes, toGeometry) :
+        # (outPoints, msg) once a handler has converted inPoints, the original points
+        # if it gave none, (None, notes) if it failed
+        if conversionNotes is not None :
+            return None, conversionNotes
+
+        geoConversion = profile.gct
+
+        if (not toGeometry) and not ((geoConversion == DictionaryConstants.GCT_TWOLINE) or \
+             (geoConversion == DictionaryConstants.GCT_TWOLINE3OR4PT)) :      
+            self.ignoreSecondTwoLine = False
+
+        # Conversion done, now format output and return message
         msg = "Geometry Conversion: " + geoConversion
-        if outPoints == None :
+        if outPoints is None :
             msg =  "Geometry Conversion: " + geoConversion + " failed. Returning original points."
-            outPoints = inPoints
+            print msg
             arcpy.AddWarning(msg)
-
-            # Additional / debug info
-            # print "Conversion Failed for" 
-            # print sic, pointCount, geoType, geoConversion
-            # print control_points
-            # for key, value in attributes.items() :
-            #    print key, value
+            outPoints = inPoints
 
         return outPoints, msg
+
+    def geometrytoControlPoints(self, sic, control_points, attributes) : 
+        # control_points: "x,y;x,y" string or ControlPoints, returns the converted points
+        # as a "x,y;x,y" string (the message format)
+
+        if (sic == None) or (control_points == None) :
+            return None, DictionaryConstants.CONVERSION_ERROR_VALIDATION
+
+        inPoints = ControlPoints.toControlPoints(control_points)
+        outPoints = None
+        conversionNotes = None
+
+        profile = self.getConversionProfile(sic)
+
+        if profile.handler is not None :
+            outPoints, conversionNotes = profile.handler.toMessage(self, profile, inPoints, \
+                attributes, self.getWkid(attributes))
+
+        outPoints, msg = self.completeConversion(profile, inPoints, outPoints, conversionNotes, False)
+        if outPoints is None :
+            return None, msg
+
+        # Convert the points back to a string before returning
+        return outPoints.toString(), msg
+
+    ########################################################################################
+    ########################################################################################
+
+    def controlPointsToGeometry(self, sic, control_points, attributes) :        
+        # control_points: "x,y;x,y" string or ControlPoints, returns the converted points
+        # as ControlPoints (see MilitaryUtilities.pointsToArcPyGeometry)
+
+        inPoints = ControlPoints.toControlPoints(control_points)
+        outPoints = None
+        conversionNotes = None
+
+        if not self.requiresConversion(sic) : 
+            return inPoints, "No conversion required"
+
+        print "controlPointsToGeometry-->Original Points:"
+        for x, y in inPoints : 
+            print x, y
+
+        profile = self.getConversionProfile(sic)
+
+        if profile.handler is not None :
+            outPoints, conversionNotes = profile.handler.toGeometry(self, profile, inPoints, \
+                attributes, self.getWkid(attributes))
+
+        # Additional / debug info if the conversion failed
+        # print "Conversion Failed for" 
+        # print sic, len(inPoints), profile
+        # print control_points
+        # for key, value in attributes.items() :
+        #    print key, value
+
+        return self.completeConversion(profile, inPoints, outPoints, conversionNotes, True)
+
+    ########################################################################################
+    ########################################################################################
+
+    def convertBatch(self, sidcs, coordinateBuffers, attributes = None, toGeometry = False) :
+        """
+        geometrytoControlPoints (or with toGeometry, controlPointsToGeometry) for many features:
+        sidcs, coordinateBuffers (ControlPoints, "x,y;x,y" strings or numpy (n, 2) arrays) and
+        attributes (a dict for each feature, None for empty ones) are parallel sequences.
+        The features are grouped by GCT and point count and each group is converted at once
+        with numpy (see GctHandler toMessageBatch/toGeometryBatch). GCTs without a batch
+        conversion, ex. GCT_TWOLINE export which pairs consecutive features, are converted
+        one at a time in feature order.
+        Returns a list with (ControlPoints or None, msg) for each feature, what the scalar
+        method returns (ControlPoints in both directions, str() gives the message format).
+        """
+        GeometryArrays.checkNumpy()
+
+        featureCount = len(sidcs)
+        if attributes is None :
+            attributes = [{} for i in xrange(featureCount)]
+
+        results = [None] * featureCount
+        inPointsList = [None] * featureCount
+        profileList = [None] * featureCount
+        profiles = { }
+        groups = { }
+
+        for i in xrange(featureCount) :
+            sic = sidcs[i]
+            coordinateBuffer = coordinateBuffers[i]
+
+            if (not toGeometry) and ((sic == None) or (coordinateBuffer is None)) :
+                results[i] = (None, DictionaryConstants.CONVERSION_ERROR_VALIDATION)
+                continue
+
+            if isinstance(coordinateBuffer, numpy.ndarray) :
+                inPoints = GeometryArrays.fromCoordinates(coordinateBuffer)
+            else :
+                inPoints = ControlPoints.toControlPoints(coordinateBuffer)
+            inPointsList[i] = inPoints
+
+            if toGeometry and (sic == None) :
+                results[i] = (inPoints, "No conversion required")
+                continue
+
+            if not (sic in profiles) :
+                profiles[sic] = self.getConversionProfile(sic)
+            profile = profiles[sic]
+            profileList[i] = profile
+
+            if toGeometry and not profile.requiresConversion :
+                results[i] = (inPoints, "No conversion required")
+                continue
+
+            key = (profile.gct, profile.geometryType, len(inPoints))
+            if key in groups :
+                groups[key].append(i)
+            else :
+                groups[key] = [i]
+
+        # converted[i] = (outPoints, conversionNotes) of the batch handlers
+        converted = { }
+        for (gct, geometryType, pointCount), indexes in groups.items() :
+            profile = profileList[indexes[0]]
+            batchHandler = None
+            if profile.handler is not None :
+                if toGeometry :
+                    batchHandler = profile.handler.toGeometryBatch
+                else :
+                    batchHandler = profile.handler.toMessageBatch
+            if batchHandler is None :
+                continue
+
+            groupAttributes = [attributes[i] for i in indexes]
+            batchResult = batchHandler(self, profile, \
+                GeometryArrays.toPointsArray([inPointsList[i] for i in indexes], pointCount), \
+                groupAttributes, [self.getWkid(featureAttributes) for featureAttributes in groupAttributes])
+            if batchResult is None :
+                continue
+
+            outPoints, conversionNotes = batchResult
+            for j, i in enumerate(indexes) :
+                if (conversionNotes is not None) and (conversionNotes[j] is not None) :
+                    converted[i] = (None, conversionNotes[j])
+                elif (outPoints is None) or (outPoints[j] is None) :
+                    converted[i] = (None, None)
+                else :
+                    converted[i] = (GeometryArrays.toControlPoints(outPoints[j]), None)
+
+        # in feature order, so the results (and GCT_TWOLINE pairing) are those of the scalar calls
+        for i in xrange(featureCount) :
+            if results[i] is not None :
+                continue
+
+            profile = profileList[i]
+            if i in converted :
+                outPoints, conversionNotes = converted[i]
+            else :
+                outPoints = None
+                conversionNotes = None
+                if profile.handler is not None :
+                    if toGeometry :
+                        convert = profile.handler.toGeometry
+                    else :
+                        convert = profile.handler.toMessage
+                    outPoints, conversionNotes = convert(self, profile, inPointsList[i], \
+                        attributes[i], self.getWkid(attributes[i]))
+
+            results[i] = self.completeConversion(profile, inPointsList[i], outPoints, conversionNotes, toGeometry)
+
+        return results
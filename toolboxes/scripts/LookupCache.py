@@ -0,0 +1,126 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# LookupCache.py
+# Description: Size-bounded LRU cache (with hit/miss statistics) for dictionary lookups
+#----------------------------------------------------------------------------------
+
+import collections
+import threading
+
+DEFAULT_MAX_SIZE = 1024
+
+class NoLock(object) :
+    # Stands in for a lock when only one thread uses the object
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback) :
+        return False
+
+def createLock(threadSafe) :
+    if threadSafe :
+        return threading.RLock()
+    else :
+        return NoLock()
+
+class LookupCache(object) :
+    """
+    Least-recently-used cache of lookup results, bounded to maxSize entries.
+    Counts hits, misses and evictions so the size can be tuned from real runs
+    (a few hundred distinct SIDCs is typical for a Military Features dataset).
+    A maxSize of 0 turns caching off (every lookup is a miss).
+    With threadSafe=True every operation holds a lock, so one cache can be shared by threads
+    (a loader runs outside the lock, 2 threads missing the same key may both load it).
+    """
+
+    def __init__(self, maxSize = DEFAULT_MAX_SIZE, threadSafe = False) :
+        self.lock = createLock(threadSafe)
+        self.entries = collections.OrderedDict()
+        self.maxSize = max(0, int(maxSize))
+        self.resetStatistics()
+
+    def __len__(self) :
+        return len(self.entries)
+
+    def __contains__(self, key) :
+        return key in self.entries
+
+    def __str__(self) :
+        with self.lock :
+            return "hits=%d, misses=%d, evictions=%d, size=%d/%d" % (self.hits, self.misses, \
+                self.evictions, len(self.entries), self.maxSize)
+
+    def get(self, key, default = None) :
+        # Returns the cached value for key (a hit), or default (a miss)
+        with self.lock :
+            try :
+                value = self.entries.pop(key)
+            except KeyError :
+                self.misses += 1
+                return default
+
+            # re-insert so the entry moves to the most recently used end
+            self.entries[key] = value
+            self.hits += 1
+            return value
+
+    def getOrLoad(self, key, loader, *loaderArgs) :
+        # Returns the cached value for key, or calls loader(*loaderArgs) and caches its result
+        with self.lock :
+            if key in self.entries :
+                return self.get(key)
+            self.misses += 1
+
+        value = loader(*loaderArgs)
+        self.put(key, value)
+        return value
+
+    def put(self, key, value) :
+        with self.lock :
+            if self.maxSize == 0 :
+                return
+
+            if key in self.entries :
+                del self.entries[key]
+            self.entries[key] = value
+
+            while len(self.entries) > self.maxSize :
+                self.entries.popitem(last = False)
+                self.evictions += 1
+
+    def setMaxSize(self, maxSize) :
+        with self.lock :
+            self.maxSize = max(0, int(maxSize))
+            while len(self.entries) > self.maxSize :
+                self.entries.popitem(last = False)
+                self.evictions += 1
+
+    def getMaxSize(self) :
+        return self.maxSize
+
+    def clear(self) :
+        with self.lock :
+            self.entries.clear()
+
+    def resetStatistics(self) :
+        with self.lock :
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def getStatistics(self) :
+        with self.lock :
+            return dict([('hits', self.hits), ('misses', self.misses), ('evictions', self.evictions), \
+                         ('size', len(self.entries)), ('maxSize', self.maxSize)])
@@ -21,9 +21,11 @@ import uuid
 import re
 import arcpy
 import os
+import threading
 import SymbolDictionary
 import GeometryConverter
 import DictionaryConstants
+import ControlPoints
 
 # All Paths used/shared by the scripts are here:
 currentPath = os.path.dirname(__file__)
@@ -35,36 +37,104 @@ symbolDictionaryPath2525 = os.path.join(dictionaryPath2525,  "Mil2525C.dat" )
 symbolDictionaryPathAPP6 = os.path.join(dictionaryPathApp6,  "App6b.dat" )
 symbolDictionaryPath = None
 
+# Load the dictionary tables into memory once, rather than querying the file for each row
+HYDRATE_SYMBOL_DICTIONARY = True
+# Max number of per-SIDC lookup results memoized by the dictionary (see getCacheStatistics)
+SYMBOL_LOOKUP_CACHE_SIZE = 1024
+# Look SIDCs up in a memory-mapped compiled copy of the dictionary (see CompiledDictionary),
+# starts faster than hydrating and the pages are shared by all processes using it
+USE_COMPILED_SYMBOL_DICTIONARY = False
+# Make the dictionaries safe to share between threads (see SymbolDictionary threadSafe)
+THREAD_SAFE_SYMBOL_DICTIONARY = False
+# Keep the names resolved to SIDCs between runs (see SymbolDictionary.saveLearnedNames)
+PERSIST_LEARNED_SYMBOL_NAMES = True
+# For long-running processes: seconds between checks for a changed dictionary file or rule
+# domains, which are then reloaded (see SymbolDictionary.checkForUpdates), None = never check
+SYMBOL_DICTIONARY_RELOAD_INTERVAL = None
+
+# Standard keys of the symbol dictionary/geometry converter registry
+STANDARD_2525 = "2525"
+STANDARD_APP6 = "APP6"
+
+def getStandardKey(standard) :
+    # Ex. "2525", "2525C", "MIL-STD-2525C" -> "2525", "APP6", "APP6B" -> "APP6"
+    if (standard is not None) and (standard.upper().find("APP6") >= 0) :
+        return STANDARD_APP6
+    else :
+        return STANDARD_2525
+
+def getSymbolDictionaryPathForStandard(standardKey) :
+    if standardKey == STANDARD_APP6 :
+        return symbolDictionaryPathAPP6
+    else :
+        return symbolDictionaryPath2525
+
 def setSymbologyStandard(standard) :
     
-    global symbolDictionary, symbolDictionaryPath, symbolDictionaryPath2525, \
-        symbolDictionaryPathAPP6
+    global symbolDictionary, geoConverter, symbolDictionaryPath, symbologyStandard
     
     if (standard is None) or (standard == "") : 
         print "WARNING: standard is null, using default"
-        symbolDictionaryPath = symbolDictionaryPath2525
-        return    
-    
-    if standard.upper().find("APP6") >= 0 :
-        symbolDictionaryPath = symbolDictionaryPathAPP6
-    else : 
-        symbolDictionaryPath = symbolDictionaryPath2525
+        symbologyStandard = STANDARD_2525
+    else :
+        symbologyStandard = getStandardKey(standard)
+
+    symbolDictionaryPath = getSymbolDictionaryPathForStandard(symbologyStandard)
+
+    # switch to the objects already created for this standard (None if not created yet)
+    symbolDictionary = symbolDictionaryRegistry.get(symbologyStandard)
+    geoConverter = geoConverterRegistry.get(symbologyStandard)
         
     return
-    
+
+def getRegisteredSymbolDictionary(standardKey) :
+    # The process-wide SymbolDictionary for standardKey, created on first use
+    with registryLock :
+        if not (standardKey in symbolDictionaryRegistry) :
+            dictionaryPath = getSymbolDictionaryPathForStandard(standardKey)
+            print "Creating Dictionary from: " +  dictionaryPath
+            symbolDictionaryRegistry[standardKey] = SymbolDictionary.SymbolDictionary(dictionaryPath, \
+                                                        HYDRATE_SYMBOL_DICTIONARY, \
+                                                        SYMBOL_LOOKUP_CACHE_SIZE, \
+                                                        compiled = USE_COMPILED_SYMBOL_DICTIONARY, \
+                                                        threadSafe = THREAD_SAFE_SYMBOL_DICTIONARY, \
+                                                        learnedNames = PERSIST_LEARNED_SYMBOL_NAMES, \
+                                                        reloadInterval = SYMBOL_DICTIONARY_RELOAD_INTERVAL)
+        return symbolDictionaryRegistry[standardKey]
+
+def getRegisteredGeometryConverter(standardKey) :
+    # The process-wide GeometryConverter (using that standard's SymbolDictionary) for standardKey
+    with registryLock :
+        if not (standardKey in geoConverterRegistry) :
+            geoConverterRegistry[standardKey] = GeometryConverter.GeometryConverter( \
+                getRegisteredSymbolDictionary(standardKey), THREAD_SAFE_SYMBOL_DICTIONARY)
+        return geoConverterRegistry[standardKey]
+
+def clearRegistry() :
+    # Drop (and close) the objects created for every standard, they are recreated on next use
+    global symbolDictionary, geoConverter
+
+    with registryLock :
+        for registeredDictionary in symbolDictionaryRegistry.values() :
+            registeredDictionary.close()
+        symbolDictionaryRegistry.clear()
+        geoConverterRegistry.clear()
+    symbolDictionary = None
+    geoConverter = None
+
 def getSymbolDictionary() :
     
-    global symbolDictionary, symbolDictionaryPath, symbolDictionaryPath2525
+    global symbolDictionary, symbolDictionaryPath, symbologyStandard
     
     try :
     
         if (symbolDictionaryPath is None) : 
             print "WARNING: SymbologyStandard / SymbolDictionaryPath has not been set, using default"
-            symbolDictionaryPath = symbolDictionaryPath2525
+            symbologyStandard = STANDARD_2525
+            symbolDictionaryPath = getSymbolDictionaryPathForStandard(symbologyStandard)
         
         if symbolDictionary is None :         
-            print "Creating Dictionary from: " +  symbolDictionaryPath
-            symbolDictionary = SymbolDictionary.SymbolDictionary(symbolDictionaryPath)
+            symbolDictionary = getRegisteredSymbolDictionary(symbologyStandard)
         
     except :
         print "Exception in getSymbolDictionary"    
@@ -78,18 +148,19 @@ def getSymbolDictionaryStandard(standard) :
         
 def getGeometryConverter() :
  
-    global geoConverter, symbolDictionary, symbolDictionaryPath, symbolDictionaryPath2525
+    global geoConverter, symbolDictionaryPath, symbologyStandard
     
     try :
    
         if (symbolDictionaryPath is None) : 
             print "WARNING: SymbologyStandard / SymbolDictionaryPath has not been set, using default"
-            symbolDictionaryPath = symbolDictionaryPath2525
+            symbologyStandard = STANDARD_2525
+            symbolDictionaryPath = getSymbolDictionaryPathForStandard(symbologyStandard)
                 
         if geoConverter is None : 
             print "Creating GeometryConverter from: " +  symbolDictionaryPath  
             getSymbolDictionary()
-            geoConverter = GeometryConverter.GeometryConverter(symbolDictionary)
+            geoConverter = getRegisteredGeometryConverter(symbologyStandard)
         
     except :
         print "Exception in getGeometryConverter"            
@@ -105,10 +176,18 @@ def getGeometryConverterStandard(standard) :
 ## WARNING: these will not be initialized until getSymbolDictionary / getGeometryConverter
 ## are called, this lazy initialization is needed to allow the Symbol Standard to 
 ## be set before creation
+## NOTE: these are the registry objects of the current standard, setSymbologyStandard
+## switches them (the objects of each standard are kept for the life of the process)
 
 ## TODO: may want to make these private/mangled names (prefix with "__")
 symbolDictionary = None # SymbolDictionary.SymbolDictionary(symbolDictionaryPath)
 geoConverter = None # GeometryConverter.GeometryConverter(symbolDictionary)
+symbologyStandard = STANDARD_2525
+
+# Standard key -> SymbolDictionary / GeometryConverter created for it
+symbolDictionaryRegistry = {}
+geoConverterRegistry = {}
+registryLock = threading.RLock()
 
 # Some Military Feature Fields  
 MessageTypeField = "messagetype"
@@ -116,6 +195,10 @@ UniqueDesignationField = "UniqueDesignation"
 SidcFieldChoice1 = "sic"
 SidcFieldChoice2 = "sidc"
 
+# <sic>...</sic> in a message file (the value is group 2)
+MESSAGE_SIDC_REGEX = re.compile("(<" + DictionaryConstants.Tag_SymbolId + ">)([^<]*)(</" \
+    + DictionaryConstants.Tag_SymbolId + ">)")
+
 ##########################################################
 # Getter Methods, just in case tag name changes 
 def getBaseMessageTag() : 
@@ -135,16 +218,15 @@ def getMessageVersion():
 # Handles Common geometry list conversions
 
 def pointsToArcPyGeometry(pointList, shapeType) : 
+    # pointList: ControlPoints (or a list of "x,y" strings)
 
     arcPoint = arcpy.Point()
     arcArray = arcpy.Array()
        
-    for point in pointList : 
-        x = point.split(',')[0]
-        y = point.split(',')[1]
+    for x, y in ControlPoints.toControlPoints(pointList) : 
         # print "(", x, ",", y, ")"
-        arcPoint.X = float(x)
-        arcPoint.Y = float(y)
+        arcPoint.X = x
+        arcPoint.Y = y
         arcArray.add(arcPoint)
 
     if shapeType == "Point" : 
@@ -156,22 +238,20 @@ def pointsToArcPyGeometry(pointList, shapeType) :
         arcPolygon = arcpy.Polygon(arcArray)
         return arcPolygon
               
-def parsePartToControlPoints(part):
-    controlPoints = ""
-    sep = ""
+def parsePartToControlPoints(part, controlPoints = None):
+    # Adds the points of part to controlPoints (a new ControlPoints if None) and returns it
+    if controlPoints is None :
+        controlPoints = ControlPoints.ControlPoints()
     
     try :
     
         for subpart in part:
             try:
                 # assume it's a point
-                subpartStr = str(subpart.X) + "," + str(subpart.Y)
-                controlPoints = controlPoints + sep + subpartStr
-                sep = ";"
+                controlPoints.append(subpart.X, subpart.Y)
             except AttributeError:
                 # it's an array of parts, i.e. a part
-                controlPoints = controlPoints + sep + parsePartToControlPoints(subpart)
-                sep = ";"
+                parsePartToControlPoints(subpart, controlPoints)
                                 
     except :
         print "Exception in parsePartToControlPoints"   
@@ -179,26 +259,54 @@ def parsePartToControlPoints(part):
     return controlPoints
 
 def parseGeometryToControlPoints(geom):
+    # Returns the geometry's points as ControlPoints (str() of it is the "x,y;x,y" message format)
+    controlPoints = ControlPoints.ControlPoints()
     try:
         # assume it's a point
-        return str(geom.X) + "," + str(geom.Y)
+        controlPoints.append(geom.X, geom.Y)
+        return controlPoints
     except AttributeError:
         # it's not a point
         try:
-            controlPoints = ""
-            sep = ""
             for i in range(geom.partCount):
                 part = geom.getPart(i)
                 # part is an array
                 for subpart in part:
-                    controlPoints = controlPoints + sep + parsePartToControlPoints(part)
-                    sep = ";"
+                    parsePartToControlPoints(part, controlPoints)
             return controlPoints
         except AttributeError:
             # it's a part
-            return parsePartToControlPoints(geom)
+            return parsePartToControlPoints(geom, controlPoints)
              
+def getDistinctSidcsInFeatureClass(featureClass) :
+    # The distinct values of the "sic" (or "sidc") field, read with a cursor over just that field
+    fieldNames = [field.name for field in arcpy.ListFields(featureClass)]
+    for sidcField in [SidcFieldChoice1, SidcFieldChoice2] :
+        matchingNames = [fieldName for fieldName in fieldNames if fieldName.lower() == sidcField]
+        if len(matchingNames) > 0 :
+            sidcs = set()
+            with arcpy.da.SearchCursor(featureClass, [matchingNames[0]]) as cursor :
+                for row in cursor :
+                    if not ((row[0] is None) or (row[0] == "")) :
+                        sidcs.add(row[0])
+            return sidcs
+    return set()
+
+def getDistinctSidcsInMessageFile(messageFileName) :
+    # The distinct <sic> values of a message file, found with a text scan (no XML parse)
+    with open(messageFileName, "r") as messageFile :
+        messages = messageFile.read()
+    return set([match.group(2) for match in MESSAGE_SIDC_REGEX.finditer(messages) \
+                if match.group(2) != ""])
+
+def prewarmSymbolDictionary(symbolIds) :
+    # Resolves the SIDCs a tool is about to use into the current dictionary's caches in one
+    # batch (see SymbolDictionary.prewarm), returns the number of distinct SIDCs
+    return getSymbolDictionary().prewarm(symbolIds)
+
 def reverseControlPoints(string):
+    if isinstance(string, ControlPoints.ControlPoints) :
+        return string.reversed()
     revnums = re.split(r'(\;+)', string)
     revnums.reverse()
     revnums = ''.join(revnums)
@@ -0,0 +1,235 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# SymbolCrosswalk.py
+# Description: Translates SIDCs between the 2525C and APP6B dictionaries, using a
+#              table of matching dictionary IDs built once (and cached on disk)
+#----------------------------------------------------------------------------------
+
+import os
+import json
+import binascii
+import MilitaryUtilities
+import SymbolDictionary
+import SymbolIdCode
+import FileCache
+
+CROSSWALK_EXTENSION = ".crosswalk.json"
+CROSSWALK_VERSION = 1
+
+# (from standard key, to standard key) -> SymbolCrosswalk, built on first use
+crosswalks = {}
+
+def normalizeName(name) :
+    # Dictionary names are compared ignoring case and spacing
+    if name is None :
+        return None
+    return " ".join(name.upper().split())
+
+# The IDs with the same (normalized) name and geometry type in both dictionaries, for each
+# source ID the best match is first: the same ID, then the same affiliation, then table order
+CROSSWALK_NAMES_TABLE = "create temp table CrosswalkNames " \
+    + "(Target integer, ID text, Name text, GeometryType text, RowOrder integer)"
+CROSSWALK_NAMES_INSERT = "insert into CrosswalkNames " \
+    + "select ?, ID, NORMALIZE_NAME(Name), GeometryType, rowid from %s.SymbolInfo " \
+    + "where (ID is not null) and (Name is not null)"
+CROSSWALK_NAMES_INDEX = "create index CrosswalkNamesIndex on CrosswalkNames (Target, Name, GeometryType)"
+CROSSWALK_QUERY = "select s.ID, t.ID from CrosswalkNames s " \
+    + "join CrosswalkNames t on (t.Target = 1) and (t.Name = s.Name) and (t.GeometryType = s.GeometryType) " \
+    + "where s.Target = 0 " \
+    + "order by s.RowOrder, (t.ID = s.ID) desc, (substr(t.ID, 2, 1) = substr(s.ID, 2, 1)) desc, t.RowOrder"
+# IDs the name join didn't match that are the same symbol (ID and geometry type) in both
+CROSSWALK_SAME_ID_QUERY = "select s.ID from main.SymbolInfo s " \
+    + "join target.SymbolInfo t on (t.ID = s.ID) and (t.GeometryType = s.GeometryType)"
+
+def buildCrosswalk(sourceFile, targetFile) :
+    # Returns dict source dictionary ID -> target dictionary ID
+    connection = SymbolDictionary.openReadOnlyConnection(sourceFile)
+    try :
+        connection.create_function("NORMALIZE_NAME", 1, normalizeName)
+        with SymbolDictionary.tempTableWrites(connection) :
+            sqliteCursor = connection.cursor()
+            sqliteCursor.execute("attach database ? as target", (targetFile,))
+
+            sqliteCursor.execute(CROSSWALK_NAMES_TABLE)
+            sqliteCursor.execute(CROSSWALK_NAMES_INSERT % "main", (0,))
+            sqliteCursor.execute(CROSSWALK_NAMES_INSERT % "target", (1,))
+            sqliteCursor.execute(CROSSWALK_NAMES_INDEX)
+
+            idMap = {}
+            sqliteCursor.execute(CROSSWALK_QUERY)
+            for sqliteRow in sqliteCursor :
+                idMap.setdefault(sqliteRow[0], sqliteRow[1])
+
+            sqliteCursor.execute(CROSSWALK_SAME_ID_QUERY)
+            for sqliteRow in sqliteCursor :
+                idMap.setdefault(sqliteRow[0], sqliteRow[0])
+
+            sqliteCursor.execute("drop table CrosswalkNames")
+            sqliteCursor.execute("detach database target")
+    finally :
+        connection.close()
+
+    return idMap
+
+def getCrosswalk(fromStandard, toStandard) :
+    fromKey = MilitaryUtilities.getStandardKey(fromStandard)
+    toKey = MilitaryUtilities.getStandardKey(toStandard)
+    with MilitaryUtilities.registryLock :
+        if not ((fromKey, toKey) in crosswalks) :
+            crosswalks[(fromKey, toKey)] = SymbolCrosswalk( \
+                MilitaryUtilities.getSymbolDictionaryPathForStandard(fromKey), \
+                MilitaryUtilities.getSymbolDictionaryPathForStandard(toKey))
+        return crosswalks[(fromKey, toKey)]
+
+def getOtherStandard(standard) :
+    if MilitaryUtilities.getStandardKey(standard) == MilitaryUtilities.STANDARD_APP6 :
+        return MilitaryUtilities.STANDARD_2525
+    return MilitaryUtilities.STANDARD_APP6
+
+def translateSidc(sidc, toStandard, fromStandard = None) :
+    # sidc in toStandard (None if it has no match), fromStandard defaults to the other one
+    if fromStandard is None :
+        fromStandard = getOtherStandard(toStandard)
+    return getCrosswalk(fromStandard, toStandard).translateSidc(sidc)
+
+def translateMessageFile(inputFile, outputFile, toStandard, fromStandard = None) :
+    if fromStandard is None :
+        fromStandard = getOtherStandard(toStandard)
+    return getCrosswalk(fromStandard, toStandard).translateMessageFile(inputFile, outputFile)
+
+class SymbolCrosswalk(object) :
+    """
+    Dictionary ID (masked 10 char SIDC) of one standard -> matching ID of the other,
+    matched by (normalized) name and geometry type. The table is built with one join
+    of the 2 SymbolInfo tables and kept next to the other derived files (see FileCache),
+    it is rebuilt if either dictionary changes.
+    """
+
+    def __init__(self, sourceFile, targetFile, useCache = True) :
+        self.sourceFile = sourceFile
+        self.targetFile = targetFile
+        self.idMap = None
+        self.loadedFromCache = False
+
+        sourceHash = binascii.hexlify(FileCache.fileHash(sourceFile)).decode("ascii")
+        targetHash = binascii.hexlify(FileCache.fileHash(targetFile)).decode("ascii")
+
+        if useCache :
+            self.idMap = self.readCache(sourceHash, targetHash)
+            self.loadedFromCache = self.idMap is not None
+
+        if self.idMap is None :
+            self.idMap = buildCrosswalk(sourceFile, targetFile)
+            if useCache :
+                self.writeCache(sourceHash, targetHash)
+
+    def __len__(self) :
+        return len(self.idMap)
+
+    def getCacheFile(self) :
+        targetName = os.path.splitext(os.path.basename(self.targetFile))[0]
+        return FileCache.getCacheFileName(self.sourceFile, "-" + targetName + CROSSWALK_EXTENSION)
+
+    def readCache(self, sourceHash, targetHash) :
+        cacheFile = self.getCacheFile()
+        if not os.path.isfile(cacheFile) :
+            return None
+
+        try :
+            with open(cacheFile, "r") as crosswalkFile :
+                cached = json.load(crosswalkFile)
+            if (cached.get("version") != CROSSWALK_VERSION) or \
+                (cached.get("sourceHash") != sourceHash) or (cached.get("targetHash") != targetHash) :
+                return None
+            return dict(cached["ids"])
+        except (IOError, OSError, ValueError, KeyError, TypeError) :
+            return None
+
+    def writeCache(self, sourceHash, targetHash) :
+        cached = dict([("version", CROSSWALK_VERSION), \
+                       ("sourceHash", sourceHash), \
+                       ("targetHash", targetHash), \
+                       ("ids", self.idMap)])
+        try :
+            FileCache.atomicWrite(self.getCacheFile(), json.dumps(cached).encode("utf-8"))
+        except (IOError, OSError) as ex :
+            # only costs the next run a rebuild
+            print "Could not cache crosswalk " + self.getCacheFile() + " : " + str(ex)
+
+    def translateId(self, maskedId) :
+        # Matching ID of a masked SIDC (or its 'F' version), None if there is none
+        targetId = self.idMap.get(maskedId)
+        if targetId is None :
+            targetId = self.idMap.get(SymbolIdCode.getFallbackId(maskedId))
+        return targetId
+
+    def translateSidc(self, sidc) :
+        """
+        The SIDC with its symbol (scheme, battle dimension, function ID) replaced by the
+        matching one of the other standard. Its own affiliation, status, symbol modifier
+        (echelon), country and order of battle are kept. None if there's no match.
+        """
+        if sidc is None :
+            return None
+        upperSidc = sidc.upper()
+        if len(upperSidc) < SymbolIdCode.MASKED_LENGTH :
+            return None
+
+        maskedAffiliation = SymbolIdCode.MASKED_AFFILIATIONS.get(upperSidc[1], SymbolIdCode.UNKNOWN_AFFILIATION)
+        targetId = self.translateId(SymbolIdCode.getMaskedId(upperSidc, maskedAffiliation))
+        if targetId is None :
+            return None
+
+        return targetId[0] + upperSidc[1] + targetId[2] + upperSidc[3] + targetId[4:10] + upperSidc[10:]
+
+    def translateSidcs(self, sidcs) :
+        # dict SIDC -> translated SIDC (or None) for a set of SIDCs
+        translations = {}
+        for sidc in sidcs :
+            if not (sidc in translations) :
+                translations[sidc] = self.translateSidc(sidc)
+        return translations
+
+    def translateMessageFile(self, inputFile, outputFile) :
+        """
+        Writes inputFile to outputFile with every <sic> translated (the rest of the
+        file is copied as is). SIDCs with no match are left unchanged.
+        Returns (number of SIDCs translated, set of the SIDCs left unchanged).
+        """
+        with open(inputFile, "r") as messageFile :
+            messages = messageFile.read()
+
+        translations = self.translateSidcs(set([match.group(2).strip() \
+            for match in MilitaryUtilities.MESSAGE_SIDC_REGEX.finditer(messages)]))
+
+        counts = [0]
+        untranslated = set()
+
+        def replaceSidc(match) :
+            value = match.group(2)
+            sidc = value.strip()
+            translatedSidc = translations[sidc]
+            if translatedSidc is None :
+                untranslated.add(sidc)
+                return match.group(0)
+            counts[0] += 1
+            return match.group(1) + value.replace(sidc, translatedSidc) + match.group(3)
+
+        messages = MilitaryUtilities.MESSAGE_SIDC_REGEX.sub(replaceSidc, messages)
+
+        with open(outputFile, "w") as messageFile :
+            messageFile.write(messages)
+
+        return counts[0], untranslated
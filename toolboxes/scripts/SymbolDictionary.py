@@ -18,9 +18,182 @@
 
 import sqlite3
 import os
+import json
+import binascii
+import collections
+import contextlib
 import DictionaryConstants
 import re
 import arcpy
+import threading
+import time
+import LookupCache
+import SymbolNameIndex
+import CompiledDictionary
+import FileCache
+import DomainCatalog
+import SymbolIdCode
+import DictionaryArrays
+
+try :
+    from urllib import pathname2url
+except ImportError :
+    from urllib.request import pathname2url
+
+# SIDC format check (see isValidSidc)
+VALID_SIDC_REGEX = re.compile("^[SGWIOE][PUAFNSHGWMDLJKO\-][PAGSUFXTMOEVLIRNZC\-][APCDXF\-][A-Z0-9\-]{6}[A-Z\-]{2}[A-Z0-9\-]{2}[AECGNSX\-]$")
+
+# Number of compiled statements sqlite3 keeps per connection, the lookups below use
+# a small fixed set of parameterized queries so each one is only prepared once
+CACHED_STATEMENTS = 64
+
+def getFileSignature(fileName) :
+    # (modified time, size) of a file, a cheap check for changes (None if it can't be read)
+    try :
+        fileStat = os.stat(fileName)
+    except OSError :
+        return None
+    return (fileStat.st_mtime, fileStat.st_size)
+
+# Learned name -> SIDC resolutions kept between runs (see saveLearnedNames)
+LEARNED_NAMES_EXTENSION = ".names.json"
+LEARNED_NAMES_VERSION = 1
+MAX_LEARNED_NAMES = 10000
+
+def openReadOnlyConnection(dictionaryFile, checkSameThread = True) :
+    # The dictionary is never written, so open it read-only & immutable (no locks or journal)
+    # Note: URI filenames require Python 3.4+, older versions (ArcGIS) fall back to a plain
+    # connection with query_only set, so writes still fail (see tempTableWrites)
+    uri = "file:" + pathname2url(os.path.abspath(dictionaryFile)) + "?mode=ro&immutable=1"
+    try :
+        return sqlite3.connect(uri, uri=True, cached_statements=CACHED_STATEMENTS, \
+                               check_same_thread=checkSameThread)
+    except TypeError :
+        connection = sqlite3.connect(dictionaryFile, cached_statements=CACHED_STATEMENTS, \
+                                     check_same_thread=checkSameThread)
+        connection.execute("PRAGMA query_only = ON")
+        return connection
+
+@contextlib.contextmanager
+def tempTableWrites(connection) :
+    # query_only also stops writes to temp tables, so lift it while they are filled & used
+    # (with a mode=ro connection only the temp tables are writable either way)
+    connection.execute("PRAGMA query_only = OFF")
+    try :
+        yield connection
+    finally :
+        connection.execute("PRAGMA query_only = ON")
+
+# Everything the converters need about a SIDC in one round trip: the SymbolInfo row for the
+# masked SIDC (or its 'F' version) left joined with its LnAExceptions conversion type (if any)
+# params: (Significant8Chars, masked SIDC, 'F' version, masked SIDC)
+SYMBOL_RECORD_QUERY = "select s.ID, s.Name, s.GeometryType, e.GCT " \
+    + "from (select ? as Significant8Chars) k " \
+    + "left join SymbolInfo s on s.ID in (?, ?) " \
+    + "left join LnAExceptions e on e.Significant8Chars = k.Significant8Chars " \
+    + "order by (s.ID = ?) desc limit 1"
+
+# Set-based version of the above for lookupMany: the masked SIDCs are loaded into a temp
+# table (one row per SIDC) and joined against both SymbolInfo versions & LnAExceptions
+SYMBOL_RECORD_KEYS_TABLE = "create temp table if not exists SymbolLookupKeys " \
+    + "(LookupKey text primary key, FallbackKey text, Significant8Chars text)"
+SYMBOL_RECORDS_QUERY = "select k.LookupKey, s.ID, s.Name, s.GeometryType, " \
+    + "f.ID, f.Name, f.GeometryType, e.GCT " \
+    + "from SymbolLookupKeys k " \
+    + "left join SymbolInfo s on s.ID = k.LookupKey " \
+    + "left join SymbolInfo f on f.ID = k.FallbackKey " \
+    + "left join LnAExceptions e on e.Significant8Chars = k.Significant8Chars " \
+    + "order by k.LookupKey, s.rowid, f.rowid, e.rowid"
+
+def getGeometryStringFromGeometryChar(geoChar) :
+    if (geoChar == 'P') :
+        return DictionaryConstants.POINT_STRING
+    elif (geoChar == 'L') :
+        return DictionaryConstants.LINE_STRING
+    elif (geoChar == 'A') :
+        return DictionaryConstants.AREA_STRING
+    else :
+        return "None"
+
+def getDefaultConversionTypeForGeometryString(geoType) :
+    if (geoType == DictionaryConstants.POINT_STRING) : 
+        return DictionaryConstants.GCT_POINT
+    elif (geoType == DictionaryConstants.LINE_STRING) : 
+        return DictionaryConstants.GCT_POLYLINE
+    elif (geoType == DictionaryConstants.AREA_STRING) :
+        return DictionaryConstants.GCT_POLYGON
+    else :
+        return DictionaryConstants.GCT_INDETERMINATE
+
+class SymbolRecord(object) :
+    """
+    What the dictionary knows about one SIDC (see SymbolDictionary.lookup)
+    Name : SymbolInfo.Name (None if the SIDC is not in SymbolInfo)
+    GeometryType : POINT_STRING, LINE_STRING, AREA_STRING or "None"
+    GCT : LnAExceptions.GCT, or the default conversion type for the GeometryType
+    LookupKey : the SymbolInfo.ID that matched (masked SIDC or its 'F' version)
+    """
+    __slots__ = ('Name', 'GeometryType', 'GCT', 'LookupKey', 'Found')
+
+    def __init__(self, lookupKey, found, name, geometryChar, gct) :
+        self.LookupKey = lookupKey
+        self.Found = found
+        self.Name = name
+        self.GeometryType = getGeometryStringFromGeometryChar(geometryChar)
+        if gct is None :
+            gct = getDefaultConversionTypeForGeometryString(self.GeometryType)
+        self.GCT = gct
+
+    def __repr__(self) :
+        return "SymbolRecord(%s, %s, %s, %s)" % (self.LookupKey, self.Name, \
+            self.GeometryType, self.GCT)
+
+class SymbolTableSnapshot(object) :
+    """
+    In-memory copy of the dictionary tables, read once from an open connection:
+    symbolInfo : SymbolInfo.ID (masked 10 char SIDC) -> full SymbolInfo row
+    gctBySignificant8Chars : LnAExceptions.Significant8Chars -> GCT
+    (if an ID is repeated, the first row is kept, the same row "where ID = ?" returns)
+    """
+
+    def __init__(self, connection) :
+        sqliteCursor = connection.cursor()
+
+        sqliteCursor.execute("select * from SymbolInfo")
+        # column names are case-insensitive in SQL, so index them upper case
+        self.columnIndex = dict([(column[0].upper(), index) \
+            for index, column in enumerate(sqliteCursor.description)])
+        idIndex = self.columnIndex["ID"]
+        self.symbolInfo = {}
+        for sqliteRow in sqliteCursor :
+            self.symbolInfo.setdefault(sqliteRow[idIndex], sqliteRow)
+
+        sqliteCursor.execute("select Significant8Chars, GCT from LnAExceptions")
+        self.gctBySignificant8Chars = {}
+        for sqliteRow in sqliteCursor :
+            self.gctBySignificant8Chars.setdefault(sqliteRow[0], sqliteRow[1])
+
+    def getSymbolInfoRow(self, lookupSic, attribute) :
+        # Same shape as the sqlite fetchone() result: None if no row, else a 1-tuple
+        row = self.symbolInfo.get(lookupSic)
+        if row is None :
+            return None
+        return (row[self.columnIndex[attribute.upper()]],)
+
+    def getSymbolRecord(self, lookupSic, fallbackSic) :
+        lookupKey = lookupSic
+        row = self.symbolInfo.get(lookupSic)
+        if row is None :
+            row = self.symbolInfo.get(fallbackSic)
+            lookupKey = fallbackSic
+
+        gct = self.gctBySignificant8Chars.get(SymbolIdCode.getSignificantChars(lookupSic))
+
+        if row is None :
+            return SymbolRecord(lookupSic, False, None, None, gct)
+
+        return SymbolRecord(lookupKey, True, row[self.columnIndex["NAME"]], \
+                            row[self.columnIndex["GEOMETRYTYPE"]], gct)
 
 class SymbolDictionary(object):
     """ 
@@ -30,13 +203,70 @@ class SymbolDictionary(object):
     looking up a name for a hostile unit. 
     TRICKY: the methods that operate on Representation Rule IDs, e.g. symbolIdToRuleId, 
             must have first have called initializeRulesByMilitaryFeatures(validRepresenationLayer) 
+    NOTE: a single read-only connection to the dictionary file is opened on first use and
+          kept until close() is called (or the with-block exits)
+    NOTE: with hydrate=True the SymbolInfo/LnAExceptions tables are read into memory once
+          at startup and the SIDC lookups below never go back to the file
+    NOTE: with compiled=True the SIDC lookups binary-search a memory-mapped compiled copy of
+          the tables (see CompiledDictionary), rebuilt whenever the .dat file changes
+    NOTE: per-SIDC results are memoized (by masked SIDC) in a bounded LRU cache of cacheSize
+          entries, see getCacheStatistics()
+    NOTE: lookup(sidc) returns name, geometry type and conversion type together, the
+          symbolIdTo... methods are shortcuts to its fields
+    NOTE: SIDCs and names that can't be resolved are remembered (up to missCacheSize of each),
+          so bad data is only queried and warned about once per distinct value
+    NOTE: Name -> SIDC resolution uses an in-memory n-gram index of the names (built on
+          first use, see getNameIndex()) instead of LIKE queries
+    NOTE: with learnedNames=True the names resolved by SymbolNametoSymbolIDExt in earlier runs
+          are loaded at startup, call saveLearnedNames() at the end of a run to keep new ones
+    NOTE: with threadSafe=True one dictionary can be shared by threads: each thread gets its
+          own connection, the caches are locked and the learned name/rule maps are only
+          changed under a lock (close() should only be called once the threads are done)
+          Hydrated or compiled lookups need no connection at all after startup.
+    NOTE: with reloadInterval set (seconds), at most that often the lookups check if the
+          dictionary file (mtime/size, then sha1) or the geodatabase of the rule domains
+          changed, and reload what did (see checkForUpdates). A new snapshot is loaded on
+          the side then swapped in, lookups already running finish with the old one.
+    NOTE: lookupArray(sidcs) resolves a whole array of SIDCs with numpy searchsorted over
+          the tables as sorted arrays (see getTableArrays), needs numpy
     """
 
-    def __init__(self, dictionaryPathAndFile) :
+    def __init__(self, dictionaryPathAndFile, hydrate = False, \
+                 cacheSize = LookupCache.DEFAULT_MAX_SIZE, \
+                 missCacheSize = LookupCache.DEFAULT_MAX_SIZE, compiled = False, \
+                 threadSafe = False, learnedNames = False, reloadInterval = None) :
         self.dictionaryFile = dictionaryPathAndFile
+        self.dictionaryHash = None
+        self.fileSignature = getFileSignature(dictionaryPathAndFile)
+        self.reloadInterval = reloadInterval
+        self.lastUpdateCheck = time.time()
+        self.checkingForUpdates = False
+        # incremented by each reload, results read before a reload aren't cached after it
+        self.generation = 0
+        self.connection = None
+        self.tables = None
+        self.compiled = None
+        self.nameIndex = None
+        self.tableArrays = None
+        self.lookupCache = LookupCache.LookupCache(cacheSize, threadSafe)
+        # negative results, kept apart so bad values can't evict good lookups
+        self.missingSymbolIds = LookupCache.LookupCache(missCacheSize, threadSafe)
+        self.missingNames = LookupCache.LookupCache(missCacheSize, threadSafe)
+
+        # guards the learned/rule maps (and the per-thread connection list)
+        self.lock = LookupCache.createLock(threadSafe)
+        self.threadConnections = None
+        self.openConnections = []
+        if threadSafe :
+            self.threadConnections = threading.local()
 
         self.RuleID2Name = {}
         self.Name2RuleID = {}
+        # feature class -> geodatabase of its rule domain, for each initializeRulesByMilitaryFeatures
+        self.ruleSources = collections.OrderedDict()
+        self.ruleSourcesModifiedTime = {} # geodatabase -> modified time when its rules were read
+        # masked SIDC -> (ruleId, symbolName) results of symbolIdToRuleId
+        self.ruleIdCache = LookupCache.LookupCache(cacheSize, threadSafe)
 
         # Echelons map: echelon name (upper case) -> SIC positions 11 and 12
         self.echelonToSIC1112 = dict([ \
@@ -70,6 +300,9 @@ class SymbolDictionary(object):
                 ("INFANTRY PLATOON F", "SFGPUCI----D---")
                 ])
 
+        # The nameToSIC entries added by SymbolNametoSymbolIDExt (oldest first)
+        self.learnedNameToSIC = collections.OrderedDict()
+
         if (os.path.isfile(self.dictionaryFile)) :
             print "SymbolDictionary Initialized"
             self.initalized = True
@@ -83,7 +316,489 @@ class SymbolDictionary(object):
             raise IOError(msg) 
 
         print "Using dictionary file: " + self.dictionaryFile
-        
+
+        if reloadInterval is not None :
+            # the version to compare with later (must be from now, not from the first use)
+            self.getDictionaryHash()
+
+        if learnedNames :
+            self.loadLearnedNames()
+
+        if compiled :
+            self.openCompiled()
+
+        if hydrate and (self.compiled is None) :
+            self.hydrate()
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback) :
+        self.close()
+        return False
+
+    def getConnection(self) :
+        if self.threadConnections is None :
+            if self.connection is None :
+                self.connection = openReadOnlyConnection(self.dictionaryFile)
+            return self.connection
+
+        # thread-safe mode: one connection per thread (sqlite connections can't be shared)
+        connection = getattr(self.threadConnections, "connection", None)
+        if connection is None :
+            # not checking the thread only lets close() close it from another thread
+            connection = openReadOnlyConnection(self.dictionaryFile, False)
+            self.threadConnections.connection = connection
+            with self.lock :
+                self.openConnections.append(connection)
+        return connection
+
+    def isThreadSafe(self) :
+        return self.threadConnections is not None
+
+    def close(self) :
+        if self.connection is not None :
+            self.connection.close()
+            self.connection = None
+
+        if self.threadConnections is not None :
+            with self.lock :
+                for connection in self.openConnections :
+                    connection.close()
+                self.openConnections = []
+                self.threadConnections = threading.local()
+
+    def hydrate(self) :
+        # Load the lookup tables into memory, then release the file (not needed after this)
+        self.tables = SymbolTableSnapshot(self.getConnection())
+        self.nameIndex = SymbolNameIndex.SymbolNameIndex(self.getConnection())
+        self.lookupCache.clear()
+        self.missingSymbolIds.clear()
+        self.close()
+        print "SymbolDictionary hydrated: " + str(len(self.tables.symbolInfo)) + " symbols, " \
+            + str(len(self.tables.gctBySignificant8Chars)) + " line/area exceptions"
+
+    def loadCompiled(self, connection, sourceHash) :
+        # The compiled copy of the tables, (re)compiled from connection first if it is
+        # missing or was made from a different version of the .dat file
+        compiledFile = CompiledDictionary.getCompiledFileName(self.dictionaryFile)
+
+        compiled = None
+        if os.path.isfile(compiledFile) :
+            try :
+                compiled = CompiledDictionary.CompiledDictionary(compiledFile)
+            except ValueError :
+                compiled = None
+            if (compiled is not None) and not compiled.isCompiledFrom(sourceHash) :
+                compiled.close()
+                compiled = None
+
+        if compiled is None :
+            symbolCount = CompiledDictionary.compileDictionary(connection, sourceHash, compiledFile)
+            print "Compiled " + str(symbolCount) + " symbols to: " + compiledFile
+            compiled = CompiledDictionary.CompiledDictionary(compiledFile)
+
+        return compiled
+
+    def openCompiled(self) :
+        # Use the compiled copy of the tables for SIDC lookups
+        try :
+            compiledFile = CompiledDictionary.getCompiledFileName(self.dictionaryFile)
+            compiled = self.loadCompiled(self.getConnection(), self.getDictionaryHash())
+        except (IOError, OSError, ValueError, sqlite3.Error) as ex :
+            arcpy.AddWarning("Could not use a compiled dictionary, using " \
+                + self.dictionaryFile + " : " + str(ex))
+            return False
+
+        self.compiled = compiled
+        self.lookupCache.clear()
+        self.missingSymbolIds.clear()
+        self.close()
+        print "Using compiled dictionary: " + compiledFile
+        return True
+
+    def checkForUpdates(self, force = False) :
+        """
+        Reloads the dictionary if its file changed and the rules if their domains changed,
+        returns True if anything was reloaded. Unless force is set this only looks every
+        reloadInterval seconds (and never if it is None), so it is cheap to call per lookup.
+        """
+        if not force :
+            if (self.reloadInterval is None) or \
+                (time.time() - self.lastUpdateCheck < self.reloadInterval) :
+                return False
+
+        # one thread checks/reloads, the others carry on with what is loaded
+        with self.lock :
+            if self.checkingForUpdates :
+                return False
+            self.checkingForUpdates = True
+            self.lastUpdateCheck = time.time()
+
+        try :
+            reloaded = False
+
+            fileSignature = getFileSignature(self.dictionaryFile)
+            if (fileSignature is not None) and (fileSignature != self.fileSignature) :
+                # the contents decide, ex. a copy of the same file only changes the mtime
+                dictionaryHash = FileCache.fileHash(self.dictionaryFile)
+                if dictionaryHash != self.getDictionaryHash() :
+                    self.reload(dictionaryHash, fileSignature)
+                    reloaded = True
+                else :
+                    self.fileSignature = fileSignature
+
+            if self.reloadRulesIfModified() :
+                reloaded = True
+
+            return reloaded
+        finally :
+            self.checkingForUpdates = False
+
+    def reload(self, dictionaryHash = None, fileSignature = None) :
+        # Read the dictionary file again (in the same mode: file, hydrated or compiled), then
+        # swap it in and drop everything derived from the old version
+        if fileSignature is None :
+            fileSignature = getFileSignature(self.dictionaryFile)
+        if dictionaryHash is None :
+            dictionaryHash = FileCache.fileHash(self.dictionaryFile)
+
+        tables = None
+        nameIndex = None
+        compiled = None
+        connection = openReadOnlyConnection(self.dictionaryFile, not self.isThreadSafe())
+        try :
+            if self.compiled is not None :
+                compiled = self.loadCompiled(connection, dictionaryHash)
+            elif self.tables is not None :
+                tables = SymbolTableSnapshot(connection)
+                nameIndex = SymbolNameIndex.SymbolNameIndex(connection)
+        except :
+            connection.close()
+            raise
+
+        with self.lock :
+            self.dictionaryHash = dictionaryHash
+            self.fileSignature = fileSignature
+            self.generation += 1
+
+            # (the old objects are left to lookups still using them, not closed)
+            self.compiled = compiled
+            self.tables = tables
+            self.nameIndex = nameIndex
+            self.tableArrays = None
+
+            # connections opened before the change must not be used again (where they are
+            # immutable sqlite assumes the file never changes under them)
+            oldConnection = self.connection
+            self.connection = None
+            if (compiled is None) and (tables is None) and not self.isThreadSafe() :
+                self.connection = connection
+                connection = None
+            if self.isThreadSafe() :
+                # each thread opens a new one on next use, close() closes the old ones
+                self.threadConnections = threading.local()
+
+            self.lookupCache.clear()
+            self.missingSymbolIds.clear()
+            self.missingNames.clear()
+            self.ruleIdCache.clear()
+
+            # names were resolved against the old version
+            for name in self.learnedNameToSIC :
+                if name in self.nameToSIC :
+                    del self.nameToSIC[name]
+            self.learnedNameToSIC.clear()
+
+        if oldConnection is not None :
+            oldConnection.close()
+        if connection is not None :
+            connection.close()
+
+        print "SymbolDictionary reloaded: " + self.dictionaryFile
+
+    def getDictionaryHash(self) :
+        # sha1 of the dictionary file, identifies the version derived files were made from
+        if self.dictionaryHash is None :
+            self.dictionaryHash = FileCache.fileHash(self.dictionaryFile)
+        return self.dictionaryHash
+
+    def getLearnedNamesFile(self) :
+        return FileCache.getCacheFileName(self.dictionaryFile, LEARNED_NAMES_EXTENSION)
+
+    def loadLearnedNames(self) :
+        # Add the names learned in earlier runs (with this version of the dictionary) to nameToSIC,
+        # returns the number added
+        learnedNamesFile = self.getLearnedNamesFile()
+        if not os.path.isfile(learnedNamesFile) :
+            return 0
+
+        try :
+            with open(learnedNamesFile, "r") as namesFile :
+                learned = json.load(namesFile)
+            if (learned.get("version") != LEARNED_NAMES_VERSION) or \
+                (learned.get("dictionaryHash") != binascii.hexlify(self.getDictionaryHash()).decode("ascii")) :
+                print "Ignoring learned names made from another dictionary version: " + learnedNamesFile
+                return 0
+            learnedNames = [(name, sidc) for name, sidc in learned["names"]]
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError) as ex :
+            arcpy.AddWarning("Could not read learned names: " + learnedNamesFile + " : " + str(ex))
+            return 0
+
+        nameCount = 0
+        with self.lock :
+            for name, sidc in learnedNames :
+                # the hard-coded names always win
+                if not (name in self.nameToSIC) :
+                    self.nameToSIC[name] = sidc
+                    self.learnedNameToSIC[name] = sidc
+                    nameCount += 1
+
+        print "Loaded " + str(nameCount) + " learned names from: " + learnedNamesFile
+        return nameCount
+
+    def saveLearnedNames(self) :
+        # Write the learned names (the newest MAX_LEARNED_NAMES) for the next run, returns the number saved
+        with self.lock :
+            learnedNames = list(self.learnedNameToSIC.items())[-MAX_LEARNED_NAMES:]
+
+        learnedNamesFile = self.getLearnedNamesFile()
+        learned = dict([("version", LEARNED_NAMES_VERSION), \
+                        ("dictionaryFile", os.path.abspath(self.dictionaryFile)), \
+                        ("dictionaryHash", binascii.hexlify(self.getDictionaryHash()).decode("ascii")), \
+                        ("names", learnedNames)])
+        try :
+            FileCache.atomicWrite(learnedNamesFile, json.dumps(learned, indent = 1).encode("utf-8"))
+        except (IOError, OSError) as ex :
+            arcpy.AddWarning("Could not save learned names: " + learnedNamesFile + " : " + str(ex))
+            return 0
+
+        return len(learnedNames)
+
+    def clearLearnedNames(self) :
+        # Forget the learned names (in memory and on disk), ex. after changing the rule names
+        with self.lock :
+            for name in self.learnedNameToSIC :
+                if name in self.nameToSIC :
+                    del self.nameToSIC[name]
+            self.learnedNameToSIC.clear()
+
+        learnedNamesFile = self.getLearnedNamesFile()
+        if os.path.isfile(learnedNamesFile) :
+            os.remove(learnedNamesFile)
+
+    def isCompiled(self) :
+        return self.compiled is not None
+
+    def isHydrated(self) :
+        return self.tables is not None
+
+    def getNameIndex(self) :
+        if self.nameIndex is None :
+            with self.lock :
+                if self.nameIndex is None :
+                    self.nameIndex = SymbolNameIndex.SymbolNameIndex(self.getConnection())
+        return self.nameIndex
+
+    def getTableArrays(self) :
+        # The tables as numpy arrays sorted by ID (see DictionaryArrays), built on first use
+        if self.tableArrays is None :
+            with self.lock :
+                if self.tableArrays is None :
+                    self.tableArrays = DictionaryArrays.DictionaryArrays(self.getConnection())
+        return self.tableArrays
+
+    def lookupArray(self, symbolIds) :
+        # lookup() for a whole sequence/array of SIDCs at once, see DictionaryArrays.lookup
+        if self.reloadInterval is not None :
+            self.checkForUpdates()
+        return self.getTableArrays().lookup(symbolIds)
+
+    def findSymbolIdByName(self, symbolNameUpper, matchType) :
+        # matchType is "=" (exact), "%" (starts with) or "%%" (contains), returns the SymbolId
+        # of the first matching SymbolInfo row, or None
+        nameIndex = self.getNameIndex()
+        if matchType == "=" :
+            return nameIndex.findExact(symbolNameUpper)
+        elif matchType == "%" :
+            symbolId = nameIndex.findStartsWith(symbolNameUpper)
+            queryval = symbolNameUpper + "%"
+        else :
+            symbolId = nameIndex.findContains(symbolNameUpper)
+            queryval = '%' + symbolNameUpper + '%'
+
+        if symbolId != SymbolNameIndex.SymbolNameIndex.NOT_INDEXED :
+            return symbolId
+
+        # the name itself has LIKE wildcards in it, so only the SQL gives the same answer
+        sqliteCursor = self.getConnection().cursor()
+        sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) like ?", (queryval,))
+        sqliteRow = sqliteCursor.fetchone()
+        if sqliteRow is None :
+            return None
+        return sqliteRow[0]
+
+    def findSymbolNamesStartingWith(self, prefix, maxCount = None) :
+        # [(name, symbolId)] of the dictionary symbols whose name starts with prefix
+        # (any case), in name order, ex. to offer names as they are typed
+        return self.getNameIndex().findNamesStartingWith(prefix.upper(), maxCount)
+
+    def getLookupCache(self) :
+        return self.lookupCache
+
+    def getCacheStatistics(self) :
+        return self.lookupCache.getStatistics()
+
+    def getMissingSymbolIdCache(self) :
+        return self.missingSymbolIds
+
+    def getMissingNameCache(self) :
+        return self.missingNames
+
+    def fetchSymbolInfoRow(self, lookupSic, attribute) :
+        if self.tables is not None :
+            return self.tables.getSymbolInfoRow(lookupSic, attribute)
+
+        sqliteCursor = self.getConnection().cursor()
+        query = "select " + attribute + " from SymbolInfo where (ID = ?)"
+        sqliteCursor.execute(query, (lookupSic,))
+        return sqliteCursor.fetchone()
+
+    def querySymbolRecord(self, lookupSic) :
+        # some only have 'F' version
+        fallbackSic = SymbolIdCode.getFallbackId(lookupSic)
+
+        if self.compiled is not None :
+            record = SymbolRecord(*self.compiled.findSymbol(lookupSic, fallbackSic))
+        elif self.tables is not None :
+            record = self.tables.getSymbolRecord(lookupSic, fallbackSic)
+        else :
+            sqliteCursor = self.getConnection().cursor()
+            sqliteCursor.execute(SYMBOL_RECORD_QUERY, \
+                (SymbolIdCode.getSignificantChars(lookupSic), lookupSic, fallbackSic, lookupSic))
+            # always returns a row, ID is None if neither SIDC version is in SymbolInfo
+            sqliteRow = sqliteCursor.fetchone()
+            if sqliteRow[0] is None :
+                record = SymbolRecord(lookupSic, False, None, None, sqliteRow[3])
+            else :
+                record = SymbolRecord(sqliteRow[0], True, sqliteRow[1], sqliteRow[2], sqliteRow[3])
+
+        return record
+
+    def cacheSymbolRecord(self, lookupSic, record) :
+        if record.Found :
+            self.lookupCache.put(lookupSic, record)
+        else :
+            # only warned about the first time, after this it comes from missingSymbolIds
+            print "WARNING: " + lookupSic + " NOT FOUND"
+            self.missingSymbolIds.put(lookupSic, record)
+
+    def lookup(self, symbolId) :
+        if self.reloadInterval is not None :
+            self.checkForUpdates()
+
+        lookupSic = self.getMaskedSymbolIdFirst10(symbolId)
+        lookupSic = lookupSic.upper()
+
+        if lookupSic in self.missingSymbolIds :
+            record = self.missingSymbolIds.get(lookupSic)
+            # (could have been evicted by another thread in between)
+            if record is not None :
+                return record
+
+        record = self.lookupCache.get(lookupSic)
+        if record is None :
+            generation = self.generation
+            record = self.querySymbolRecord(lookupSic)
+            if generation == self.generation :
+                self.cacheSymbolRecord(lookupSic, record)
+
+        return record
+
+    def querySymbolRecords(self, lookupSics) :
+        # Returns dict masked SIDC -> SymbolRecord for all of lookupSics
+        records = {}
+
+        if (self.compiled is not None) or (self.tables is not None) :
+            for lookupSic in lookupSics :
+                records[lookupSic] = self.querySymbolRecord(lookupSic)
+            return records
+
+        connection = self.getConnection()
+        with tempTableWrites(connection) :
+            sqliteCursor = connection.cursor()
+            sqliteCursor.execute(SYMBOL_RECORD_KEYS_TABLE)
+            sqliteCursor.execute("delete from SymbolLookupKeys")
+            sqliteCursor.executemany("insert into SymbolLookupKeys values (?, ?, ?)", \
+                [(lookupSic, SymbolIdCode.getFallbackId(lookupSic), \
+                  SymbolIdCode.getSignificantChars(lookupSic)) for lookupSic in lookupSics])
+            sqliteCursor.execute(SYMBOL_RECORDS_QUERY)
+
+            for sqliteRow in sqliteCursor :
+                lookupSic = sqliteRow[0]
+                # if an ID is repeated in a table there are several rows, keep the first
+                if lookupSic in records :
+                    continue
+                if sqliteRow[1] is not None :
+                    records[lookupSic] = SymbolRecord(sqliteRow[1], True, sqliteRow[2], sqliteRow[3], sqliteRow[7])
+                elif sqliteRow[4] is not None :
+                    records[lookupSic] = SymbolRecord(sqliteRow[4], True, sqliteRow[5], sqliteRow[6], sqliteRow[7])
+                else :
+                    records[lookupSic] = SymbolRecord(lookupSic, False, None, None, sqliteRow[7])
+
+            sqliteCursor.execute("delete from SymbolLookupKeys")
+
+        return records
+
+    def lookupMany(self, symbolIds) :
+        # Resolves a whole set of SIDCs (ex. every SIDC in a feature class) with one query,
+        # returns dict SIDC -> SymbolRecord. The records are also added to the lookup cache,
+        # so lookup()/symbolIdTo... calls for these SIDCs no longer query the dictionary.
+        if self.reloadInterval is not None :
+            self.checkForUpdates()
+
+        symbolIdToLookupSic = {}
+        for symbolId in symbolIds :
+            if not (symbolId in symbolIdToLookupSic) :
+                symbolIdToLookupSic[symbolId] = self.getMaskedSymbolIdFirst10(symbolId).upper()
+
+        lookupSics = set(symbolIdToLookupSic.values())
+        uncachedLookupSics = [lookupSic for lookupSic in lookupSics \
+                              if not ((lookupSic in self.lookupCache) or (lookupSic in self.missingSymbolIds))]
+
+        records = {}
+        if len(uncachedLookupSics) > 0 :
+            generation = self.generation
+            records = self.querySymbolRecords(uncachedLookupSics)
+            if generation == self.generation :
+                for lookupSic in uncachedLookupSics :
+                    self.cacheSymbolRecord(lookupSic, records[lookupSic])
+
+        symbolRecords = {}
+        for symbolId, lookupSic in symbolIdToLookupSic.items() :
+            if lookupSic in records :
+                symbolRecords[symbolId] = records[lookupSic]
+            else :
+                symbolRecords[symbolId] = self.lookup(symbolId)
+
+        return symbolRecords
+
+    def prewarm(self, symbolIds) :
+        # Loads the distinct SIDCs about to be used (ex. every SIDC of a feature class) into the
+        # lookup caches with lookupMany, so the per-row lookups don't query the dictionary.
+        # The caches are grown to fit them (unless caching is off). Returns the distinct count.
+        distinctSymbolIds = set([symbolId for symbolId in symbolIds \
+                                 if not ((symbolId is None) or (symbolId == ""))])
+
+        for cache in [self.lookupCache, self.missingSymbolIds] :
+            if 0 < cache.getMaxSize() < len(distinctSymbolIds) :
+                cache.setMaxSize(len(distinctSymbolIds))
+
+        if len(distinctSymbolIds) > 0 :
+            self.lookupMany(distinctSymbolIds)
+
+        return len(distinctSymbolIds)
+
     def getSymbologyStandard(self) :
         if (self.dictionaryFile is None) or (self.dictionaryFile == "") : 
             print "WARNING: standard is null, using default"
@@ -97,8 +812,8 @@ class SymbolDictionary(object):
     # Helper to RegEx test/validate a SIDC for basic correctness 
     # IMPORTANT: does not guarantee correctness
     def isValidSidc(self, sidc) :
-        validSicRegex = "^[SGWIOE][PUAFNSHGWMDLJKO\-][PAGSUFXTMOEVLIRNZC\-][APCDXF\-][A-Z0-9\-]{6}[A-Z\-]{2}[A-Z0-9\-]{2}[AECGNSX\-]$"
-        matching = bool(re.match(validSicRegex, sidc))
+        # (to check many SIDCs at once see SymbolIdCode.validateArray)
+        matching = bool(VALID_SIDC_REGEX.match(sidc))
         return matching
 
     def getRuleID2NameDictionary(self) :
@@ -112,49 +827,41 @@ class SymbolDictionary(object):
 
     def getAffiliationChar(self, sic) :
         ch = sic.upper()[1]
-        if (ch == 'F') or (ch == 'H') or (ch == 'U') or (ch == 'N') :
-            return ch;
-        elif (ch == 'M') or (ch == 'A') or (ch == 'D') or (ch == 'J') or (ch == 'K') :
-            return 'F'
-        elif (ch == 'S') :
-            return 'H'
-        elif (ch == 'L') :
-            return 'N'
-        elif (ch == 'P') or (ch == 'G') or (ch == 'W') or (ch == '-') :
-            return 'U'
+        if ch in SymbolIdCode.MASKED_AFFILIATIONS :
+            return SymbolIdCode.MASKED_AFFILIATIONS[ch]
         else :
             print "Unrecognized affiliation"
-            return 'U'
+            return SymbolIdCode.UNKNOWN_AFFILIATION
 
     def getMaskedSymbolIdFirst10(self, sic) : 
         if len(sic) < 10 :
             upperSic = DictionaryConstants.DEFAULT_POINT_SIDC 
         else :
             upperSic = sic.upper()
-        maskedSic = upperSic[0] + self.getAffiliationChar(upperSic) \
-            + upperSic[2] + 'P' + upperSic[4:10]
-        return maskedSic[0:10]
+        return SymbolIdCode.getMaskedId(upperSic, self.getAffiliationChar(upperSic))
 
     def getSymbolAttribute(self, symbolId, attribute) : 
 
-        sqliteConn = None
-        sqliteCursor = None
-        symboldictionary = self.getDictionaryPath() 
-        sqliteConn = sqlite3.connect(symboldictionary)
-        sqliteCursor = sqliteConn.cursor()
+        if attribute.upper() == "NAME" :
+            return self.symbolIdToName(symbolId)
 
-        lookupSic = self.getMaskedSymbolIdFirst10(symbolId)  
-        lookupSic = lookupSic.upper()                  
+        # a SIDC that isn't in the dictionary has no attributes, this also finds which
+        # ID (masked or 'F' version) the attribute is stored under
+        symbolRecord = self.lookup(symbolId)
+        if not symbolRecord.Found :
+            return "None"
 
-        query = "select " + attribute + " from SymbolInfo where (ID = ?)"
-        sqliteCursor.execute(query, (lookupSic,))
-        sqliteRow = sqliteCursor.fetchone()
+        return self.lookupCache.getOrLoad((attribute, symbolRecord.LookupKey), \
+            self.querySymbolAttribute, symbolId, symbolRecord.LookupKey, attribute)
+
+    def querySymbolAttribute(self, symbolId, lookupSic, attribute) :
+
+        sqliteRow = self.fetchSymbolInfoRow(lookupSic, attribute)
 
         # some only have 'F' version
         if (sqliteRow == None) :
-            lookupSic = lookupSic[0] + 'F' + lookupSic[2] + 'P' + lookupSic[4:10]
-            sqliteCursor.execute(query, (lookupSic,))
-            sqliteRow = sqliteCursor.fetchone()            
+            lookupSic = SymbolIdCode.getFallbackId(lookupSic)
+            sqliteRow = self.fetchSymbolInfoRow(lookupSic, attribute)
 
         if (sqliteRow == None) :
             print "WARNING: " + symbolId + ":" + attribute + " NOT FOUND"
@@ -166,80 +873,38 @@ class SymbolDictionary(object):
         return val
 
     def symbolIdToGeometryType(self, symbolId) :
-
-        sqliteConn = None
-        sqliteCursor = None
-        symboldictionary = self.getDictionaryPath() 
-        sqliteConn = sqlite3.connect(symboldictionary)
-        sqliteCursor = sqliteConn.cursor()
-
-        lookupSic = self.getMaskedSymbolIdFirst10(symbolId)
-        lookupSic = lookupSic.upper()
-
-        query = "select GeometryType from SymbolInfo where (ID = ?)"
-        sqliteCursor.execute(query, (lookupSic,))
-        sqliteRow = sqliteCursor.fetchone()
-        
-        # some only have 'F' version
-        if (sqliteRow == None) :
-            lookupSic = lookupSic[0] + 'F' + lookupSic[2] + 'P' + lookupSic[4:10]
-            sqliteCursor.execute(query, (lookupSic,))
-            sqliteRow = sqliteCursor.fetchone()                   
-        
-        if (sqliteRow == None) :
-            geoType = "None"
-        else :
-            geoChar = sqliteRow[0]
-
-            if (geoChar == 'P') :
-                geoType = DictionaryConstants.POINT_STRING
-            elif (geoChar == 'L') :
-                geoType = DictionaryConstants.LINE_STRING
-            elif (geoChar == 'A') :
-                geoType = DictionaryConstants.AREA_STRING
-
-        # print symbolId, geoType
-        return geoType
+        return self.lookup(symbolId).GeometryType
 
     def symbolIdToGeometryConversionType(self, symbolId) : 
+        return self.lookup(symbolId).GCT
+    
+    def symbolIdToName(self, symbolId) :
+        symbolRecord = self.lookup(symbolId)
+        if not symbolRecord.Found :
+            return "None"
+        return symbolRecord.Name
 
-        sqliteConn = None
-        sqliteCursor = None
-        symboldictionary = self.getDictionaryPath() 
-        sqliteConn = sqlite3.connect(symboldictionary)
-        sqliteCursor = sqliteConn.cursor()
+    def symbolIdToRuleId(self, symbolId) : 
+        # Returns (ruleId, symbolName), the result for each masked SIDC is cached until the
+        # rules are initialized again
+        if self.reloadInterval is not None :
+            self.checkForUpdates()
 
         lookupSic = self.getMaskedSymbolIdFirst10(symbolId)
-        significant8Chars = lookupSic[2:10]
-        significant8Chars = significant8Chars.upper()
-
-        query = "select GCT from LnAExceptions where (Significant8Chars = ?)"
-        sqliteCursor.execute(query, (significant8Chars,))
-        sqliteRow = sqliteCursor.fetchone() 
-            
-        if (sqliteRow == None) :            
-            geoType = self.symbolIdToGeometryType(symbolId)
-            if (geoType == DictionaryConstants.POINT_STRING) : 
-                conversionType = DictionaryConstants.GCT_POINT
-            elif (geoType == DictionaryConstants.LINE_STRING) : 
-                conversionType = DictionaryConstants.GCT_POLYLINE                                
-            elif (geoType == DictionaryConstants.AREA_STRING) :
-                conversionType = DictionaryConstants.GCT_POLYGON
-            else :
-                conversionType = DictionaryConstants.GCT_INDETERMINATE
-        else :
-            conversionType = sqliteRow[0]
+        lookupSic = lookupSic.upper()
 
-        return conversionType
-    
-    def symbolIdToName(self, symbolId) :
-        symbolName = self.getSymbolAttribute(symbolId, "Name")
-        return symbolName
+        return self.ruleIdCache.getOrLoad(lookupSic, self.queryRuleId, symbolId)
 
-    def symbolIdToRuleId(self, symbolId) : 
+    def getRuleIdCache(self) :
+        return self.ruleIdCache
+
+    def queryRuleId(self, symbolId) : 
 
         try :
 
+            # (initializeRulesByMilitaryFeatures replaces the maps, so use the same one throughout)
+            name2RuleID = self.Name2RuleID
+
             if len(self.RuleID2Name) == 0 :
                 print "Rule IDs not initialized"
                 return -1, ""
@@ -260,8 +925,8 @@ class SymbolDictionary(object):
             elif (self.endsInIrregular(symbolName)) : 
                 symbolName = symbolName[0:-10]            
 
-            if (self.Name2RuleID.has_key(symbolName)) :
-                ruleId = self.Name2RuleID[symbolName]
+            if (name2RuleID.has_key(symbolName)) :
+                ruleId = name2RuleID[symbolName]
             else :
                 
                 # arcpy.AddWarning("Could not find RuleID for Symbol Name: " + symbolName)
@@ -273,8 +938,8 @@ class SymbolDictionary(object):
                 elif self.startsWithTaskScreen(correctedSymbolName) :
                     correctedSymbolName = correctedSymbolName.replace('Task - Screen', 'Screen')
 
-                if (self.Name2RuleID.has_key(correctedSymbolName)) :
-                    ruleId = self.Name2RuleID[correctedSymbolName]
+                if (name2RuleID.has_key(correctedSymbolName)) :
+                    ruleId = name2RuleID[correctedSymbolName]
                 else :
                     arcpy.AddWarning("Could not find RuleID for Symbol Name: " + correctedSymbolName)
                     ruleId = -1
@@ -285,50 +950,35 @@ class SymbolDictionary(object):
 
         return ruleId, symbolName
 
+    # Name suffix/prefix checks (case-insensitive)
     def endsInAffilationString(self, str) : 
-        endsInRegex = ".* [FHNU]$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        # ex. "... H"
+        upperStr = str.upper()
+        return (len(upperStr) >= 2) and (upperStr[-2] == ' ') and (upperStr[-1] in "FHNU")
 
     def endsInLeft(self, str) : 
-        endsInRegex = ".*LEFT$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("LEFT")
 
     def endsInRight(self, str) : 
-        endsInRegex = ".*RIGHT$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("RIGHT")
 
     def endsInSafe(self, str) : 
-        endsInRegex = ".*\(SAFE\)$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("(SAFE)")
 
     def endsInPAA(self, str) : 
-        endsInRegex = ".*\(PAA\)$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("(PAA)")
 
     def endsInCircular(self, str) : 
-        endsInRegex = ".*CIRCULAR$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("CIRCULAR")
 
     def endsInRectangular(self, str) : 
-        endsInRegex = ".*RECTANGULAR$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("RECTANGULAR")
 
     def endsInIrregular(self, str) : 
-        endsInRegex = ".*IRREGULAR$"
-        matching = bool(re.match(endsInRegex, str.upper()))
-        return matching
+        return str.upper().endswith("IRREGULAR")
 
     def startsWithTaskScreen(self, str) : 
-        startsWithRegex = "^(TASK - SCREEN).*"
-        matching = bool(re.match(startsWithRegex, str.upper()))
-        return matching
+        return str.upper().startswith("TASK - SCREEN")
     
     def SymbolNametoSymbolID(self, symbolName) :
         # Lookup when looking up the Dictionary Name exactly as it appears in the Dictionary 
@@ -339,6 +989,9 @@ class SymbolDictionary(object):
         # Attempts to handle the many name cases that show up in Military Features
         # A straight Dictionary Name to SIDC case should always work, but the names
         # don't always show up in that form, use SymbolNametoSymbolID for simple case
+
+        if self.reloadInterval is not None :
+            self.checkForUpdates()
          
         foundSIC = False
         add2Map  = False
@@ -347,23 +1000,22 @@ class SymbolDictionary(object):
         # Tricky: the Append Features Tools adds to the base name with "~" so remove all after "~"
         # see SymbolCreator.cs/GetRuleNameFromSidc for separator character/format
         symbolNameUpper = symbolNameUpper.split("~")[0].strip()
+        nameKey = symbolNameUpper
 
         # print ("Using Symbol " + sidc)
         if (symbolNameUpper in self.nameToSIC):
             # Skip the SQL query, because we have already found this one (or it is hardcoded)
             sidc = self.nameToSIC[symbolNameUpper]
             foundSIC = True
+        elif (symbolNameUpper in self.missingNames):
+            # Already failed to map this one (and warned about it)
+            self.missingNames.get(symbolNameUpper)
+            return DictionaryConstants.getDefaultSidcForGeometryString(expectedGeometry)
         else:
-            sqliteConn = None
-            sqliteCursor = None
-            symboldictionary = self.getDictionaryPath()
-            sqliteConn = sqlite3.connect(symboldictionary)
-            sqliteCursor = sqliteConn.cursor()
-            # SQL query (or two) to find SIC
-            sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) = ?", (symbolNameUpper,))
-            sqliteRow = sqliteCursor.fetchone()
+            # Index lookup (or two) to find SIC
+            symbolId = self.findSymbolIdByName(symbolNameUpper, "=")
 
-            if (sqliteRow == None):
+            if (symbolId == None):
                 # if it is not found with the supplied name, we need to try a few more cases:
                 # remove 1) affilition 2) "Left" / "Right" 
                 if self.endsInAffilationString(symbolNameUpper) :
@@ -378,87 +1030,131 @@ class SymbolDictionary(object):
                     sidc = self.nameToSIC[symbolNameUpper]
                     foundSIC = True
                 else :
-                    queryval = symbolNameUpper + "%"
-                    sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE UPPER(Name) like ?", (queryval,))
-                    sqliteRow = sqliteCursor.fetchone()
+                    symbolId = self.findSymbolIdByName(symbolNameUpper, "%")
 
                     # Yet another failing case "some have '-' some don't, ex. "Task - Screen" <-> "Task Screen"
-                    if (sqliteRow == None):
-                        queryval = '%' + symbolNameUpper + '%'
-                        sqliteCursor.execute("SELECT SymbolId FROM SymbolInfo WHERE (UPPER(Name) like ?)", (queryval,))
-                        sqliteRow = sqliteCursor.fetchone()
+                    if (symbolId == None):
+                        symbolId = self.findSymbolIdByName(symbolNameUpper, "%%")
 
-            if (sqliteRow != None):
+            if (symbolId != None):
                 foundSIC = True
-                sidc = sqliteRow[0].replace("*", "-")
+                sidc = symbolId.replace("*", "-")
                 add2Map = True
 
         if (foundSIC) and self.isValidSidc(sidc):
             # If it is now a valid SIDC, replace chars 11 and 12 (in Python that's 10 and 11) with the echelon code
             if (echelonString in self.echelonToSIC1112):
-                sidc = sidc[0:10] + self.echelonToSIC1112[echelonString] + sidc[12:]
+                sidc = SymbolIdCode.replaceSymbolModifier(sidc, self.echelonToSIC1112[echelonString])
 
             # Then check affiliation char (the correct one is not always returned)
             if not ((affiliation is None) or (affiliation is "")) :  
-                affiliationChar = sidc[1]
+                affiliationChar = SymbolIdCode.decode(sidc).affiliation
                 expectedAffiliationChar = DictionaryConstants.affiliationToAffiliationChar[affiliation]
     
                 if affiliationChar != expectedAffiliationChar :
                     print "Unexpected Affiliation Char: " + affiliationChar + " != " + expectedAffiliationChar
-                    sidc = sidc[0] + expectedAffiliationChar + sidc[2:]
+                    sidc = SymbolIdCode.replaceAffiliation(sidc, expectedAffiliationChar)
 
             if add2Map : 
                 # add the query results to the map (if valid)
-                self.nameToSIC[symbolNameUpper] = sidc            
+                with self.lock :
+                    self.nameToSIC[symbolNameUpper] = sidc            
+                    self.learnedNameToSIC[symbolNameUpper] = sidc
                 print "Adding to Map: [" + symbolNameUpper + ", " + sidc + "]"
         else:
             defaultSidc = DictionaryConstants.getDefaultSidcForGeometryString(expectedGeometry)
             sidc = defaultSidc
             warningMsg = "Warning: Could not map " + symbolNameUpper + " to valid SIDC - returning default: " + sidc
             arcpy.AddWarning(warningMsg)
+            self.missingNames.put(nameKey, sidc)
 
         return sidc            
 
-    def initializeRulesByMilitaryFeatures(self, featureClass) :
+    def readRuleNames(self, featureClass) :
+        # Returns (rule field name, geodatabase, [(ruleid, symbolname)]) of featureClass's
+        # rule domain, (None, None, []) if it has none
         # Military Feature use several different possible fields to store this Rule ID        
         desc = arcpy.Describe(featureClass)
-        CODE_FIELD_NAME = "code"
-        DESCRIPTION_FIELD_NAME = "description"
         ruleFieldName = None
         ruleDomainName = None
+        gdbPath = None
         for field in desc.Fields:
             if (field.name in DictionaryConstants.RuleFieldsList):
                 if (field.domain is not None and field.domain != ""):
-                    # Note Bene: only works with FGDBs (assumes MilFeature only stored in these)
-                    dataPath = desc.path
-                    gdbPath = dataPath.split(".gdb")[0]
-                    gdbPath += ".gdb"
+                    gdbPath = DomainCatalog.getGeodatabasePath(desc.path)
                     ruleFieldName = field.name
                     ruleDomainName = field.domain
-                    arcpy.DomainToTable_management(gdbPath, field.domain, "in_memory/" + ruleDomainName, CODE_FIELD_NAME, DESCRIPTION_FIELD_NAME)
                     break
 
-        # map both ways for performance/simplicty of use
-        ruleID2Name = self.getRuleID2NameDictionary()
-        name2RuleID = self.getName2RuleIDDictionary()
-
-        symbolCount = 0
+        ruleNames = []
         if (ruleFieldName is None) or (ruleDomainName is None) :
             arcpy.AddError("Layer RuleId not found, can't continue")
-        else :
-            print "Symbol RuleId found & exporting: " + ruleFieldName
-            domainRows = arcpy.SearchCursor("in_memory/" + ruleDomainName)
-            for domainRow in domainRows:
-                ruleid = domainRow.getValue(CODE_FIELD_NAME)
-                symbolname = domainRow.getValue(DESCRIPTION_FIELD_NAME)
+            return None, None, ruleNames
+
+        print "Symbol RuleId found & exporting: " + ruleFieldName
+        domainCatalog = DomainCatalog.getDomainCatalog(gdbPath)
+        for ruleid, symbolname in domainCatalog.getCodedValues(ruleDomainName) :
+            if self.endsInPAA(symbolname) : 
+                symbolname = symbolname[0:-6]
+
+            print str(ruleid) + " --> " + symbolname
+            ruleNames.append((ruleid, symbolname))
 
-                if self.endsInPAA(symbolname) : 
-                    symbolname = symbolname[0:-6]
+        return ruleFieldName, gdbPath, ruleNames
 
-                symbolCount = symbolCount + 1
-                print str(ruleid) + " --> " + symbolname
+    def setRuleNames(self, ruleNames, replace = False) :
+        # map both ways for performance/simplicty of use
+        # (added to copies that replace the maps, so other threads never see partial maps)
+        with self.lock :
+            if replace :
+                ruleID2Name = {}
+                name2RuleID = {}
+            else :
+                ruleID2Name = dict(self.getRuleID2NameDictionary())
+                name2RuleID = dict(self.getName2RuleIDDictionary())
+            for ruleid, symbolname in ruleNames :
                 ruleID2Name[ruleid] = symbolname
                 name2RuleID[symbolname] = ruleid
+            self.RuleID2Name = ruleID2Name
+            self.Name2RuleID = name2RuleID
+            # the rule IDs found so far may no longer be right
+            self.ruleIdCache.clear()
+
+    def reloadRulesIfModified(self) :
+        # Read the rules of every initialized feature class again if the geodatabase of
+        # any of them changed (ex. the rule domain was edited), returns True if reloaded
+        with self.lock :
+            ruleSources = list(self.ruleSources.items())
+            modifiedTimes = dict(self.ruleSourcesModifiedTime)
+
+        modified = False
+        for gdbPath, modifiedTime in modifiedTimes.items() :
+            if DomainCatalog.getModifiedTime(gdbPath) != modifiedTime :
+                modified = True
+        if not modified :
+            return False
+
+        ruleNames = []
+        for featureClass, gdbPath in ruleSources :
+            modifiedTimes[gdbPath] = DomainCatalog.getModifiedTime(gdbPath)
+            ruleNames.extend(self.readRuleNames(featureClass)[2])
+
+        with self.lock :
+            self.ruleSourcesModifiedTime.update(modifiedTimes)
+        self.setRuleNames(ruleNames, True)
+
+        print "Rules reloaded: " + str(len(ruleNames)) + " rule names"
+        return True
+
+    def initializeRulesByMilitaryFeatures(self, featureClass) :
+        ruleFieldName, gdbPath, ruleNames = self.readRuleNames(featureClass)
+
+        symbolCount = len(ruleNames)
+        if ruleFieldName is not None :
+            with self.lock :
+                self.ruleSources[featureClass] = gdbPath
+                self.ruleSourcesModifiedTime[gdbPath] = DomainCatalog.getModifiedTime(gdbPath)
+            self.setRuleNames(ruleNames)
 
         if symbolCount == 0 :
             arcpy.AddError("No Layer RepRules found, can't continue")
@@ -467,7 +1163,3 @@ class SymbolDictionary(object):
             arcpy.AddWarning("Only " + str(symbolCount) + " RepRules found, may not work as expected")
 
         return ruleFieldName
-
-
-
-
@@ -0,0 +1,268 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# SymbolIdCode.py
+# Description: The fields of a (2525C/APP6B) SIDC, decoded one at a time or
+#              a whole array at once
+#----------------------------------------------------------------------------------
+# SIDC layout (15 chars):
+#   0 scheme, 1 affiliation, 2 battle dimension, 3 status, 4-9 function ID,
+#   10-11 symbol modifier (echelon for units), 12-13 country, 14 order of battle
+# The dictionary stores symbols under a masked 10 char ID: the affiliation is
+# mapped to F/H/N/U and the status set to P (see getMaskedId)
+#----------------------------------------------------------------------------------
+
+import DictionaryConstants
+
+try :
+    import numpy
+except ImportError :
+    # only needed by the array functions
+    numpy = None
+
+SIDC_LENGTH = 15
+MASKED_LENGTH = 10
+
+# (field name, start, end) in SIDC order
+FIELDS = [("scheme", 0, 1), \
+          ("affiliation", 1, 2), \
+          ("battleDimension", 2, 3), \
+          ("status", 3, 4), \
+          ("functionId", 4, 10), \
+          ("symbolModifier", 10, 12), \
+          ("country", 12, 14), \
+          ("orderOfBattle", 14, 15)]
+
+FIELD_NAMES = [field[0] for field in FIELDS]
+
+# fixed layout record, a "S15" SIDC array can be viewed as these with no copying
+SIDC_DTYPE = [(name, "S" + str(end - start)) for name, start, end in FIELDS]
+MASKED_DTYPE = SIDC_DTYPE[0:5]
+
+MASKED_STATUS = 'P'
+FALLBACK_AFFILIATION = 'F'
+UNKNOWN_AFFILIATION = 'U'
+
+UPPER_CASE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS = "0123456789"
+
+# The chars allowed at each position of a valid SIDC (the same sets as
+# SymbolDictionary.isValidSidc's regular expression)
+VALID_CHARACTERS = ["SGWIOE", \
+                    "PUAFNSHGWMDLJKO-", \
+                    "PAGSUFXTMOEVLIRNZC-", \
+                    "APCDXF-"] + \
+                   ([UPPER_CASE + DIGITS + "-"] * 6) + \
+                   ([UPPER_CASE + "-"] * 2) + \
+                   ([UPPER_CASE + DIGITS + "-"] * 2) + \
+                   ["AECGNSX-"]
+
+# affiliation char -> the affiliation the dictionary stores the symbol under
+MASKED_AFFILIATIONS = dict([ \
+            ('F', 'F'), ('H', 'H'), ('U', 'U'), ('N', 'N'), \
+            ('M', 'F'), ('A', 'F'), ('D', 'F'), ('J', 'F'), ('K', 'F'), \
+            ('S', 'H'), \
+            ('L', 'N'), \
+            ('P', 'U'), ('G', 'U'), ('W', 'U'), ('-', 'U')])
+
+class SymbolIdCode(object) :
+    """
+    A SIDC split into its named fields. Fields past the end of a short SIDC are "".
+    """
+
+    __slots__ = FIELD_NAMES
+
+    def __init__(self, sidc) :
+        for name, start, end in FIELDS :
+            setattr(self, name, sidc[start:end])
+
+    def toString(self) :
+        return "".join([getattr(self, name) for name in FIELD_NAMES])
+
+    def __str__(self) :
+        return self.toString()
+
+    def __repr__(self) :
+        return "SymbolIdCode(" + self.toString() + ")"
+
+    def __eq__(self, other) :
+        return isinstance(other, SymbolIdCode) and (self.toString() == other.toString())
+
+    def __ne__(self, other) :
+        return not self.__eq__(other)
+
+    def __hash__(self) :
+        return hash(self.toString())
+
+    def getMaskedAffiliation(self) :
+        return MASKED_AFFILIATIONS.get(self.affiliation.upper(), UNKNOWN_AFFILIATION)
+
+    def getMaskedId(self) :
+        return getMaskedId(self.toString().upper(), self.getMaskedAffiliation())
+
+def decode(sidc) :
+    return SymbolIdCode(sidc)
+
+# String helpers for the lookup paths (these run per symbol, so don't create a SymbolIdCode)
+
+def getMaskedId(upperSidc, maskedAffiliation) :
+    # The 10 char ID the dictionary stores upperSidc's symbol under
+    return upperSidc[0] + maskedAffiliation + upperSidc[2] + MASKED_STATUS + upperSidc[4:10]
+
+def getFallbackId(maskedId) :
+    # Some symbols are only stored under the Friend version of the ID
+    return maskedId[0] + FALLBACK_AFFILIATION + maskedId[2] + MASKED_STATUS + maskedId[4:10]
+
+def getSignificantChars(maskedId) :
+    # The part of the ID used to key LnAExceptions (Significant8Chars)
+    return maskedId[2:10]
+
+def replaceAffiliation(sidc, affiliation) :
+    return sidc[0] + affiliation + sidc[2:]
+
+def replaceSymbolModifier(sidc, symbolModifier) :
+    # ex. set the echelon of a unit SIDC
+    return sidc[0:10] + symbolModifier + sidc[12:]
+
+# Array versions (need numpy), for filters/group-bys over many SIDCs without a string per row
+
+def requireNumpy() :
+    if numpy is None :
+        raise ImportError("numpy is needed to decode SIDC arrays")
+
+def decodeArray(symbolIds) :
+    """
+    Decodes a sequence of SIDCs into a numpy array of SIDC_DTYPE records
+    (ex. records["affiliation"] == "H" to filter, numpy.unique(records["functionId"])
+    to group). The SIDCs are upper cased, longer ones cut to 15 chars.
+    """
+    requireNumpy()
+    codes = numpy.char.upper(numpy.asarray(symbolIds, dtype = "S" + str(SIDC_LENGTH)))
+    return numpy.ascontiguousarray(codes).reshape(-1).view(numpy.dtype(SIDC_DTYPE))
+
+def encodeArray(records) :
+    # SIDC_DTYPE records -> "S15" array of the SIDCs
+    requireNumpy()
+    return numpy.ascontiguousarray(records).view("S" + str(SIDC_LENGTH))
+
+# Byte tables: the kernels below work on (count x width) uint8 arrays of the SIDC chars
+# (the bytes of an "S" array) and translate/check every position with table lookups
+
+byteTables = {}
+
+def getByteTable(name) :
+    # The tables are built once, on first use
+    if not (name in byteTables) :
+        requireNumpy()
+        if name == "upper" :
+            # byte -> upper case byte (as str.upper() on ASCII)
+            table = numpy.arange(256, dtype = numpy.uint8)
+            for ch in UPPER_CASE :
+                table[ord(ch.lower())] = ord(ch)
+        elif name == "normalize" :
+            # upper case and '*' -> '-' (as done to SIDCs from the dictionary)
+            table = getByteTable("upper").copy()
+            table[ord('*')] = ord('-')
+        elif name == "maskedAffiliation" :
+            # affiliation byte -> masked affiliation byte
+            table = numpy.empty(256, dtype = numpy.uint8)
+            table.fill(ord(UNKNOWN_AFFILIATION))
+            for affiliation, maskedAffiliation in MASKED_AFFILIATIONS.items() :
+                table[ord(affiliation)] = ord(maskedAffiliation)
+        elif name == "valid" :
+            # (position, byte) -> True if the char is allowed there
+            table = numpy.zeros((SIDC_LENGTH, 256), dtype = numpy.bool_)
+            for position, characters in enumerate(VALID_CHARACTERS) :
+                table[position, [ord(ch) for ch in characters]] = True
+        else :
+            raise ValueError("No byte table: " + name)
+        byteTables[name] = table
+    return byteTables[name]
+
+def toBytes(symbolIds, width) :
+    # sequence of (ASCII) SIDCs -> (count x width) uint8 array, zero padded
+    codes = numpy.ascontiguousarray(numpy.asarray(symbolIds, dtype = "S" + str(width))).reshape(-1)
+    return codes.view(numpy.uint8).reshape(len(codes), width)
+
+def fromBytes(codeBytes) :
+    # (count x width) uint8 array -> "S<width>" array
+    codeBytes = numpy.ascontiguousarray(codeBytes)
+    return codeBytes.view("S" + str(codeBytes.shape[1])).reshape(-1)
+
+def maskBytes(upperBytes) :
+    # (count x 10 or more) upper cased SIDC bytes -> (count x 10) masked ID bytes
+    maskedBytes = upperBytes[:, 0:MASKED_LENGTH].copy()
+    maskedBytes[:, 1] = getByteTable("maskedAffiliation")[maskedBytes[:, 1]]
+    maskedBytes[:, 3] = ord(MASKED_STATUS)
+
+    # too short to be looked up, these get the default (the same as one at a time)
+    tooShort = maskedBytes[:, MASKED_LENGTH - 1] == 0
+    if tooShort.any() :
+        maskedBytes[tooShort] = toBytes([getMaskedId(DictionaryConstants.DEFAULT_POINT_SIDC, \
+            MASKED_AFFILIATIONS[DictionaryConstants.DEFAULT_POINT_SIDC[1]])], MASKED_LENGTH)[0]
+
+    return maskedBytes
+
+def getMaskedIds(records) :
+    """
+    The masked IDs (as "S10" array) of decodeArray records, the same IDs
+    SymbolDictionary.getMaskedSymbolIdFirst10 returns for the SIDCs
+    """
+    requireNumpy()
+    upperBytes = toBytes(encodeArray(numpy.asarray(records, dtype = numpy.dtype(SIDC_DTYPE))), SIDC_LENGTH)
+    return fromBytes(maskBytes(getByteTable("upper")[upperBytes]))
+
+def validateBytes(codeBytes) :
+    # (count x 16) SIDC bytes -> True for the valid SIDCs (the 16th byte is only
+    # there to catch SIDCs that are too long)
+    positions = numpy.arange(SIDC_LENGTH)
+    return getByteTable("valid")[positions, codeBytes[:, 0:SIDC_LENGTH]].all(axis = 1) & \
+        (codeBytes[:, SIDC_LENGTH] == 0)
+
+def validateArray(symbolIds) :
+    """
+    True/False array: which SIDCs isValidSidc would accept, checked all at once.
+    Like isValidSidc this is case sensitive, normalize first to accept lower case.
+    """
+    requireNumpy()
+    return validateBytes(toBytes(symbolIds, SIDC_LENGTH + 1))
+
+def normalizeArray(symbolIds) :
+    # "S15" array of the SIDCs upper cased, with '*' replaced by '-'
+    requireNumpy()
+    return fromBytes(getByteTable("normalize")[toBytes(symbolIds, SIDC_LENGTH)])
+
+def validateAndMaskArray(symbolIds) :
+    """
+    Checks and keys a whole set of SIDCs (ex. every SIDC of a feature class) in one pass,
+    returns (valid, maskedIds, normalizedIds):
+    valid : True/False array, see validateArray
+    maskedIds : "S10" array of the dictionary lookup keys (see getMaskedIds)
+    normalizedIds : "S15" array, see normalizeArray
+    """
+    requireNumpy()
+    codeBytes = toBytes(symbolIds, SIDC_LENGTH + 1)
+    valid = validateBytes(codeBytes)
+    upperBytes = getByteTable("upper")[codeBytes[:, 0:SIDC_LENGTH]]
+    maskedIds = fromBytes(maskBytes(upperBytes))
+    normalizedIds = fromBytes(getByteTable("normalize")[codeBytes[:, 0:SIDC_LENGTH]])
+    return valid, maskedIds, normalizedIds
+
+def groupIndexes(records, fieldName) :
+    # dict field value -> array of the indexes of the records with that value
+    requireNumpy()
+    values, inverse = numpy.unique(records[fieldName], return_inverse = True)
+    order = numpy.argsort(inverse, kind = "mergesort")
+    splits = numpy.cumsum(numpy.bincount(inverse, minlength = len(values)))[:-1]
+    return dict(zip(values.tolist(), numpy.split(order, splits)))
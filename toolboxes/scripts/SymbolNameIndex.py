@@ -0,0 +1,175 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# SymbolNameIndex.py
+# Description: In-memory index of the dictionary symbol names (sorted names for prefix
+#              queries, trigrams for the rest), used to resolve Name -> SIDC without
+#              the LIKE table scans
+#----------------------------------------------------------------------------------
+
+import array
+import bisect
+
+# Names are indexed by every run of this many characters
+NGRAM_LENGTH = 3
+
+# Characters that are wildcards in a SQL LIKE pattern, queries containing these
+# can't be answered from the index with the same results
+LIKE_WILDCARDS = "%_"
+
+def getNGrams(name) :
+    return set([name[i:i + NGRAM_LENGTH] for i in range(len(name) - NGRAM_LENGTH + 1)])
+
+def hasLikeWildcards(name) :
+    for wildcard in LIKE_WILDCARDS :
+        if wildcard in name :
+            return True
+    return False
+
+def buildRangeMinimums(values) :
+    # Sparse table: level k holds the minimum of values[i:i + 2**k] for each i,
+    # so the minimum of any range is the smaller of 2 entries of one level
+    levels = [array.array('i', values)]
+    width = 1
+    while (width * 2) <= len(values) :
+        previous = levels[-1]
+        levels.append(array.array('i', [min(previous[i], previous[i + width]) \
+                                        for i in range(len(previous) - width)]))
+        width *= 2
+    return levels
+
+def getRangeMinimum(levels, start, end) :
+    # minimum of values[start:end] (end > start)
+    level = (end - start).bit_length() - 1
+    return min(levels[level][start], levels[level][end - (1 << level)])
+
+class SymbolNameIndex(object) :
+    """
+    Answers the 3 Name -> SymbolId queries used by SymbolDictionary.SymbolNametoSymbolIDExt
+    with the same result as the SQL it replaces (the first SymbolInfo row in table order):
+    findExact      : UPPER(Name) = x
+    findStartsWith : UPPER(Name) LIKE 'x%'
+    findContains   : UPPER(Name) LIKE '%x%'
+    Queries must already be upper case. The names are upper cased by sqlite (UPPER())
+    when the index is built, so they compare exactly the way the SQL did.
+    The names starting with a prefix are one range of the sorted names, found with 2
+    binary searches, the first of them in table order comes from a range minimum table.
+    findNamesStartingWith lists that range (ex. for autocomplete).
+    A query the index can't answer the same way (a LIKE wildcard in it) returns
+    NOT_INDEXED and the caller should fall back to SQL.
+    """
+
+    NOT_INDEXED = "NOT_INDEXED"
+
+    def __init__(self, connection) :
+        # names/symbolIds are in table (rowid) order, i.e. the order a table scan returns them
+        self.names = []
+        self.symbolIds = []
+        self.displayNames = [] # the names as they are in the table (not upper cased)
+        self.nameToPosition = {}
+        self.postings = {} # n-gram -> ascending positions of the names containing it
+
+        sqliteCursor = connection.cursor()
+        sqliteCursor.execute("SELECT UPPER(Name), SymbolId, Name FROM SymbolInfo " \
+                             + "WHERE Name IS NOT NULL ORDER BY rowid")
+
+        for sqliteRow in sqliteCursor :
+            position = len(self.names)
+            name = sqliteRow[0]
+            self.names.append(name)
+            self.symbolIds.append(sqliteRow[1])
+            self.displayNames.append(sqliteRow[2])
+            self.nameToPosition.setdefault(name, position)
+
+            for ngram in getNGrams(name) :
+                positions = self.postings.get(ngram)
+                if positions is None :
+                    positions = array.array('i')
+                    self.postings[ngram] = positions
+                positions.append(position)
+
+        # positions sorted by name (then table order), and the names in that order
+        self.sortedPositions = sorted(range(len(self.names)), key = lambda position : self.names[position])
+        self.sortedNames = [self.names[position] for position in self.sortedPositions]
+        self.sortedPositionMinimums = buildRangeMinimums(self.sortedPositions)
+
+    def __len__(self) :
+        return len(self.names)
+
+    def getPrefixRange(self, symbolNameUpper) :
+        # (start, end) of the sorted names starting with symbolNameUpper
+        start = bisect.bisect_left(self.sortedNames, symbolNameUpper)
+        low = start
+        high = len(self.sortedNames)
+        while low < high :
+            middle = (low + high) // 2
+            if self.sortedNames[middle].startswith(symbolNameUpper) :
+                low = middle + 1
+            else :
+                high = middle
+        return start, low
+
+    def getCandidatePositions(self, symbolNameUpper) :
+        # The shortest posting list of the query's n-grams (every match is in it),
+        # or all positions if the query is too short to have an n-gram
+        ngrams = getNGrams(symbolNameUpper)
+        if len(ngrams) == 0 :
+            return range(len(self.names))
+
+        shortest = None
+        for ngram in ngrams :
+            positions = self.postings.get(ngram)
+            if positions is None :
+                # some part of the query is in no name at all
+                return []
+            if (shortest is None) or (len(positions) < len(shortest)) :
+                shortest = positions
+
+        return shortest
+
+    def findExact(self, symbolNameUpper) :
+        position = self.nameToPosition.get(symbolNameUpper)
+        if position is None :
+            return None
+        return self.symbolIds[position]
+
+    def findStartsWith(self, symbolNameUpper) :
+        if hasLikeWildcards(symbolNameUpper) :
+            return SymbolNameIndex.NOT_INDEXED
+
+        start, end = self.getPrefixRange(symbolNameUpper)
+        if start == end :
+            return None
+
+        return self.symbolIds[getRangeMinimum(self.sortedPositionMinimums, start, end)]
+
+    def findNamesStartingWith(self, symbolNameUpper, maxCount = None) :
+        # [(name, symbolId)] of the names starting with symbolNameUpper, in name order
+        # (the names as in the table, a name in several rows is listed for each)
+        start, end = self.getPrefixRange(symbolNameUpper)
+        if (maxCount is not None) and (end - start > maxCount) :
+            end = start + maxCount
+
+        return [(self.displayNames[position], self.symbolIds[position]) \
+                for position in self.sortedPositions[start:end]]
+
+    def findContains(self, symbolNameUpper) :
+        if hasLikeWildcards(symbolNameUpper) :
+            return SymbolNameIndex.NOT_INDEXED
+
+        for position in self.getCandidatePositions(symbolNameUpper) :
+            if symbolNameUpper in self.names[position] :
+                return self.symbolIds[position]
+
+        return None
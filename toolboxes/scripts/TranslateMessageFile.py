@@ -0,0 +1,87 @@
+#----------------------------------------------------------------------------------
+# Copyright 2013 Esri
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#----------------------------------------------------------------------------------
+# TranslateMessageFile.py
+# Description: Rewrites a message file with its SIDCs translated to the other
+#              symbology standard (2525C <-> APP6B)
+# Requirements: ArcGIS Desktop Standard
+#----------------------------------------------------------------------------------
+
+import os
+import sys
+import traceback
+import arcpy
+import MilitaryUtilities
+import SymbolCrosswalk
+
+### Params:
+### 0 - input message file
+### 1 - output message file
+### 2 - standard to translate to ("2525", "APP6")
+
+try :
+
+    inputFile = arcpy.GetParameterAsText(0)
+
+    if (inputFile == "") or (inputFile is None) or not os.path.isfile(inputFile) :
+        msg = "Input message file does not exist: " + str(inputFile) + " - exiting"
+        arcpy.AddError(msg)
+        raise IOError(msg)
+
+    outputFile = arcpy.GetParameterAsText(1)
+    if (outputFile == "") or (outputFile is None) :
+        outputFile = os.path.splitext(inputFile)[0] + "-translated.xml"
+
+    toStandard = arcpy.GetParameterAsText(2)
+    if (toStandard == "") or (toStandard is None) :
+        toStandard = MilitaryUtilities.STANDARD_APP6
+    fromStandard = SymbolCrosswalk.getOtherStandard(toStandard)
+
+    arcpy.AddMessage("Running with Parameters:")
+    arcpy.AddMessage("0 - Input message file: " + str(inputFile))
+    arcpy.AddMessage("1 - Output message file: " + str(outputFile))
+    arcpy.AddMessage("2 - Translate from: " + fromStandard + " to: " + MilitaryUtilities.getStandardKey(toStandard))
+
+    translatedCount, untranslated = SymbolCrosswalk.translateMessageFile(inputFile, outputFile, toStandard, fromStandard)
+
+    arcpy.AddMessage("SIDCs translated: " + str(translatedCount))
+    if len(untranslated) > 0 :
+        arcpy.AddWarning("SIDCs with no match in " + MilitaryUtilities.getStandardKey(toStandard) \
+            + " (left unchanged): " + str(sorted(untranslated)))
+
+    # Set output
+    arcpy.SetParameterAsText(1, outputFile)
+
+except arcpy.ExecuteError:
+    # Get the tool error messages
+    msgs = arcpy.GetMessages()
+    arcpy.AddError(msgs)
+    print msgs
+
+except:
+    # Get the traceback object
+    tb = sys.exc_info()[2]
+    tbinfo = traceback.format_tb(tb)[0]
+
+    # Concatenate information together concerning the error into a message string
+    pymsg = "PYTHON ERRORS:\nTraceback info:\n" + tbinfo + "\nError Info:\n" + str(sys.exc_info()[1])
+    msgs = "ArcPy ERRORS:\n" + arcpy.GetMessages() + "\n"
+
+    # Return python error messages for use in script tool or Python Window
+    arcpy.AddError(pymsg)
+    arcpy.AddError(msgs)
+
+    # Print Python error messages for use in Python / Python Window
+    print pymsg + "\n"
+    print msgs
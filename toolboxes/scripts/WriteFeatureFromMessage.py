@@ -22,6 +22,7 @@ import arcpy
 import MessageIterator
 import MilitaryUtilities
 import GeometryConverter
+import ControlPoints
 import DictionaryConstants
 import os.path
 import traceback
@@ -102,6 +103,14 @@ def writeFeaturesFromMessageFile() :
         yname = "y"
     outputWkid = desc.spatialReference.factoryCode
 
+    # resolve every distinct SIDC up front, so the message loop doesn't wait on the dictionary
+    try :
+        distinctSidcCount = MilitaryUtilities.prewarmSymbolDictionary( \
+            MilitaryUtilities.getDistinctSidcsInMessageFile(inputFileName))
+        arcpy.AddMessage("Distinct SIDCs in messages: " + str(distinctSidcCount))
+    except :
+        arcpy.AddWarning("Could not read the distinct SIDCs of the messages, symbols will be looked up per message")
+
     ################Begin Export ##########################
     
     featureFields = desc.fields
@@ -127,6 +136,9 @@ def writeFeaturesFromMessageFile() :
                 arcpy.AddMessage(skipMsg)
                 continue
 
+            # parsed once, the conversion of each (paired) feature reads the same points
+            controlPoints = ControlPoints.fromString(controlPoints)
+
             # Used for those SICs that map to 2 lines (ex. Task Screen/Guard/Cover)
             repeatForPairFeatures = True
             repeatCount = 0
@@ -217,9 +229,7 @@ def writeFeaturesFromMessageFile() :
                     print "WRITING OUTPUT:"
                     print "SIC: " + sic + ", Name: " + symbolName                
                     print "Adding geometry to feature, with points: "
-                    for point in outputPointList : 
-                        x = point.split(',')[0]
-                        y = point.split(',')[1]
+                    for x, y in outputPointList : 
                         print "(", x, ",", y, ")"                                     
                 
             messageCount += 1
@@ -227,6 +237,9 @@ def writeFeaturesFromMessageFile() :
         if messageCount == 0 :
             arcpy.AddWarning("No Messages Found in Input")
 
+        arcpy.AddMessage("Symbol lookup cache: " + str(MilitaryUtilities.symbolDictionary.getLookupCache()))
+        arcpy.AddMessage("Unknown SIDCs: " + str(MilitaryUtilities.symbolDictionary.getMissingSymbolIdCache()))
+
         if foundEmptyRuleId :
             arcpy.AddWarning("IMPORTANT: Some rows do not have Symbol RuleId set - you may need to run CalcRepRuleField tool.")            
            
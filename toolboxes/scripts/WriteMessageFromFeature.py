@@ -184,8 +184,6 @@ def writeMessageFile() :
                 arcpy.AddWarning("Could not densify polygons, skipping. Densify_edit tool failed - is Desktop Standard License available?")
               
         # Get fields and coded domains
-        CODE_FIELD_NAME = "code"
-        DESCRIPTION_FIELD_NAME = "description"
         fieldNameList = []
         fieldNameToDomainName = {}
         for field in desc.Fields:
@@ -194,10 +192,6 @@ def writeMessageFile() :
                 # Get domain if any
                 if (field.domain is not None and field.domain != ""):
                     fieldNameToDomainName[field.name] = field.domain
-                    dataPath = desc.path
-                    gdbPath = dataPath.split(".gdb")[0]
-                    gdbPath += ".gdb"
-                    arcpy.DomainToTable_management(gdbPath, field.domain, "in_memory/" + field.domain, CODE_FIELD_NAME, DESCRIPTION_FIELD_NAME)
 
         # print fieldNameList
 
@@ -213,6 +207,14 @@ def writeMessageFile() :
             yname = "y"
         wkid = desc.spatialReference.factoryCode
 
+        # resolve every distinct SIDC up front, so the row loop doesn't wait on the dictionary
+        try :
+            distinctSidcCount = MilitaryUtilities.prewarmSymbolDictionary( \
+                MilitaryUtilities.getDistinctSidcsInFeatureClass(inputFC))
+            arcpy.AddMessage("Distinct SIDCs in input: " + str(distinctSidcCount))
+        except :
+            arcpy.AddWarning("Could not read the distinct SIDCs of the input, symbols will be looked up per row")
+
         ################Begin Export ##########################
 
         # Open a search cursor (if possible)
@@ -392,6 +394,8 @@ def writeMessageFile() :
         messageFile.write("</%s>\n" % MilitaryUtilities.getMessageRootTag())
             
         arcpy.AddMessage("Rows Processed: " + str(rowCount))   
+        arcpy.AddMessage("Symbol lookup cache: " + str(MilitaryUtilities.symbolDictionary.getLookupCache()))
+        arcpy.AddMessage("Unknown SIDCs: " + str(MilitaryUtilities.symbolDictionary.getMissingSymbolIdCache()))
         if foundEmptySIDC :
             arcpy.AddWarning("IMPORTANT: Some rows did not have SIDC set - you may need to run CalcSIDCField tool first.")
         arcpy.AddMessage("Write/Append Message File Complete")